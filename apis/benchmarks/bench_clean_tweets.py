@@ -0,0 +1,64 @@
+"""
+Micro-benchmark of the precompiled tweet cleaner against the original
+multi-pass implementation, on synthetic tweets. Run from the apis directory:
+
+    python -m benchmarks.bench_clean_tweets --n 20000
+"""
+import argparse
+import random
+import re
+import time
+from tweet_fetch.clean_tweets import clean_tweet, preprocess_tweets
+
+
+def legacy_clean_tweet(tweet):
+    tweet = tweet.replace('\n', ' ').replace('\r', ' ')
+    tweet = tweet.replace("\\'", "'")
+    tweet = tweet.replace('’', "'").replace('‘', "'")
+    tweet = tweet.replace('“', '"').replace('”', '"')
+    tweet = tweet.lower()
+    tweet = re.sub(r'https?://\S+|www\.\S+', '', tweet)
+    tweet = re.sub(r'@\w+', '', tweet)
+    tweet = re.sub(r'#', '', tweet)
+    tweet = re.sub(r'[^\x00-\x7F\'-]+', '', tweet)
+    tweet = re.sub(r'<.*?>', '', tweet)
+    tweet = re.sub(r'\s+', ' ', tweet).strip()
+    return tweet
+
+
+def legacy_preprocess_tweets(tweets, min_words=5, min_chars=20):
+    cleaned = [legacy_clean_tweet(tweet) for tweet in tweets]
+    return [tweet for tweet in cleaned if len(tweet.split()) >= min_words and len(tweet) >= min_chars]
+
+
+WORDS = ["breaking", "news", "the", "market", "Crash", "it’s", "“wow”", "@reuters", "#economy",
+         "https://t.co/abc123", "😀", "<b>", "don\\'t", "today", "\n", "élite"]
+
+
+def synthetic_tweets(n, seed=0):
+    rng = random.Random(seed)
+    return [" ".join(rng.choice(WORDS) for _ in range(rng.randint(3, 40))) for _ in range(n)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--n", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    tweets = synthetic_tweets(args.n)
+    assert [clean_tweet(t) for t in tweets] == [legacy_clean_tweet(t) for t in tweets]
+
+    for name, fn in (("legacy", legacy_preprocess_tweets), ("precompiled", preprocess_tweets)):
+        best = min(_time(fn, tweets) for _ in range(args.repeat))
+        print(f"{name:>12}: {best:.3f}s for {args.n} tweets ({args.n / best:,.0f} tweets/s)")
+
+
+def _time(fn, tweets):
+    start = time.perf_counter()
+    fn(tweets)
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    main()
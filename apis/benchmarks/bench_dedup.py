@@ -0,0 +1,64 @@
+"""
+Compare the LSH leader-clustering dedup engine with the DBSCAN baseline.
+
+Embeddings are synthetic: topic centroids with near-duplicate variations around
+them, mixed with unrelated tweets, in the 384 dimensions of all-MiniLM-L6-v2.
+Run from the apis directory:
+
+    python -m benchmarks.bench_dedup --sizes 100 1000 10000
+
+dup_recall compares with DBSCAN, lsh_recall with the same leader pass comparing
+every leader, which separates the cost of LSH from the lack of chaining.
+"""
+import argparse
+import time
+import numpy as np
+from tweet_fetch.near_duplicates import leader_indices, dbscan_indices, normalize
+
+
+def synthetic_embeddings(n, dim=384, duplicate_ratio=0.4, noise=0.25, seed=0):
+    rng = np.random.default_rng(seed)
+    n_originals = max(1, int(n * (1 - duplicate_ratio)))
+    originals = rng.standard_normal((n_originals, dim))
+    parents = rng.integers(0, n_originals, n - n_originals)
+    duplicates = originals[parents] + noise * rng.standard_normal((len(parents), dim))
+    embeddings = np.vstack([originals, duplicates])
+    return normalize(embeddings[rng.permutation(n)])
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--eps", type=float, default=0.25)
+    parser.add_argument("--noise", type=float, default=0.25,
+                        help="spread of near-duplicates around their original (0.6 is close to the eps boundary)")
+    args = parser.parse_args()
+
+    print(f"{'n':>7} {'dbscan_s':>9} {'leader_s':>9} {'speedup':>8} {'dbscan_kept':>12} {'leader_kept':>12} "
+          f"{'dup_recall':>11} {'lsh_recall':>11}")
+    for n in args.sizes:
+        embeddings = synthetic_embeddings(n, noise=args.noise)
+        baseline, baseline_time = timed(dbscan_indices, embeddings, eps=args.eps)
+        leaders, leader_time = timed(leader_indices, embeddings, eps=args.eps)
+
+        # Share of the tweets DBSCAN drops as duplicates that the leader engine drops too
+        baseline_dropped = set(range(n)) - set(baseline)
+        leader_dropped = set(range(n)) - set(leaders)
+        recall = len(baseline_dropped & leader_dropped) / len(baseline_dropped) if baseline_dropped else 1.0
+
+        # Same leader pass comparing every leader (one table, no bits): what LSH itself loses
+        exhaustive_dropped = set(range(n)) - set(leader_indices(embeddings, eps=args.eps, n_tables=1, n_bits=0))
+        lsh_recall = len(exhaustive_dropped & leader_dropped) / len(exhaustive_dropped) if exhaustive_dropped else 1.0
+
+        print(f"{n:>7} {baseline_time:>9.3f} {leader_time:>9.3f} {baseline_time / leader_time:>7.1f}x "
+              f"{len(baseline):>12} {len(leaders):>12} {recall:>11.3f} {lsh_recall:>11.3f}")
+
+
+if __name__ == "__main__":
+    main()
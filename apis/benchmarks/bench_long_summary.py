@@ -0,0 +1,53 @@
+"""
+Latency of long-article summarization: the original single call truncated at
+1024 tokens against chunked map-reduce, over synthetic articles of increasing
+length. Needs the summarizer model. Run from the apis directory:
+
+    SUMMARY_CACHE_DB= python -m benchmarks.bench_long_summary --words 500 1500 3000 6000
+"""
+import argparse
+import asyncio
+import random
+import time
+from inference.summarizer import plan_chunks, summarize_long, get_summarizer
+
+WORDS = ["the", "council", "voted", "on", "budget", "after", "a", "long", "debate", "about",
+         "schools", "roads", "and", "housing", "residents", "said", "new", "plan", "would", "help"]
+
+
+def synthetic_article(n_words, seed):
+    rng = random.Random(seed)
+    sentences, count = [], 0
+    while count < n_words:
+        length = rng.randint(8, 25)
+        words = [rng.choice(WORDS) for _ in range(length)]
+        sentences.append(" ".join(words).capitalize() + ".")
+        count += length
+    return " ".join(sentences)
+
+
+async def _time(text, mode):
+    start = time.perf_counter()
+    await summarize_long(text, mode=mode, do_sample=False)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--words", type=int, nargs="+", default=[500, 1500, 3000, 6000])
+    parser.add_argument("--repeat", type=int, default=2)
+    args = parser.parse_args()
+
+    get_summarizer()
+    for n_words in args.words:
+        # A fresh article per run so the summary cache never answers
+        for mode in ("truncate", "mapreduce"):
+            runs = [asyncio.run(_time(synthetic_article(n_words, seed=f"{n_words}-{mode}-{i}"), mode))
+                    for i in range(args.repeat)]
+            windows = plan_chunks(synthetic_article(n_words, seed=0), 1024) or [None]
+            print(f"{n_words:>6} words {mode:>9}: {min(runs):.2f}s"
+                  + (f" ({len(windows)} windows)" if mode == "mapreduce" else ""))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+# batcher.py
+import asyncio
+import logging
+import time
+from collections import deque
+from .metrics import metrics
+
+
+class QueueFullError(Exception):
+    """Raised by BatchScheduler.submit when the queue is at max_queue_depth."""
+
+
+class BatchScheduler:
+    """
+    Dynamic micro-batching for blocking inference calls.
+
+    Requests submitted from the event loop are queued; a single worker task waits
+    until `max_batch_size` compatible items are pending or the oldest has waited
+    `max_wait_ms`, then runs `process_batch(key, items)` once in an executor and
+    resolves every request's future with its result. Items are only batched with
+    others submitted under the same `key` (e.g. the same generation parameters).
+    """
+
+    def __init__(self, name, process_batch, max_batch_size=8, max_wait_ms=50, max_queue_depth=64, executor=None):
+        self.name = name
+        self.process_batch = process_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.max_queue_depth = max_queue_depth
+        self.executor = executor
+        self._pending = deque()
+        self._loop = None
+        self._wakeup = None
+        self._worker = None
+
+    def _ensure_worker(self):
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._worker is None or self._worker.done():
+            self._loop = loop
+            self._wakeup = asyncio.Event()
+            self._worker = loop.create_task(self._run())
+
+    async def submit(self, item, key=None):
+        """Queue one item and wait for its result."""
+        self._ensure_worker()
+        if len(self._pending) >= self.max_queue_depth:
+            metrics.inc("inference_rejected_total", scheduler=self.name)
+            raise QueueFullError(f"{self.name} queue is full ({self.max_queue_depth} pending)")
+
+        future = self._loop.create_future()
+        self._pending.append((key, item, future, time.monotonic()))
+        metrics.set("inference_queue_depth", len(self._pending), scheduler=self.name)
+        self._wakeup.set()
+        return await future
+
+    def _take_batch(self):
+        """Pop up to max_batch_size pending items sharing the oldest item's key."""
+        key = self._pending[0][0]
+        batch, rest = [], deque()
+        while self._pending:
+            entry = self._pending.popleft()
+            if entry[0] == key and len(batch) < self.max_batch_size:
+                batch.append(entry)
+            else:
+                rest.append(entry)
+        self._pending.extendleft(reversed(rest))
+        return key, batch
+
+    def _ready_count(self):
+        key = self._pending[0][0]
+        return sum(1 for entry in self._pending if entry[0] == key)
+
+    async def _run(self):
+        while True:
+            if not self._pending:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            # Wait for the batch to fill up, but never past the oldest item's deadline
+            deadline = self._pending[0][3] + self.max_wait
+            while self._ready_count() < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=remaining)
+                except asyncio.TimeoutError:
+                    break
+
+            key, batch = self._take_batch()
+            metrics.set("inference_queue_depth", len(self._pending), scheduler=self.name)
+            batch = [entry for entry in batch if not entry[2].cancelled()]
+            if not batch:
+                continue
+
+            start = time.monotonic()
+            try:
+                results = await self._loop.run_in_executor(
+                    self.executor, self.process_batch, key, [entry[1] for entry in batch]
+                )
+            except Exception as e:
+                logging.error(f"{self.name} batch of {len(batch)} failed: {e}")
+                for _, _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            latency = time.monotonic() - start
+            metrics.inc("inference_batches_total", scheduler=self.name)
+            metrics.inc("inference_batch_items_total", len(batch), scheduler=self.name)
+            metrics.observe("inference_batch_latency_seconds", latency, scheduler=self.name)
+            logging.info(f"{self.name}: processed batch of {len(batch)} in {latency:.2f}s")
+
+            for (_, _, future, _), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
@@ -0,0 +1,144 @@
+# cache.py
+import os
+import json
+import time
+import hashlib
+import logging
+import sqlite3
+import threading
+from collections import OrderedDict
+from .metrics import metrics
+from .executors import cpu_executor
+
+SUMMARY_CACHE_SIZE = int(os.getenv('SUMMARY_CACHE_SIZE', 2048))
+# Persistent tier; set to an empty string to keep the cache in memory only
+SUMMARY_CACHE_DB = os.getenv('SUMMARY_CACHE_DB', 'summary_cache.sqlite3')
+# Rows kept in the persistent tier; the oldest are deleted beyond this
+SUMMARY_CACHE_DB_MAX_ROWS = int(os.getenv('SUMMARY_CACHE_DB_MAX_ROWS', 100000))
+# Trim the persistent tier after this many writes rather than on every one
+SUMMARY_CACHE_TRIM_EVERY = int(os.getenv('SUMMARY_CACHE_TRIM_EVERY', 500))
+
+
+def summary_key(model_name, prompt, params):
+    """sha256 over the model, the exact prompt and the generation parameters."""
+    payload = json.dumps([model_name, prompt, list(params)], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class SummaryCache:
+    """
+    Two-tier cache of generated summaries: an in-memory LRU of `max_items`
+    entries in front of an optional sqlite table of at most `max_rows` rows that
+    survives restarts. From async code use aget/aput, which run the sqlite tier
+    on the cpu executor instead of the event loop.
+    """
+
+    def __init__(self, max_items=SUMMARY_CACHE_SIZE, db_path=SUMMARY_CACHE_DB, max_rows=SUMMARY_CACHE_DB_MAX_ROWS):
+        self.max_items = max_items
+        self.max_rows = max_rows
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._db_lock = threading.Lock()
+        self.db_path = db_path
+        self._conn = None
+        self._writes = 0
+
+    def _db(self):
+        """The sqlite connection, opened on first use (None when disabled or broken)."""
+        if self._conn is None and self.db_path:
+            try:
+                self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+                with self._conn:
+                    self._conn.execute(
+                        "CREATE TABLE IF NOT EXISTS summaries (key TEXT PRIMARY KEY, summary TEXT NOT NULL, created_at REAL NOT NULL)"
+                    )
+                    self._conn.execute("CREATE INDEX IF NOT EXISTS summaries_created_at_idx ON summaries (created_at)")
+            except sqlite3.Error as e:
+                logging.warning(f"Summary cache database unavailable, using memory only: {e}")
+                self._conn = None
+                self.db_path = None
+        return self._conn
+
+    def _memory_get(self, key):
+        with self._lock:
+            summary = self._entries.get(key)
+            if summary is not None:
+                self._entries.move_to_end(key)
+                metrics.inc("summary_cache_hits_total", tier="memory")
+            return summary
+
+    def _disk_get(self, key):
+        with self._db_lock:
+            db = self._db()
+            if db is None:
+                return None
+            row = db.execute("SELECT summary FROM summaries WHERE key = ?", (key,)).fetchone()
+        if row:
+            with self._lock:
+                self._remember(key, row[0])
+            metrics.inc("summary_cache_hits_total", tier="disk")
+            return row[0]
+        return None
+
+    def _disk_put(self, key, summary):
+        with self._db_lock:
+            db = self._db()
+            if db is None:
+                return
+            try:
+                with db:
+                    db.execute(
+                        "INSERT OR REPLACE INTO summaries (key, summary, created_at) VALUES (?, ?, ?)",
+                        (key, summary, time.time())
+                    )
+                    self._writes += 1
+                    if self._writes % SUMMARY_CACHE_TRIM_EVERY == 0:
+                        self._trim(db)
+            except sqlite3.Error as e:
+                logging.warning(f"Could not persist summary: {e}")
+
+    def _trim(self, db):
+        """Delete the oldest rows beyond max_rows."""
+        deleted = db.execute(
+            "DELETE FROM summaries WHERE key IN (SELECT key FROM summaries ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_rows,)
+        ).rowcount
+        if deleted:
+            logging.info(f"Trimmed {deleted} old summaries from the cache database")
+
+    def get(self, key):
+        summary = self._memory_get(key)
+        if summary is None:
+            summary = self._disk_get(key)
+        if summary is None:
+            metrics.inc("summary_cache_misses_total")
+        return summary
+
+    def put(self, key, summary):
+        if not summary:
+            return
+        with self._lock:
+            self._remember(key, summary)
+        self._disk_put(key, summary)
+
+    async def aget(self, key):
+        summary = self._memory_get(key)
+        if summary is None and self.db_path:
+            summary = await cpu_executor.run(self._disk_get, key)
+        if summary is None:
+            metrics.inc("summary_cache_misses_total")
+        return summary
+
+    async def aput(self, key, summary):
+        if not summary:
+            return
+        with self._lock:
+            self._remember(key, summary)
+        if self.db_path:
+            await cpu_executor.run(self._disk_put, key, summary)
+
+    def _remember(self, key, summary):
+        self._entries[key] = summary
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_items:
+            self._entries.popitem(last=False)
@@ -0,0 +1,38 @@
+# chunking.py
+import re
+
+# A sentence ends at . ! or ? (optionally followed by closing quotes/brackets) and whitespace
+_SENTENCE_END_RE = re.compile(r'(?:(?<=[.!?])|(?<=[.!?]["\'”’)\]]))\s+')
+
+
+def split_sentences(text):
+    return [sentence.strip() for sentence in _SENTENCE_END_RE.split(text) if sentence.strip()]
+
+
+def sentence_windows(sentences, count_tokens, chunk_tokens=512, overlap_tokens=64):
+    """
+    Group sentences into windows of at most `chunk_tokens` tokens that never cut a
+    sentence. Each window starts with the trailing sentences of the previous one,
+    up to `overlap_tokens`, so context carries across the boundary. A sentence
+    longer than `chunk_tokens` becomes a window of its own. Returns a list of
+    strings.
+    """
+    lengths = [count_tokens(sentence) for sentence in sentences]
+    windows = []
+    start = 0
+    while start < len(sentences):
+        end, total = start, 0
+        while end < len(sentences) and (end == start or total + lengths[end] <= chunk_tokens):
+            total += lengths[end]
+            end += 1
+        windows.append(" ".join(sentences[start:end]))
+        if end >= len(sentences):
+            break
+
+        # Step back over whole sentences for the overlap, but always move forward
+        next_start, overlap = end, 0
+        while next_start - 1 > start and overlap + lengths[next_start - 1] <= overlap_tokens:
+            next_start -= 1
+            overlap += lengths[next_start]
+        start = next_start
+    return windows
@@ -0,0 +1,166 @@
+# embeddings.py
+import os
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from pathlib import Path
+import numpy as np
+from sentence_transformers import SentenceTransformer
+from .batcher import BatchScheduler
+from .executors import embedding_executor
+from .metrics import metrics
+
+EMBEDDING_MODEL_NAME = os.getenv('EMBEDDING_MODEL_NAME', 'all-MiniLM-L6-v2')
+# In-memory LRU, in number of embeddings (MiniLM vectors are 384 floats, ~1.5KB each)
+EMBEDDING_CACHE_SIZE = int(os.getenv('EMBEDDING_CACHE_SIZE', 50000))
+# Optional on-disk tier that survives restarts; disabled when unset
+EMBEDDING_CACHE_DIR = os.getenv('EMBEDDING_CACHE_DIR')
+
+# Cross-request batching of encode() calls
+EMBEDDING_MAX_BATCH_SIZE = int(os.getenv('EMBEDDING_MAX_BATCH_SIZE', 16))
+EMBEDDING_MAX_WAIT_MS = int(os.getenv('EMBEDDING_MAX_WAIT_MS', 10))
+EMBEDDING_MAX_QUEUE_DEPTH = int(os.getenv('EMBEDDING_MAX_QUEUE_DEPTH', 256))
+
+
+def text_key(model_name, text):
+    return hashlib.sha1(f"{model_name}\0{text}".encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    Bounded LRU of embeddings keyed by text hash, optionally backed by one .npy
+    file per embedding under `cache_dir` so recurring tweets survive restarts.
+    """
+
+    def __init__(self, max_items=EMBEDDING_CACHE_SIZE, cache_dir=EMBEDDING_CACHE_DIR):
+        self.max_items = max_items
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _path(self, key):
+        return self.cache_dir / key[:2] / f"{key}.npy"
+
+    def get(self, key):
+        with self._lock:
+            vector = self._entries.get(key)
+            if vector is not None:
+                self._entries.move_to_end(key)
+                return vector
+        if self.cache_dir is None:
+            return None
+        try:
+            vector = np.load(self._path(key))
+        except (OSError, ValueError):
+            return None
+        self._remember(key, vector)
+        return vector
+
+    def put(self, key, vector):
+        self._remember(key, vector)
+        if self.cache_dir is None:
+            return
+        path = self._path(key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(".tmp.npy")
+            np.save(tmp_path, vector)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logging.warning(f"Could not write embedding to disk cache: {e}")
+
+    def _remember(self, key, vector):
+        with self._lock:
+            self._entries[key] = vector
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_items:
+                self._entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class EmbeddingService:
+    """
+    Process-wide sentence embedding service. The model is loaded once, known
+    texts are served from the cache, and `encode_async` merges the cache misses
+    of concurrent requests into a single encode() call.
+    """
+
+    def __init__(self, model_name=EMBEDDING_MODEL_NAME, cache=None):
+        self.model_name = model_name
+        self.cache = cache if cache is not None else EmbeddingCache()
+        self._model = None
+        self._model_lock = threading.Lock()
+        self.scheduler = BatchScheduler(
+            "embeddings",
+            self._encode_batch,
+            max_batch_size=EMBEDDING_MAX_BATCH_SIZE,
+            max_wait_ms=EMBEDDING_MAX_WAIT_MS,
+            max_queue_depth=EMBEDDING_MAX_QUEUE_DEPTH,
+            executor=embedding_executor,
+        )
+
+    def get_model(self):
+        if self._model is None:
+            with self._model_lock:
+                if self._model is None:
+                    logging.info(f"Loading sentence transformer {self.model_name}...")
+                    self._model = SentenceTransformer(self.model_name)
+        return self._model
+
+    def _lookup(self, texts):
+        """Return (cached vector or None per text, unique texts still to embed)."""
+        vectors = [self.cache.get(text_key(self.model_name, text)) for text in texts]
+        missing = list(dict.fromkeys(text for text, vector in zip(texts, vectors) if vector is None))
+        metrics.inc("embedding_cache_hits_total", len(texts) - sum(v is None for v in vectors))
+        metrics.inc("embedding_cache_misses_total", len(missing))
+        return vectors, missing
+
+    def _encode_uncached(self, texts):
+        if not texts:
+            return []
+        return list(self.get_model().encode(texts, convert_to_numpy=True, show_progress_bar=False))
+
+    def _encode_batch(self, key, requests):
+        # Each request is a list of texts; encode them all at once and split back
+        flat = [text for texts in requests for text in texts]
+        encoded = self._encode_uncached(flat)
+        results, start = [], 0
+        for texts in requests:
+            results.append(encoded[start:start + len(texts)])
+            start += len(texts)
+        return results
+
+    def encode(self, texts):
+        """Embed `texts` synchronously, reusing cached embeddings. Returns an (n, dim) array."""
+        vectors, missing = self._lookup(texts)
+        return self._finish(texts, vectors, missing, self._encode_uncached(missing))
+
+    async def encode_async(self, texts):
+        """Like encode(), but cache misses are batched with other in-flight requests."""
+        vectors, missing = self._lookup(texts)
+        encoded = await self.scheduler.submit(missing) if missing else []
+        return self._finish(texts, vectors, missing, encoded)
+
+    def _finish(self, texts, vectors, missing, encoded):
+        fresh = dict(zip(missing, encoded))
+        for text, vector in fresh.items():
+            self.cache.put(text_key(self.model_name, text), vector)
+        rows = [vector if vector is not None else fresh[text] for text, vector in zip(texts, vectors)]
+        if not rows:
+            return np.empty((0, 0), dtype=np.float32)
+        return np.vstack(rows)
+
+
+_services = {}
+_services_lock = threading.Lock()
+
+
+def get_embedding_service(model_name=EMBEDDING_MODEL_NAME):
+    """Return the shared EmbeddingService for `model_name`, creating it on first use."""
+    with _services_lock:
+        if model_name not in _services:
+            _services[model_name] = EmbeddingService(model_name)
+        return _services[model_name]
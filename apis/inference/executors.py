@@ -0,0 +1,92 @@
+# executors.py
+import os
+import time
+import asyncio
+import functools
+import logging
+import threading
+import multiprocessing
+from concurrent.futures import Executor, ThreadPoolExecutor, ProcessPoolExecutor
+import torch
+from .metrics import metrics
+
+CPU_COUNT = os.cpu_count() or 1
+# Intra-op threads for every torch call. Summarization and embeddings each get their
+# own single-worker pool, so together they use about all cores without oversubscribing.
+TORCH_THREADS = int(os.getenv('TORCH_THREADS', max(1, CPU_COUNT // 2)))
+SUMMARIZER_WORKERS = int(os.getenv('SUMMARIZER_WORKERS', 1))
+EMBEDDING_WORKERS = int(os.getenv('EMBEDDING_WORKERS', 1))
+# Light CPU work (dedup, small cleaning batches) that should not run on the event loop
+CPU_WORKERS = int(os.getenv('CPU_WORKERS', min(4, CPU_COUNT)))
+# Pure-Python cleaning moves to worker processes from this many tweets up
+CLEAN_PROCESSES = int(os.getenv('CLEAN_PROCESSES', max(1, CPU_COUNT - 1)))
+CLEAN_PROCESS_MIN_BATCH = int(os.getenv('CLEAN_PROCESS_MIN_BATCH', 2000))
+
+
+class StageExecutor(Executor):
+    """
+    Executor wrapper that exports per-stage metrics: tasks currently queued or
+    running (stage_inflight), submit-to-done latency and error counts. Works with
+    loop.run_in_executor and with both thread and process pools.
+    """
+
+    def __init__(self, name, executor):
+        self.name = name
+        self._executor = executor
+        self._inflight = 0
+        self._lock = threading.Lock()
+
+    def _track(self, delta):
+        with self._lock:
+            self._inflight += delta
+            inflight = self._inflight
+        metrics.set("stage_inflight", inflight, stage=self.name)
+
+    def submit(self, fn, *args, **kwargs):
+        submitted = time.monotonic()
+        self._track(1)
+        future = self._executor.submit(fn, *args, **kwargs)
+
+        def done(f):
+            self._track(-1)
+            metrics.inc("stage_tasks_total", stage=self.name)
+            metrics.observe("stage_latency_seconds", time.monotonic() - submitted, stage=self.name)
+            if not f.cancelled() and f.exception() is not None:
+                metrics.inc("stage_errors_total", stage=self.name)
+
+        future.add_done_callback(done)
+        return future
+
+    async def run(self, fn, *args, **kwargs):
+        """Run fn(*args, **kwargs) on this stage from the event loop."""
+        return await asyncio.get_running_loop().run_in_executor(self, functools.partial(fn, *args, **kwargs))
+
+    def shutdown(self, wait=True, **kwargs):
+        self._executor.shutdown(wait=wait, **kwargs)
+
+
+def _configure_torch():
+    torch.set_num_threads(TORCH_THREADS)
+    logging.info(f"torch intra-op threads: {TORCH_THREADS}")
+
+
+_configure_torch()
+
+summarizer_executor = StageExecutor("summarizer", ThreadPoolExecutor(SUMMARIZER_WORKERS, thread_name_prefix="summarizer"))
+embedding_executor = StageExecutor("embeddings", ThreadPoolExecutor(EMBEDDING_WORKERS, thread_name_prefix="embeddings"))
+cpu_executor = StageExecutor("cpu", ThreadPoolExecutor(CPU_WORKERS, thread_name_prefix="cpu"))
+
+_process_executor = None
+_process_executor_lock = threading.Lock()
+
+
+def get_process_executor():
+    """Process pool for large pure-Python batches, started on first use."""
+    global _process_executor
+    if _process_executor is None:
+        with _process_executor_lock:
+            if _process_executor is None:
+                # spawn: forking a process that already runs torch threads can deadlock
+                pool = ProcessPoolExecutor(CLEAN_PROCESSES, mp_context=multiprocessing.get_context("spawn"))
+                _process_executor = StageExecutor("clean", pool)
+    return _process_executor
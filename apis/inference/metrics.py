@@ -0,0 +1,68 @@
+# metrics.py
+import threading
+
+
+class Metrics:
+    """
+    Minimal in-process metrics registry rendered in the Prometheus text format,
+    served by the combined API server at /metrics.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._gauges = {}
+        self._summaries = {}
+
+    @staticmethod
+    def _key(name, labels):
+        return name, tuple(sorted(labels.items()))
+
+    def inc(self, name, value=1, **labels):
+        key = self._key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def set(self, name, value, **labels):
+        with self._lock:
+            self._gauges[self._key(name, labels)] = value
+
+    def observe(self, name, value, **labels):
+        key = self._key(name, labels)
+        with self._lock:
+            total, count = self._summaries.get(key, (0.0, 0))
+            self._summaries[key] = (total + value, count + 1)
+
+    def get(self, name, **labels):
+        key = self._key(name, labels)
+        with self._lock:
+            return self._counters.get(key, self._gauges.get(key))
+
+    @staticmethod
+    def _format(name, labels, value):
+        if labels:
+            label_str = ",".join(f'{k}="{v}"' for k, v in labels)
+            return f"{name}{{{label_str}}} {value}"
+        return f"{name} {value}"
+
+    def render(self):
+        lines = []
+        with self._lock:
+            for kind, series in (("counter", self._counters), ("gauge", self._gauges)):
+                seen = set()
+                for (name, labels), value in sorted(series.items()):
+                    if name not in seen:
+                        lines.append(f"# TYPE {name} {kind}")
+                        seen.add(name)
+                    lines.append(self._format(name, labels, value))
+            seen = set()
+            for (name, labels), (total, count) in sorted(self._summaries.items()):
+                if name not in seen:
+                    lines.append(f"# TYPE {name} summary")
+                    seen.add(name)
+                lines.append(self._format(f"{name}_sum", labels, total))
+                lines.append(self._format(f"{name}_count", labels, count))
+        return "\n".join(lines) + "\n"
+
+
+metrics = Metrics()
@@ -0,0 +1,188 @@
+# summarizer.py
+import os
+import asyncio
+import logging
+import threading
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Optional, Tuple
+import torch
+from transformers import AutoTokenizer, AutoModelForSeq2SeqLM
+from .batcher import BatchScheduler
+from .executors import summarizer_executor, cpu_executor
+from .cache import SummaryCache, summary_key
+from .chunking import split_sentences, sentence_windows
+
+SUMMARY_MODEL_NAME = "t5-base"
+SUMMARY_MODEL_DIR = Path("models/summarizer_model")
+
+# Micro-batching of generate() calls
+SUMMARY_MAX_BATCH_SIZE = int(os.getenv('SUMMARY_MAX_BATCH_SIZE', 8))
+SUMMARY_MAX_WAIT_MS = int(os.getenv('SUMMARY_MAX_WAIT_MS', 50))
+SUMMARY_MAX_QUEUE_DEPTH = int(os.getenv('SUMMARY_MAX_QUEUE_DEPTH', 64))
+
+# "sample" keeps the original top-p sampling; "deterministic" uses beam search, so the
+# same prompt always gives the same summary and cached results match a fresh run.
+SUMMARY_DECODING = os.getenv('SUMMARY_DECODING', 'sample')
+SUMMARY_NUM_BEAMS = int(os.getenv('SUMMARY_NUM_BEAMS', 4))
+
+# Articles longer than one input window are summarized map-reduce style: overlapping
+# sentence windows are summarized in one batch, then the joined chunk summaries are
+# summarized again. "truncate" restores the old cut at max_input_length tokens.
+SUMMARY_LONG_MODE = os.getenv('SUMMARY_LONG_MODE', 'mapreduce')
+SUMMARY_CHUNK_TOKENS = int(os.getenv('SUMMARY_CHUNK_TOKENS', 512))
+SUMMARY_CHUNK_OVERLAP = int(os.getenv('SUMMARY_CHUNK_OVERLAP', 64))
+SUMMARY_MAX_CHUNKS = int(os.getenv('SUMMARY_MAX_CHUNKS', 8))
+SUMMARY_CHUNK_SUMMARY_TOKENS = int(os.getenv('SUMMARY_CHUNK_SUMMARY_TOKENS', 80))
+
+_summarizer = None
+_summarizer_lock = threading.Lock()
+
+
+def load_summarizer(model_name: str = SUMMARY_MODEL_NAME, model_dir: Path = SUMMARY_MODEL_DIR) -> Tuple:
+    """Load or download the tokenizer and model for summarization."""
+    logging.info(f"Loading summarizer model from {model_dir} or downloading {model_name} if not available...")
+
+    if model_dir.exists():
+        logging.info(f"Model directory {model_dir} found. Loading model from disk.")
+
+        tokenizer = AutoTokenizer.from_pretrained(model_dir)
+        model = AutoModelForSeq2SeqLM.from_pretrained(model_dir)
+    else:
+        logging.info(f"Model directory {model_dir} not found. Downloading model {model_name}.")
+        tokenizer = AutoTokenizer.from_pretrained(model_name)
+        model = AutoModelForSeq2SeqLM.from_pretrained(model_name)
+        model_dir.mkdir(parents=True, exist_ok=True)
+        tokenizer.save_pretrained(model_dir)
+        model.save_pretrained(model_dir)
+        logging.info(f"Model {model_name} downloaded and saved to {model_dir}.")
+
+    model.eval()
+    logging.info(f"Model {model_name} is ready for summarization.")
+
+    return tokenizer, model
+
+
+def get_summarizer() -> Tuple:
+    """
+    Return the process-wide (tokenizer, model) pair, loading it on first use.
+    News and tweet summarization share this single copy.
+    """
+    global _summarizer
+    if _summarizer is None:
+        with _summarizer_lock:
+            if _summarizer is None:
+                _summarizer = load_summarizer()
+    return _summarizer
+
+
+def is_ready() -> bool:
+    return _summarizer is not None
+
+
+@asynccontextmanager
+async def summarizer_lifespan(app):
+    """FastAPI lifespan handler that warms the summarizer before serving requests."""
+    tokenizer, model = await asyncio.to_thread(get_summarizer)
+    app.state.summarizer = (tokenizer, model)
+    yield
+
+
+def generate_batch(params, prompts):
+    """
+    Run one padded generate() call over `prompts`. `params` is the tuple
+    (max_input_length, max_new_tokens, do_sample, temperature, top_p, num_beams).
+    """
+    max_input_length, max_new_tokens, do_sample, temperature, top_p, num_beams = params
+    if do_sample:
+        decoding = dict(do_sample=True, temperature=temperature, top_p=top_p)
+    else:
+        decoding = dict(do_sample=False, num_beams=num_beams)
+    tokenizer, model = get_summarizer()
+    inputs = tokenizer(prompts, return_tensors="pt", padding=True, truncation=True, max_length=max_input_length)
+    with torch.no_grad():
+        output_ids = model.generate(
+            **inputs,
+            max_new_tokens=max_new_tokens,
+            **decoding
+        )
+    return [summary.strip() for summary in tokenizer.batch_decode(output_ids, skip_special_tokens=True)]
+
+
+summary_scheduler = BatchScheduler(
+    "summarizer",
+    generate_batch,
+    max_batch_size=SUMMARY_MAX_BATCH_SIZE,
+    max_wait_ms=SUMMARY_MAX_WAIT_MS,
+    max_queue_depth=SUMMARY_MAX_QUEUE_DEPTH,
+    executor=summarizer_executor,
+)
+
+summary_cache = SummaryCache()
+
+
+async def summarize(prompt: str, max_input_length: int = 1024, max_new_tokens: int = 150,
+                    do_sample: Optional[bool] = None, temperature: float = 0.9, top_p: float = 0.95) -> str:
+    """
+    Summarize one prompt through the shared micro-batching scheduler. Results are
+    cached by (model, prompt, generation params), so a repeated prompt skips
+    inference. `do_sample` defaults to the SUMMARY_DECODING setting. Raises
+    QueueFullError when too many prompts are already waiting.
+    """
+    if do_sample is None:
+        do_sample = SUMMARY_DECODING == "sample"
+    if do_sample:
+        params = (max_input_length, max_new_tokens, True, temperature, top_p, 1)
+    else:
+        params = (max_input_length, max_new_tokens, False, None, None, SUMMARY_NUM_BEAMS)
+
+    key = summary_key(SUMMARY_MODEL_NAME, prompt, params)
+    summary = await summary_cache.aget(key)
+    if summary is not None:
+        return summary
+    summary = await summary_scheduler.submit(prompt, key=params)
+    await summary_cache.aput(key, summary)
+    return summary
+
+
+def plan_chunks(text: str, max_input_length: int, chunk_tokens: int = SUMMARY_CHUNK_TOKENS,
+                overlap_tokens: int = SUMMARY_CHUNK_OVERLAP, max_chunks: int = SUMMARY_MAX_CHUNKS):
+    """Return None when `text` fits in one input window, else its sentence windows."""
+    tokenizer, _ = get_summarizer()
+
+    def count_tokens(chunk):
+        return len(tokenizer.encode(chunk, add_special_tokens=False))
+
+    if count_tokens(text) <= max_input_length:
+        return None
+    windows = sentence_windows(split_sentences(text), count_tokens, chunk_tokens, overlap_tokens)
+    if len(windows) > max_chunks:
+        logging.warning(f"Article needs {len(windows)} windows; summarizing the first {max_chunks}.")
+        windows = windows[:max_chunks]
+    return windows
+
+
+async def summarize_long(text: str, prefix: str = "summarize: ", max_input_length: int = 1024,
+                         max_new_tokens: int = 150, mode: str = None, **generation) -> str:
+    """
+    Summarize `text` of any length. Text that fits in `max_input_length` tokens is
+    summarized directly. Longer text is split into overlapping sentence windows
+    whose summaries are generated together (the batcher pads them into one
+    generate call) and then summarized once more.
+    """
+    mode = mode or SUMMARY_LONG_MODE
+    windows = None
+    if mode == "mapreduce":
+        windows = await cpu_executor.run(plan_chunks, text, max_input_length)
+    if not windows:
+        return await summarize(f"{prefix}{text}", max_input_length=max_input_length,
+                               max_new_tokens=max_new_tokens, **generation)
+
+    logging.info(f"Summarizing long article in {len(windows)} windows.")
+    chunk_summaries = await asyncio.gather(*(
+        summarize(f"{prefix}{window}", max_input_length=max_input_length,
+                  max_new_tokens=SUMMARY_CHUNK_SUMMARY_TOKENS, **generation)
+        for window in windows
+    ))
+    return await summarize(f"{prefix}{' '.join(chunk_summaries)}", max_input_length=max_input_length,
+                           max_new_tokens=max_new_tokens, **generation)
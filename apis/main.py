@@ -1,10 +1,15 @@
 # main.py
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse, PlainTextResponse
 from tweet_fetch.get_tweets_api import app as twitter_app
 from news_summary.news_summary_api import app as news_app
+from inference.summarizer import is_ready, summarizer_lifespan
+from inference.metrics import metrics
 
 
-main_app = FastAPI()
+# Mounted sub-applications don't run their own lifespan handlers, so the combined
+# server loads the shared summarizer once here.
+main_app = FastAPI(lifespan=summarizer_lifespan)
 
 # Mount sub-applications
 main_app.mount("/twitter", twitter_app)
@@ -13,3 +18,15 @@ main_app.mount("/news", news_app)
 @main_app.get("/")
 def root():
     return {"message": "Combined API Server"}
+
+@main_app.get("/ready")
+def ready():
+    """Readiness probe: 200 once the summarizer model is warm, 503 while it loads."""
+    if not is_ready():
+        return JSONResponse(status_code=503, content={"summarizer": "loading"})
+    return {"summarizer": "ready"}
+
+@main_app.get("/metrics", response_class=PlainTextResponse)
+def prometheus_metrics():
+    """Batch size, queue depth and latency of the inference schedulers, in Prometheus format."""
+    return metrics.render()
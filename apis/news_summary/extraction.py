@@ -0,0 +1,74 @@
+# extraction.py
+import os
+import asyncio
+import logging
+import httpx
+from newspaper import Article
+from inference.executors import cpu_executor
+
+# Download limits per article page
+EXTRACT_TIMEOUT = float(os.getenv('EXTRACT_TIMEOUT', 15))
+EXTRACT_MAX_BYTES = int(os.getenv('EXTRACT_MAX_BYTES', 5 * 1024 * 1024))
+EXTRACT_MAX_CONNECTIONS = int(os.getenv('EXTRACT_MAX_CONNECTIONS', 20))
+EXTRACT_USER_AGENT = os.getenv(
+    'EXTRACT_USER_AGENT',
+    'Mozilla/5.0 (Macintosh; Intel Mac OS X 14_6_1) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.5 Safari/605.1.15'
+)
+
+
+class ExtractionError(Exception):
+    """The article page could not be downloaded within the configured limits."""
+
+
+_client = None
+_client_loop = None
+
+
+def get_http_client():
+    """Pooled async HTTP client shared by all extractions on the running event loop."""
+    global _client, _client_loop
+    loop = asyncio.get_running_loop()
+    if _client is None or _client_loop is not loop:
+        _client = httpx.AsyncClient(
+            timeout=EXTRACT_TIMEOUT,
+            follow_redirects=True,
+            headers={"User-Agent": EXTRACT_USER_AGENT},
+            limits=httpx.Limits(max_connections=EXTRACT_MAX_CONNECTIONS, max_keepalive_connections=EXTRACT_MAX_CONNECTIONS),
+        )
+        _client_loop = loop
+    return _client
+
+
+async def download_html(url: str, max_bytes: int = EXTRACT_MAX_BYTES) -> str:
+    """Stream the page body, giving up once it exceeds `max_bytes`."""
+    client = get_http_client()
+    try:
+        async with client.stream("GET", url) as response:
+            response.raise_for_status()
+            declared = response.headers.get("content-length")
+            if declared and declared.isdigit() and int(declared) > max_bytes:
+                raise ExtractionError(f"{url} is {declared} bytes, over the {max_bytes} byte limit")
+            body = bytearray()
+            async for chunk in response.aiter_bytes():
+                body.extend(chunk)
+                if len(body) > max_bytes:
+                    raise ExtractionError(f"{url} exceeded the {max_bytes} byte limit")
+            encoding = response.charset_encoding or "utf-8"
+    except httpx.HTTPError as e:
+        raise ExtractionError(f"Failed to download {url}: {e}") from e
+    return bytes(body).decode(encoding, errors="replace")
+
+
+def parse_article_html(url: str, html: str) -> str:
+    """Extract the main body text from downloaded HTML (CPU-bound)."""
+    article = Article(url)
+    article.download(input_html=html)
+    article.parse()
+    return article.text.strip()
+
+
+async def extract_article_text(url: str) -> str:
+    """Download the page on the shared client and parse it on the CPU pool."""
+    logging.info(f"Extracting article text from URL: {url}")
+    html = await download_html(url)
+    return await cpu_executor.run(parse_article_html, url, html)
@@ -0,0 +1,74 @@
+import asyncio
+import pytest
+from inference.batcher import BatchScheduler, QueueFullError
+
+# --- Concurrent submissions share one batch ---
+def test_concurrent_requests_are_batched():
+    calls = []
+
+    def process_batch(key, items):
+        calls.append((key, list(items)))
+        return [item.upper() for item in items]
+
+    scheduler = BatchScheduler("test", process_batch, max_batch_size=4, max_wait_ms=200)
+
+    async def run():
+        return await asyncio.gather(*(scheduler.submit(text, key="k") for text in ["a", "b", "c"]))
+
+    assert asyncio.run(run()) == ["A", "B", "C"]
+    assert calls == [("k", ["a", "b", "c"])]
+
+# --- Items with different keys are never mixed ---
+def test_batches_split_by_key():
+    calls = []
+
+    def process_batch(key, items):
+        calls.append((key, list(items)))
+        return items
+
+    scheduler = BatchScheduler("test", process_batch, max_batch_size=4, max_wait_ms=50)
+
+    async def run():
+        return await asyncio.gather(
+            scheduler.submit("a", key=1), scheduler.submit("b", key=2), scheduler.submit("c", key=1)
+        )
+
+    assert asyncio.run(run()) == ["a", "b", "c"]
+    assert sorted(calls) == [(1, ["a", "c"]), (2, ["b"])]
+
+# --- Backpressure once the queue is full ---
+def test_queue_full_raises():
+    scheduler = BatchScheduler("test", lambda key, items: items, max_batch_size=8, max_wait_ms=1000, max_queue_depth=2)
+
+    async def run():
+        first = asyncio.ensure_future(scheduler.submit("a"))
+        second = asyncio.ensure_future(scheduler.submit("b"))
+        await asyncio.sleep(0)
+        with pytest.raises(QueueFullError):
+            await scheduler.submit("c")
+        for task in (first, second):
+            task.cancel()
+
+    asyncio.run(run())
+
+# --- Stage executors export per-stage metrics ---
+def test_stage_executor_metrics():
+    from concurrent.futures import ThreadPoolExecutor
+    from inference.executors import StageExecutor
+    from inference.metrics import metrics
+
+    stage = StageExecutor("test-stage", ThreadPoolExecutor(1))
+
+    def fail():
+        raise ValueError("boom")
+
+    async def run():
+        assert await stage.run(sum, [1, 2, 3]) == 6
+        with pytest.raises(ValueError):
+            await stage.run(fail)
+
+    asyncio.run(run())
+    stage.shutdown()
+    assert metrics.get("stage_tasks_total", stage="test-stage") == 2
+    assert metrics.get("stage_errors_total", stage="test-stage") == 1
+    assert metrics.get("stage_inflight", stage="test-stage") == 0
@@ -0,0 +1,29 @@
+from inference.chunking import split_sentences, sentence_windows
+
+
+def count_words(text):
+    return len(text.split())
+
+
+def test_split_sentences_keeps_punctuation():
+    text = 'First one. "Second one!" he said.  Third?\nFourth'
+    assert split_sentences(text) == ['First one.', '"Second one!"', 'he said.', 'Third?', 'Fourth']
+
+
+def test_windows_respect_size_and_overlap():
+    sentences = [f"s{i} " + " ".join(["w"] * 9) for i in range(10)]  # 10 words each
+    windows = sentence_windows(sentences, count_words, chunk_tokens=30, overlap_tokens=10)
+
+    assert all(count_words(w) <= 30 for w in windows)
+    # Each window starts with the last sentence of the previous one
+    for prev, cur in zip(windows, windows[1:]):
+        assert cur.startswith(prev.split(" ", len(prev.split()) - 10)[-1])
+    assert windows[0].startswith(sentences[0])
+    assert windows[-1].endswith(sentences[-1])
+    assert {s for s in sentences if not any(s in w for w in windows)} == set()
+
+
+def test_oversized_sentence_is_its_own_window():
+    sentences = ["a a a", " ".join(["b"] * 50), "c c c"]
+    windows = sentence_windows(sentences, count_words, chunk_tokens=20, overlap_tokens=5)
+    assert windows == ["a a a", sentences[1], "c c c"]
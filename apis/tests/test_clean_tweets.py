@@ -0,0 +1,49 @@
+import random
+import re
+import pandas as pd
+from tweet_fetch.clean_tweets import clean_tweet, clean_tweets_batch, clean_tweet_column, preprocess_tweets, preprocess_tweets_indexed
+
+
+def reference_clean_tweet(tweet):
+    # The original multi-pass implementation the precompiled cleaner must match
+    tweet = tweet.replace('\n', ' ').replace('\r', ' ')
+    tweet = tweet.replace("\\'", "'")
+    tweet = tweet.replace('’', "'").replace('‘', "'")
+    tweet = tweet.replace('“', '"').replace('”', '"')
+    tweet = tweet.lower()
+    tweet = re.sub(r'https?://\S+|www\.\S+', '', tweet)
+    tweet = re.sub(r'@\w+', '', tweet)
+    tweet = re.sub(r'#', '', tweet)
+    tweet = re.sub(r'[^\x00-\x7F\'-]+', '', tweet)
+    tweet = re.sub(r'<.*?>', '', tweet)
+    tweet = re.sub(r'\s+', ' ', tweet).strip()
+    return tweet
+
+
+PIECES = [
+    "a", "Z", "_", "-", "1", ".", "/", " ", "  ", "\t", "\n", "\r", "\x0b", "\x1c", "\xa0", "​",
+    "@", "#", "<", ">", "'", "\\", "\\'", "’", "‘", "“", "”", "é", "İ", "ß", "😀",
+    "http://", "HTTPS://x.co/", "www.", "WWW.", "@user", "#tag", "<b>", "word",
+]
+
+# --- Randomized equivalence with the original implementation ---
+def test_clean_tweet_matches_reference():
+    rng = random.Random(1234)
+    for _ in range(20000):
+        tweet = "".join(rng.choice(PIECES) for _ in range(rng.randint(0, 25)))
+        assert clean_tweet(tweet) == reference_clean_tweet(tweet), repr(tweet)
+
+# --- Batch API word counts and filtering ---
+def test_batch_word_counts_and_filter():
+    tweets = ["Hello   @bob check https://t.co/x out #now", "", "too short", "one two three four five six"]
+    assert [count for _, count in clean_tweets_batch(tweets)] == [
+        len(reference_clean_tweet(tweet).split()) for tweet in tweets
+    ]
+    assert preprocess_tweets(tweets) == ["one two three four five six"]
+    assert preprocess_tweets_indexed(tweets) == [(3, "one two three four five six")]
+
+# --- pandas column helper ---
+def test_clean_tweet_column():
+    cleaned, counts = clean_tweet_column(pd.Series(["Hi @bob #News", None]))
+    assert cleaned[0] == "hi news" and counts[0] == 2
+    assert pd.isna(cleaned[1]) and pd.isna(counts[1])
@@ -0,0 +1,18 @@
+import numpy as np
+from tweet_fetch.near_duplicates import leader_indices, dbscan_indices
+
+# --- Leader clustering keeps the first tweet of each near-duplicate group ---
+def test_leader_matches_dbscan_on_clear_duplicates():
+    rng = np.random.default_rng(0)
+    originals = rng.standard_normal((50, 384))
+    duplicates = originals + 0.05 * rng.standard_normal((50, 384))
+    embeddings = np.vstack([originals, duplicates])
+
+    assert leader_indices(embeddings, eps=0.25) == list(range(50))
+    assert leader_indices(embeddings, eps=0.25) == dbscan_indices(embeddings, eps=0.25)
+
+# --- Identical texts are dropped by the hash prefilter ---
+def test_identical_texts_dropped():
+    embeddings = np.eye(3)
+    assert leader_indices(embeddings, texts=["a", "b", "a"]) == [0, 1]
+    assert leader_indices(embeddings) == [0, 1, 2]
@@ -0,0 +1,45 @@
+import asyncio
+import numpy as np
+from unittest.mock import MagicMock
+from inference.embeddings import EmbeddingCache, EmbeddingService
+
+
+def make_service(cache=None):
+    if cache is None:
+        cache = EmbeddingCache(max_items=100)
+    service = EmbeddingService("test-model", cache=cache)
+    model = MagicMock()
+    model.encode.side_effect = lambda texts, **kwargs: np.array([[len(t), 1.0] for t in texts], dtype=np.float32)
+    service._model = model
+    return service, model
+
+# --- Cached texts are not re-embedded ---
+def test_encode_reuses_cache():
+    service, model = make_service()
+    first = service.encode(["a", "bb", "a"])
+    second = service.encode(["bb", "ccc"])
+
+    assert first.tolist() == [[1, 1], [2, 1], [1, 1]]
+    assert second.tolist() == [[2, 1], [3, 1]]
+    assert [call.args[0] for call in model.encode.call_args_list] == [["a", "bb"], ["ccc"]]
+
+# --- Concurrent async requests share one encode() call ---
+def test_encode_async_batches_requests():
+    service, model = make_service()
+
+    async def run():
+        return await asyncio.gather(service.encode_async(["a", "bb"]), service.encode_async(["ccc"]))
+
+    first, second = asyncio.run(run())
+    assert first.tolist() == [[1, 1], [2, 1]]
+    assert second.tolist() == [[3, 1]]
+    assert model.encode.call_count == 1
+
+# --- Disk tier survives a new in-memory cache ---
+def test_disk_cache(tmp_path):
+    service, _ = make_service(EmbeddingCache(max_items=1, cache_dir=tmp_path))
+    service.encode(["a", "bb"])
+
+    reloaded, model = make_service(EmbeddingCache(max_items=1, cache_dir=tmp_path))
+    assert reloaded.encode(["a", "bb"]).tolist() == [[1, 1], [2, 1]]
+    model.encode.assert_not_called()
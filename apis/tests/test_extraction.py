@@ -0,0 +1,25 @@
+import asyncio
+import httpx
+import pytest
+from unittest.mock import patch
+from news_summary import extraction
+
+
+def mock_client(body, headers=None):
+    transport = httpx.MockTransport(lambda request: httpx.Response(200, content=body, headers=headers))
+    return httpx.AsyncClient(transport=transport)
+
+# --- Bodies over the size limit are rejected while streaming ---
+def test_download_respects_max_bytes():
+    with patch("news_summary.extraction.get_http_client", return_value=mock_client(b"x" * 2048)):
+        assert asyncio.run(extraction.download_html("http://example.com/a", max_bytes=4096)) == "x" * 2048
+        with pytest.raises(extraction.ExtractionError):
+            asyncio.run(extraction.download_html("http://example.com/a", max_bytes=1024))
+
+# --- Downloaded HTML is parsed on the worker pool ---
+def test_extract_article_text():
+    paragraph = "The council approved the new budget on Tuesday after a long debate about schools. " * 5
+    html = f"<html><head><title>Budget</title></head><body><article><p>{paragraph}</p><p>{paragraph}</p></article></body></html>"
+    with patch("news_summary.extraction.get_http_client", return_value=mock_client(html.encode())):
+        text = asyncio.run(extraction.extract_article_text("http://example.com/budget"))
+    assert "council approved the new budget" in text
@@ -1,7 +1,8 @@
-import pytest
+import numpy as np
 from fastapi.testclient import TestClient
 from unittest.mock import patch, AsyncMock, MagicMock
 from main import main_app
+from inference.batcher import QueueFullError
 from requests import HTTPError
 
 client = TestClient(main_app)
@@ -12,40 +13,66 @@ def test_root():
     assert response.status_code == 200
     assert response.json() == {"message": "Combined API Server"}
 
+# --- Test /ready endpoint ---
+@patch("main.is_ready", return_value=False)
+def test_ready_while_loading(mock_ready):
+    response = client.get("/ready")
+    assert response.status_code == 503
+    assert response.json() == {"summarizer": "loading"}
+
+@patch("main.is_ready", return_value=True)
+def test_ready_when_loaded(mock_ready):
+    response = client.get("/ready")
+    assert response.status_code == 200
+    assert response.json() == {"summarizer": "ready"}
+
 # --- Test /summarize endpoint ---
-@pytest.mark.asyncio
-@patch("news_summary.news_summary_api.extract_article_text", return_value="Some article text")
-@patch("news_summary.news_summary_api.load_summarizer", return_value=("mock_tokenizer", "mock_model"))
+@patch("news_summary.news_summary_api.extract_article_text", new_callable=AsyncMock, return_value="Some article text")
 @patch("news_summary.news_summary_api.generate_summary", new_callable=AsyncMock)
-def test_summarize_success(mock_generate, mock_loader, mock_extract):
+def test_summarize_success(mock_generate, mock_extract):
     mock_generate.return_value = "Short summary"
     response = client.post("/news/summarize", json={"url": "http://example.com/article"})
     
     assert response.status_code == 200
     assert response.json() == {
         "url": "http://example.com/article",
-        "summary": "Short summary"
+        "summary": "Short summary",
+        "text": "Some article text"
     }
 
-@pytest.mark.asyncio
-@patch("news_summary.news_summary_api.extract_article_text", return_value=None)
+@patch("news_summary.news_summary_api.extract_article_text", new_callable=AsyncMock)
+@patch("news_summary.news_summary_api.generate_summary", new_callable=AsyncMock)
+def test_summarize_stored_text_skips_download(mock_generate, mock_extract):
+    mock_generate.return_value = "Short summary"
+    response = client.post("/news/summarize", json={"url": "http://example.com/article", "text": "Stored text"})
+
+    assert response.json() == {"url": "http://example.com/article", "summary": "Short summary"}
+    mock_extract.assert_not_called()
+    mock_generate.assert_awaited_once_with("Stored text")
+
+@patch("news_summary.news_summary_api.extract_article_text", new_callable=AsyncMock, return_value=None)
 def test_summarize_extract_fail(mock_extract):
     response = client.post("/news/summarize", json={"url": "http://example.com/article"})
     assert response.status_code == 200
     assert response.json() == {"error": "Failed to extract article text"}
 
-@pytest.mark.asyncio
-@patch("news_summary.news_summary_api.extract_article_text", side_effect=Exception("Something went wrong"))
+@patch("news_summary.news_summary_api.extract_article_text", new_callable=AsyncMock, side_effect=Exception("Something went wrong"))
 def test_summarize_exception(mock_extract):
     response = client.post("/news/summarize", json={"url": "http://example.com/article"})
     assert response.status_code == 500
     assert response.json()["detail"] == "Something went wrong"
 
+@patch("news_summary.news_summary_api.extract_article_text", new_callable=AsyncMock, return_value="Some article text")
+@patch("news_summary.news_summary_api.generate_summary", new_callable=AsyncMock)
+def test_summarize_queue_full(mock_generate, mock_extract):
+    mock_generate.side_effect = QueueFullError("summarizer queue is full (64 pending)")
+    response = client.post("/news/summarize", json={"url": "http://example.com/article"})
+    assert response.status_code == 503
+
 # --- Test /tweets endpoint ---
-@pytest.mark.asyncio
-@patch("tweet_fetch.get_tweets_api.load_client")
+@patch("tweet_fetch.get_tweets_api.get_fetcher")
 @patch("tweet_fetch.get_tweets_api.process_tweets", new_callable=AsyncMock)
-def test_tweets_success(mock_process, mock_client):
+def test_tweets_success(mock_process, mock_fetcher):
     mock_process.return_value = {
         "cleaned_tweets": ["tweet1", "tweet2"],
         "raw_stats": {"likes": 10, "replies": 2, "retweets": 1},
@@ -57,3 +84,20 @@ def test_tweets_success(mock_process, mock_client):
     assert response.json()["cleaned_tweets"] == ["tweet1", "tweet2"]
 
 
+
+@patch("tweet_fetch.get_tweets_api.summarize_tweets_async", new_callable=AsyncMock, return_value="Summary of tweets")
+@patch("tweet_fetch.get_tweets_api.get_embedding_service")
+@patch("tweet_fetch.get_tweets_api.get_fetcher")
+def test_tweets_keep_ids_and_stats_aligned(mock_fetcher, mock_embeddings, mock_summary):
+    mock_fetcher.return_value.fetch = AsyncMock(return_value=[
+        ["too short", "This is the first useful tweet here", "Another different tweet with enough words"],
+        [1, 2, 3], [4, 5, 6], [7, 8, 9], ["101", "102", "103"]
+    ])
+    mock_embeddings.return_value.encode_async = AsyncMock(return_value=np.eye(2))
+    response = client.post("/twitter/tweets", json={"title": "Python", "max_tweets": 3})
+
+    assert response.status_code == 200
+    assert response.json()["tweets"] == [
+        {"id": "102", "text": "this is the first useful tweet here", "likes": 2, "replies": 5, "retweets": 8},
+        {"id": "103", "text": "another different tweet with enough words", "likes": 3, "replies": 6, "retweets": 9},
+    ]
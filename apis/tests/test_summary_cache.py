@@ -0,0 +1,33 @@
+import asyncio
+from unittest.mock import patch, AsyncMock
+from inference.cache import SummaryCache, summary_key
+from inference import summarizer
+
+# --- Cached prompts skip inference ---
+@patch("inference.summarizer.summary_scheduler")
+def test_summarize_hits_cache(mock_scheduler, tmp_path):
+    mock_scheduler.submit = AsyncMock(return_value="A summary")
+    with patch("inference.summarizer.summary_cache", SummaryCache(db_path=tmp_path / "cache.sqlite3")):
+        first = asyncio.run(summarizer.summarize("summarize: text", do_sample=False))
+        second = asyncio.run(summarizer.summarize("summarize: text", do_sample=False))
+        other = asyncio.run(summarizer.summarize("summarize: text", do_sample=True))
+
+    assert first == second == other == "A summary"
+    # The sampled request has different generation params, so it is a separate entry
+    assert mock_scheduler.submit.await_count == 2
+
+# --- The sqlite tier survives a new process ---
+def test_disk_tier(tmp_path):
+    key = summary_key("t5-base", "prompt", (1024, 150, False, None, None, 4))
+    SummaryCache(db_path=tmp_path / "cache.sqlite3").put(key, "stored")
+    assert SummaryCache(db_path=tmp_path / "cache.sqlite3").get(key) == "stored"
+    assert SummaryCache(db_path=None).get(key) is None
+
+# --- The sqlite tier is trimmed to max_rows, oldest first ---
+@patch("inference.cache.SUMMARY_CACHE_TRIM_EVERY", 1)
+def test_disk_tier_bounded(tmp_path):
+    cache = SummaryCache(max_items=1, db_path=tmp_path / "cache.sqlite3", max_rows=2)
+    for i in range(4):
+        asyncio.run(cache.aput(f"k{i}", f"s{i}"))
+    fresh = SummaryCache(db_path=tmp_path / "cache.sqlite3")
+    assert [fresh.get(f"k{i}") for i in range(4)] == [None, None, "s2", "s3"]
@@ -0,0 +1,42 @@
+import asyncio
+import time
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+from twikit import TooManyRequests
+from tweet_fetch.fetch_tweets import RateLimitBudget, TweetFetcher
+
+
+def make_tweet(i):
+    return SimpleNamespace(text=f"tweet {i}", favorite_count=i, reply_count=0, retweet_count=0, id=str(i))
+
+
+class FakePage(list):
+    def __init__(self, tweets, next_page=None):
+        super().__init__(tweets)
+        self.next = AsyncMock(return_value=next_page if next_page is not None else [])
+
+
+def make_fetcher(clients, limit=10):
+    fetcher = TweetFetcher(cookie_paths=[], limit=limit, window=60, max_wait=1)
+    fetcher.clients = clients
+    fetcher.budgets = [RateLimitBudget(limit, 60) for _ in clients]
+    return fetcher
+
+# --- Token bucket follows the server's rate-limit headers ---
+def test_budget_blocks_until_reset():
+    budget = RateLimitBudget(limit=5, window=60)
+    assert budget.try_take()
+    budget.update(remaining=0, reset=time.time() + 30)
+    assert not budget.try_take()
+    assert 29 < budget.wait_time() <= 30
+
+# --- Searches go to the client that has budget; a 429 moves work to another client ---
+def test_fetch_uses_client_with_budget():
+    limited = SimpleNamespace(search_tweet=AsyncMock(side_effect=TooManyRequests("429", headers={"x-rate-limit-reset": str(int(time.time()) + 600)})))
+    healthy = SimpleNamespace(search_tweet=AsyncMock(return_value=FakePage([make_tweet(1), make_tweet(2)], FakePage([make_tweet(3)]))))
+    fetcher = make_fetcher([limited, healthy])
+
+    texts, likes, replies, retweets, ids = asyncio.run(fetcher.fetch("python", max_tweets=3))
+    assert texts == ["tweet 1", "tweet 2", "tweet 3"]
+    assert ids == ["1", "2", "3"]
+    assert fetcher.budgets[0].wait_time() > 500
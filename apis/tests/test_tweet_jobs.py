@@ -0,0 +1,67 @@
+import asyncio
+from unittest.mock import patch, MagicMock, AsyncMock
+from fastapi.testclient import TestClient
+from main import main_app
+from tweet_fetch.jobs import JobStore, JobRunner
+
+client = TestClient(main_app)
+
+# --- Jobs run on the worker pool and persist their results ---
+def test_jobs_run_and_persist(tmp_path):
+    async def process(title, max_tweets):
+        if title == "bad":
+            raise ValueError("boom")
+        return {"summary": f"{title}:{max_tweets}"}
+
+    async def run():
+        runner = JobRunner(JobStore(tmp_path / "jobs.sqlite3"), process, workers=2)
+        jobs = await runner.submit(["a", "b", "bad", "a"], 5)
+        await runner._queue.join()
+        return jobs
+
+    jobs = asyncio.run(run())
+    assert jobs[0]["id"] == jobs[3]["id"]
+
+    stored = JobStore(tmp_path / "jobs.sqlite3").get_many([job["id"] for job in jobs[:3]])
+    assert [(job["status"], job["result"], job["error"]) for job in stored] == [
+        ("done", {"summary": "a:5"}, None),
+        ("done", {"summary": "b:5"}, None),
+        ("failed", None, "boom"),
+    ]
+
+# --- Unfinished jobs are resumed by the next process ---
+def test_running_jobs_are_requeued(tmp_path):
+    store = JobStore(tmp_path / "jobs.sqlite3")
+    job_id, _ = store.create("a", 5)
+    store.set_status(job_id, "running")
+    assert JobStore(tmp_path / "jobs.sqlite3").requeue_unfinished() == [(job_id, "a", 5)]
+
+# --- A dead worker is replaced without restarting the live ones ---
+def test_dead_workers_are_replaced(tmp_path):
+    async def process(title, max_tweets):
+        return {"summary": title}
+
+    async def run():
+        runner = JobRunner(JobStore(tmp_path / "jobs.sqlite3"), process, workers=2)
+        await runner.submit(["a"], 5)
+        alive, dead = runner._tasks
+        dead.cancel()
+        await asyncio.sleep(0)
+        await runner.submit(["b"], 5)
+        await runner._queue.join()
+        assert runner._tasks[0] is alive and runner._tasks[1] is not dead
+        assert not any(task.done() for task in runner._tasks)
+
+    asyncio.run(run())
+
+# --- Endpoints ---
+@patch("tweet_fetch.get_tweets_api.get_job_runner")
+def test_submit_and_poll_endpoints(mock_runner):
+    mock_runner.return_value.submit = AsyncMock(return_value=[{"id": "j1", "title": "Python", "status": "queued"}])
+    mock_runner.return_value.store.get.return_value = None
+
+    response = client.post("/twitter/jobs", json={"titles": ["Python"]})
+    assert response.status_code == 202
+    assert response.json() == {"jobs": [{"id": "j1", "title": "Python", "status": "queued"}]}
+    assert client.get("/twitter/jobs/unknown").status_code == 404
+    assert client.post("/twitter/jobs", json={}).status_code == 422
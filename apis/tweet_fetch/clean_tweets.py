@@ -1,23 +1,60 @@
 import re
 
+_URL_RE = re.compile(r'https?://\S+|www\.\S+')
+_MENTION_RE = re.compile(r'@\w+')
+_TAG_RE = re.compile(r'<.*?>')
+
 def clean_tweet(tweet):
-    tweet = tweet.replace('\n', ' ').replace('\r', ' ')
-    tweet = tweet.replace("\\'", "'")
-    tweet = tweet.replace('’', "'").replace('‘', "'")
-    tweet = tweet.replace('“', '"').replace('”', '"')
-    tweet = tweet.lower()
-    tweet = re.sub(r'https?://\S+|www\.\S+', '', tweet)
-    tweet = re.sub(r'@\w+', '', tweet)
-    tweet = re.sub(r'#', '', tweet)
-    tweet = re.sub(r'[^\x00-\x7F\'-]+', '', tweet)
-    tweet = re.sub(r'<.*?>', '', tweet)
-    tweet = re.sub(r'\s+', ' ', tweet).strip()
-    return tweet
+    # Chained str.replace is several times faster than str.translate on non-ASCII text
+    tweet = (tweet.replace('\n', ' ').replace('\r', ' ')
+             .replace("\\'", "'")
+             .replace('\u2019', "'").replace('\u2018', "'")
+             .replace('\u201c', '"').replace('\u201d', '"')
+             .lower())
+    # Same steps and order as before; each regex only runs when it can match
+    if 'http' in tweet or 'www.' in tweet:
+        tweet = _URL_RE.sub('', tweet)
+    if '@' in tweet:
+        tweet = _MENTION_RE.sub('', tweet)
+    tweet = tweet.replace('#', '')
+    if not tweet.isascii():
+        # Mentions are already gone, so dropping every non-ASCII character is safe here
+        tweet = tweet.encode('ascii', 'ignore').decode('ascii')
+    if '<' in tweet:
+        tweet = _TAG_RE.sub('', tweet)
+    return ' '.join(tweet.split())
+
+def word_count(cleaned):
+    # Cleaned tweets are single-space separated, so no second split is needed
+    return cleaned.count(' ') + 1 if cleaned else 0
+
+def clean_tweets_batch(tweets):
+    """Clean a list of tweets in one pass. Returns [(cleaned, word_count)]."""
+    results = []
+    for tweet in tweets:
+        cleaned = clean_tweet(tweet)
+        results.append((cleaned, word_count(cleaned)))
+    return results
+
+def clean_tweet_column(column):
+    """Clean a pandas string column (missing values stay missing). Returns (cleaned, word_counts)."""
+    cleaned = column.map(clean_tweet, na_action='ignore')
+    return cleaned, cleaned.map(word_count, na_action='ignore')
 
 def filter_low_info_tweets(tweets, min_words=5, min_chars=20):
-    return [tweet for tweet in tweets if len(tweet.split()) >= min_words and len(tweet) >= min_chars]
+    return [tweet for tweet in tweets if word_count(tweet) >= min_words and len(tweet) >= min_chars]
+
 
+def preprocess_tweets(tweets, min_words=5, min_chars=20):
+    return [
+        cleaned for cleaned, words in clean_tweets_batch(tweets)
+        if words >= min_words and len(cleaned) >= min_chars
+    ]
 
-def preprocess_tweets(tweets):
-    cleaned = [clean_tweet(tweet) for tweet in tweets]
-    return filter_low_info_tweets(cleaned)
\ No newline at end of file
+def preprocess_tweets_indexed(tweets, min_words=5, min_chars=20):
+    # Same as preprocess_tweets, but keeps each tweet's position in the raw list so
+    # its id and engagement stats stay aligned with the cleaned text.
+    return [
+        (idx, cleaned) for idx, (cleaned, words) in enumerate(clean_tweets_batch(tweets))
+        if words >= min_words and len(cleaned) >= min_chars
+    ]
\ No newline at end of file
@@ -1,16 +1,18 @@
-from sentence_transformers import SentenceTransformer
-from sklearn.cluster import DBSCAN
+from inference.embeddings import get_embedding_service
+from .near_duplicates import leader_indices, dbscan_indices
 
 
-def semantic_deduplicate(tweets, eps=0.25, model_name='all-MiniLM-L6-v2'):
-    model = SentenceTransformer(model_name)
-    embeddings = model.encode(tweets, convert_to_numpy=True, show_progress_bar=True)
-    clustering = DBSCAN(eps=eps, min_samples=1, metric='cosine').fit(embeddings)
+def semantic_deduplicate(tweets, eps=0.25, model_name='all-MiniLM-L6-v2', embeddings=None, method='leader'):
+    # Callers on the event loop pass embeddings from EmbeddingService.encode_async
+    if not tweets:
+        return []
+    if embeddings is None:
+        embeddings = get_embedding_service(model_name).encode(tweets)
 
-    unique_tweets = []
-    seen_clusters = set()
-    for idx, label in enumerate(clustering.labels_):
-        if label not in seen_clusters:
-            seen_clusters.add(label)
-            unique_tweets.append(tweets[idx])
-    return unique_tweets
\ No newline at end of file
+    # 'leader' compares each tweet with LSH candidate leaders only; 'dbscan' keeps the
+    # exhaustive clustering, which also chains clusters through intermediate tweets
+    if method == 'dbscan':
+        keep = dbscan_indices(embeddings, eps=eps)
+    else:
+        keep = leader_indices(embeddings, eps=eps, texts=tweets)
+    return [tweets[idx] for idx in keep]
\ No newline at end of file
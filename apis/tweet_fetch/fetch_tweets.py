@@ -1,95 +1,204 @@
 ### fetch_tweets.py
+import os
 import asyncio
-import random
-from twikit import Client, TooManyRequests
-from pathlib import Path
-import logging
-MAX_TWEETS = 100
-SLEEP_RANGE = (5, 15)
+import threading
 import time
-from tenacity import retry, wait_exponential, stop_after_attempt
-from tenacity import retry_if_exception_type
-from httpx import HTTPError
+import logging
+from pathlib import Path
+from twikit import Client, TooManyRequests
 logging.getLogger("httpx").setLevel(logging.WARNING)
 logging.getLogger("twikit").setLevel(logging.WARNING)
 # Set up logging configuration
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-client = Client(language='en-US')
-
-def load_client():
-    script_dir = Path(__file__).resolve().parent
-    cookies_path = script_dir / 'cookies.json'
-    try:
-        client.load_cookies(cookies_path)
-    except FileNotFoundError:
-        raise Exception("Login required. Please login manually once to save cookies.")
-    return client
-
-@retry(
-    wait=wait_exponential(multiplier=1, min=4, max=60),
-    stop=stop_after_attempt(5),
-    retry=(retry_if_exception_type(TooManyRequests))
-)
-async def fetch_tweets(client, QUERY, MAX_TWEETS):
-    collected = []
-    attempts = 0
-
-    try:
-        result = await client.search_tweet(query=QUERY, product='Top')
-    except (TooManyRequests, HTTPError) as e:
-            if e.status_code == 429:
-                # print("Rate limit exceeded. Waiting 60 seconds...")
-                # logging.info("Rate limit exceeded. Waiting 60 seconds...")  
-                reset_time = int(result.headers.get('x-rate-limit-reset', 60))
-                logging.info(f"Rate limit exceeded. Waiting until {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(reset_time))}...")
-                # Calculate the time to wait until the rate limit resets
-                logging.info(f"Rate limit reset time: {int(result.headers.get('x-rate-limit-reset', time.time() + 60))}")
-                await asyncio.sleep(reset_time - time.time() + 1)
-                attempts += 1
-            
-            if e.status_code == 404:
-                logging.warning(f"404 on {QUERY}, retrying...")
-                await asyncio.sleep(5)
-            #     continue
-            # raise
-    collected.extend(result)
-    # print(f"Initial batch: {len(result)} tweets")
-    logging.info(f"Initial batch: {len(result)} tweets")
-
-    while len(collected) < MAX_TWEETS and attempts < 10:
-        time_sleep = random.randint(*SLEEP_RANGE)
-        # print(f"Sleeping for {time_sleep} seconds...")
-        logging.info(f"Sleeping for {time_sleep} seconds...")
-        await asyncio.sleep(time_sleep)
-
-        try:
-            next_batch = await result.next()
+MAX_TWEETS = 100
+# Comma-separated cookie files, one authenticated client each; defaults to cookies.json here
+TWITTER_COOKIES_PATHS = os.getenv('TWITTER_COOKIES_PATHS')
+# Search budget per client: TWITTER_SEARCH_LIMIT requests per TWITTER_SEARCH_WINDOW seconds.
+# The x-rate-limit-* headers of every response correct the estimate.
+TWITTER_SEARCH_LIMIT = int(os.getenv('TWITTER_SEARCH_LIMIT', 50))
+TWITTER_SEARCH_WINDOW = float(os.getenv('TWITTER_SEARCH_WINDOW', 900))
+# A search that would wait longer than this for budget fails with RateLimitExceeded
+TWITTER_MAX_WAIT = float(os.getenv('TWITTER_MAX_WAIT', 300))
+MAX_PAGE_ATTEMPTS = 3
+
+
+class RateLimitExceeded(Exception):
+    """No client has search budget within TWITTER_MAX_WAIT seconds."""
+
+    def __init__(self, retry_after):
+        super().__init__(f"Twitter search budget exhausted, retry in {retry_after:.0f}s")
+        self.retry_after = retry_after
+
+
+class RateLimitBudget:
+    """
+    Token bucket for one client: `limit` requests refilled evenly over `window`
+    seconds, clamped to what the server reports in x-rate-limit-remaining and
+    blocked until x-rate-limit-reset once it reports nothing left.
+    """
+
+    def __init__(self, limit=TWITTER_SEARCH_LIMIT, window=TWITTER_SEARCH_WINDOW):
+        self.capacity = float(limit)
+        self.refill_rate = limit / window
+        self.tokens = float(limit)
+        self.blocked_until = 0.0
+        self._updated = time.time()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.refill_rate)
+        self._updated = now
+
+    def wait_time(self, now=None):
+        """Seconds until a request may be sent on this client."""
+        now = time.time() if now is None else now
+        with self._lock:
+            self._refill(now)
+            if now < self.blocked_until:
+                return self.blocked_until - now
+            if self.tokens >= 1:
+                return 0.0
+            return (1 - self.tokens) / self.refill_rate
+
+    def try_take(self, now=None):
+        now = time.time() if now is None else now
+        with self._lock:
+            self._refill(now)
+            if now < self.blocked_until or self.tokens < 1:
+                return False
+            self.tokens -= 1
+            return True
+
+    def update(self, remaining=None, reset=None):
+        """Apply the server's view of the budget (reset is a unix timestamp)."""
+        with self._lock:
+            self._refill(time.time())
+            if remaining is not None:
+                self.tokens = min(self.tokens, float(remaining))
+                if remaining <= 0 and reset is not None:
+                    self.blocked_until = max(self.blocked_until, float(reset))
+            elif reset is not None:
+                self.blocked_until = max(self.blocked_until, float(reset))
+
+
+class TweetFetcher:
+    """
+    Process-wide twikit search service. Cookie files are read once; every client
+    has a RateLimitBudget and each page request goes to whichever client has
+    budget first, so concurrent article titles share capacity instead of each
+    sleeping on its own.
+    """
+
+    def __init__(self, cookie_paths=None, limit=TWITTER_SEARCH_LIMIT, window=TWITTER_SEARCH_WINDOW, max_wait=TWITTER_MAX_WAIT):
+        if cookie_paths is None:
+            if TWITTER_COOKIES_PATHS:
+                cookie_paths = [path.strip() for path in TWITTER_COOKIES_PATHS.split(',') if path.strip()]
+            else:
+                cookie_paths = [Path(__file__).resolve().parent / 'cookies.json']
+        self.cookie_paths = cookie_paths
+        self.limit = limit
+        self.window = window
+        self.max_wait = max_wait
+        self.clients = []
+        self.budgets = []
+        self._load_lock = threading.Lock()
+
+    def load_clients(self):
+        if self.clients:
+            return self.clients
+        with self._load_lock:
+            if not self.clients:
+                clients, budgets = [], []
+                for path in self.cookie_paths:
+                    budget = RateLimitBudget(self.limit, self.window)
+                    client = Client(language='en-US', event_hooks={'response': [self._budget_hook(budget)]})
+                    try:
+                        client.load_cookies(path)
+                    except FileNotFoundError:
+                        logging.error(f"Cookie file {path} not found; skipping this client.")
+                        continue
+                    clients.append(client)
+                    budgets.append(budget)
+                if not clients:
+                    raise Exception("Login required. Please login manually once to save cookies.")
+                logging.info(f"Loaded {len(clients)} authenticated Twitter client(s).")
+                self.budgets = budgets
+                self.clients = clients
+        return self.clients
+
+    @staticmethod
+    def _budget_hook(budget):
+        async def on_response(response):
+            remaining = response.headers.get('x-rate-limit-remaining')
+            reset = response.headers.get('x-rate-limit-reset')
+            if remaining is not None or reset is not None:
+                budget.update(
+                    remaining=int(remaining) if remaining is not None else None,
+                    reset=int(reset) if reset is not None else None
+                )
+        return on_response
+
+    async def _acquire(self, index=None):
+        """Wait for budget on client `index`, or on any client. Returns the client index."""
+        self.load_clients()
+        candidates = range(len(self.clients)) if index is None else [index]
+        deadline = time.time() + self.max_wait
+        while True:
+            for i in candidates:
+                if self.budgets[i].try_take():
+                    return i
+            wait = min(self.budgets[i].wait_time() for i in candidates)
+            if time.time() + wait > deadline:
+                raise RateLimitExceeded(wait)
+            await asyncio.sleep(max(wait, 0.05))
+
+    async def _request(self, pinned, call):
+        """Run one page request on client `pinned` (None for any), retrying after 429s."""
+        for attempt in range(MAX_PAGE_ATTEMPTS):
+            index = await self._acquire(pinned)
+            try:
+                return index, await call(self.clients[index])
+            except TooManyRequests as e:
+                reset = e.rate_limit_reset or time.time() + 60
+                self.budgets[index].update(remaining=0, reset=reset)
+                logging.info(f"Rate limited on client {index} until {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(reset))}")
+        raise RateLimitExceeded(self.budgets[index].wait_time())
+
+    async def fetch(self, query, max_tweets=MAX_TWEETS):
+        """
+        Search `query` and page until `max_tweets` tweets are collected. Returns
+        [texts, likes, replies, retweets, ids].
+        """
+        # The first page may use any client; later pages are tied to the client
+        # holding the search cursor.
+        index, result = await self._request(None, lambda client: client.search_tweet(query=query, product='Top'))
+        collected = list(result)
+        logging.info(f"Initial batch: {len(result)} tweets")
+
+        while len(collected) < max_tweets:
+            index, next_batch = await self._request(index, lambda client: result.next())
             if not next_batch:
-                # print("No more tweets found.")
                 logging.info("No more tweets found.")
                 break
             collected.extend(next_batch)
-            # print(f"New batch: {len(next_batch)} tweets | Total: {len(collected)}")
             logging.info(f"New batch: {len(next_batch)} tweets | Total: {len(collected)}")
             result = next_batch
-            attempts = 0
-        except (TooManyRequests, HTTPError) as e:
-            if e.status_code == 429:
-                # print("Rate limit exceeded. Waiting 60 seconds...")
-                # logging.info("Rate limit exceeded. Waiting 60 seconds...")  
-                reset_time = int(result.headers.get('x-rate-limit-reset', 60))
-                logging.info(f"Rate limit exceeded. Waiting until {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(reset_time))}...")
-                # Calculate the time to wait until the rate limit resets
-                logging.info(f"Rate limit reset time: {int(result.headers.get('x-rate-limit-reset', time.time() + 60))}")
-                await asyncio.sleep(reset_time - time.time() + 1)
-                attempts += 1
-            
-            if e.status_code == 404:
-                logging.warning(f"404 on {QUERY}, retrying...")
-                await asyncio.sleep(5)
-                continue
-            raise
-
-    return [[tweet.text for tweet in collected[:MAX_TWEETS]] , [tweet.favorite_count for tweet in collected[:MAX_TWEETS]], [tweet.reply_count for tweet in collected[:MAX_TWEETS]], [tweet.retweet_count for tweet in collected[:MAX_TWEETS]]]
\ No newline at end of file
+
+        collected = collected[:max_tweets]
+        return [[tweet.text for tweet in collected] , [tweet.favorite_count for tweet in collected], [tweet.reply_count for tweet in collected], [tweet.retweet_count for tweet in collected], [tweet.id for tweet in collected]]
+
+
+_fetcher = None
+_fetcher_lock = threading.Lock()
+
+
+def get_fetcher():
+    """Return the shared TweetFetcher, creating it on first use."""
+    global _fetcher
+    if _fetcher is None:
+        with _fetcher_lock:
+            if _fetcher is None:
+                _fetcher = TweetFetcher()
+    return _fetcher
\ No newline at end of file
@@ -1,12 +1,17 @@
 # API Server (FastAPI)
-from fastapi import FastAPI, BackgroundTasks
+from fastapi import FastAPI, BackgroundTasks, HTTPException
 from pydantic import BaseModel
+from typing import List, Optional
 import asyncio
-from .fetch_tweets import load_client, fetch_tweets
-from .clean_tweets import preprocess_tweets
+from .fetch_tweets import get_fetcher, RateLimitExceeded
+from .clean_tweets import preprocess_tweets_indexed
 from .deduplicate_tweets import semantic_deduplicate
 # from sentiment_theme import analyze_sentiments_and_themes
-from .summarize_analysis import summarize_tweets
+from .summarize_analysis import summarize_tweets_async
+from .jobs import JobStore, JobRunner
+from inference.batcher import QueueFullError
+from inference.embeddings import get_embedding_service
+from inference.executors import cpu_executor, get_process_executor, CLEAN_PROCESS_MIN_BATCH
 from httpx import HTTPError
 from httpx import HTTPStatusError, RequestError
 
@@ -16,32 +21,63 @@ class TweetRequest(BaseModel):
     title: str
     max_tweets: int = 20
 
-async def process_tweets(client, title, max_tweets):
-    # 1. Fetch tweets (with built-in delays)
-    raw_tweets = await fetch_tweets(client, title, max_tweets)
+class TweetJobRequest(BaseModel):
+    title: Optional[str] = None
+    titles: List[str] = []
+    max_tweets: int = 20
+
+async def process_tweets(fetcher, title, max_tweets):
+    # 1. Fetch tweets (paced by the fetcher's shared rate-limit budget)
+    raw_tweets = await fetcher.fetch(title, max_tweets)
     
     # 2. Post-processing pipeline
-    cleaned = preprocess_tweets(raw_tweets[0])  # Your existing logic
-    unique = semantic_deduplicate(cleaned)
-    summary = summarize_tweets(unique, title)
+    texts, likes, replies, retweets, tweet_ids = raw_tweets
+    # CPU-bound stages run on their own executors so the event loop keeps serving
+    # other requests; torch work is queued on the inference pools by the batchers.
+    clean_executor = get_process_executor() if len(texts) >= CLEAN_PROCESS_MIN_BATCH else cpu_executor
+    indexed = await clean_executor.run(preprocess_tweets_indexed, texts)
+    cleaned = [tweet for _, tweet in indexed]
+    embeddings = await get_embedding_service().encode_async(cleaned) if cleaned else None
+    unique = await cpu_executor.run(semantic_deduplicate, cleaned, embeddings=embeddings)
+    summary = await summarize_tweets_async(unique, title)
+
+    # Unique tweets with the id and stats of the raw tweet they came from
+    raw_index = {}
+    for idx, tweet in indexed:
+        raw_index.setdefault(tweet, idx)
+    unique_tweets = [
+        {
+            "id": str(tweet_ids[raw_index[tweet]]),
+            "text": tweet,
+            "likes": likes[raw_index[tweet]],
+            "replies": replies[raw_index[tweet]],
+            "retweets": retweets[raw_index[tweet]]
+        }
+        for tweet in unique
+    ]
     
     # 3. Return structured response
     return {
         "cleaned_tweets": cleaned,
         "raw_stats": {
-            "likes": raw_tweets[1],
-            "replies": raw_tweets[2],
-            "retweets": raw_tweets[3]
+            "likes": likes,
+            "replies": replies,
+            "retweets": retweets
         },
+        "tweets": unique_tweets,
         "summary": summary
     }
 
 @app.post("/tweets")
 async def get_processed_tweets(request: TweetRequest):
-    client = load_client()  # Reuse authenticated client
+    fetcher = get_fetcher()  # Shared authenticated client(s), cookies are read once
 
     try:
-        return await process_tweets(client, request.title, request.max_tweets)
+        return await process_tweets(fetcher, request.title, request.max_tweets)
+    except RateLimitExceeded as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": str(int(e.retry_after) + 1)})
+    except QueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except HTTPError as e:
         if e.response.status_code == 429:
             # Option 1: Return a 429 error with a message
@@ -55,3 +91,38 @@ async def get_processed_tweets(request: TweetRequest):
         # Option 1: Return a 404 error with a message
     #     raise HTTPException(status_code=404, detail=f"No tweets found for '{request.title}'")
     # return await process_tweets(client, request.title, request.max_tweets)
+
+
+_job_runner = None
+
+def get_job_runner():
+    """Job store and worker pool, created on first use."""
+    global _job_runner
+    if _job_runner is None:
+        _job_runner = JobRunner(JobStore(), lambda title, max_tweets: process_tweets(get_fetcher(), title, max_tweets))
+    return _job_runner
+
+def job_response(job):
+    return {key: job[key] for key in ("id", "title", "status", "result", "error")}
+
+@app.post("/jobs", status_code=202)
+async def submit_tweet_jobs(request: TweetJobRequest):
+    """Queue one job per title and return the job ids immediately."""
+    titles = list(request.titles) + ([request.title] if request.title else [])
+    if not titles:
+        raise HTTPException(status_code=422, detail="Provide a title or a list of titles")
+    jobs = await get_job_runner().submit(titles, request.max_tweets)
+    return {"jobs": [{"id": job["id"], "title": job["title"], "status": job["status"]} for job in jobs]}
+
+@app.get("/jobs")
+def get_tweet_jobs(ids: str):
+    """Status and results of several jobs, given as comma-separated ids."""
+    job_ids = [job_id for job_id in ids.split(",") if job_id]
+    return {"jobs": [job_response(job) for job in get_job_runner().store.get_many(job_ids)]}
+
+@app.get("/jobs/{job_id}")
+def get_tweet_job(job_id: str):
+    job = get_job_runner().store.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job {job_id}")
+    return job_response(job)
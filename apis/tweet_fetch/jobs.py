@@ -0,0 +1,174 @@
+# jobs.py
+import os
+import json
+import time
+import uuid
+import asyncio
+import sqlite3
+import logging
+import threading
+from inference.executors import cpu_executor
+
+# Job state survives API restarts; unfinished jobs are picked up again on the next start
+TWEET_JOBS_DB = os.getenv('TWEET_JOBS_DB', 'tweet_jobs.sqlite3')
+TWEET_JOB_WORKERS = int(os.getenv('TWEET_JOB_WORKERS', 4))
+# Finished jobs are kept this long for polling, then purged
+TWEET_JOB_TTL = int(os.getenv('TWEET_JOB_TTL', 86400))
+
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+
+
+class JobStore:
+    """sqlite-backed job table shared by the API handlers and the workers."""
+
+    def __init__(self, path=TWEET_JOBS_DB):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    title TEXT NOT NULL,
+                    max_tweets INTEGER NOT NULL,
+                    status TEXT NOT NULL,
+                    result TEXT,
+                    error TEXT,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+            """)
+            self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_status_idx ON jobs (status, created_at)")
+
+    @staticmethod
+    def _row_to_job(row):
+        job_id, title, max_tweets, status, result, error, created_at, updated_at = row
+        return {
+            "id": job_id,
+            "title": title,
+            "max_tweets": max_tweets,
+            "status": status,
+            "result": json.loads(result) if result else None,
+            "error": error,
+            "created_at": created_at,
+            "updated_at": updated_at,
+        }
+
+    def create(self, title, max_tweets):
+        """Queue a job, or return the id of an unfinished job for the same search."""
+        now = time.time()
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT id FROM jobs WHERE title = ? AND max_tweets = ? AND status IN (?, ?)",
+                (title, max_tweets, QUEUED, RUNNING)
+            ).fetchone()
+            if row:
+                return row[0], False
+            job_id = uuid.uuid4().hex
+            self._conn.execute(
+                "INSERT INTO jobs (id, title, max_tweets, status, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (job_id, title, max_tweets, QUEUED, now, now)
+            )
+            self._conn.execute(
+                "DELETE FROM jobs WHERE status IN (?, ?) AND updated_at < ?",
+                (DONE, FAILED, now - TWEET_JOB_TTL)
+            )
+        return job_id, True
+
+    def create_many(self, titles, max_tweets):
+        return [self.create(title, max_tweets) for title in titles]
+
+    def get_many(self, job_ids):
+        if not job_ids:
+            return []
+        placeholders = ",".join("?" * len(job_ids))
+        with self._lock:
+            rows = self._conn.execute(f"SELECT * FROM jobs WHERE id IN ({placeholders})", list(job_ids)).fetchall()
+        jobs = {row[0]: self._row_to_job(row) for row in rows}
+        return [jobs[job_id] for job_id in job_ids if job_id in jobs]
+
+    def get(self, job_id):
+        jobs = self.get_many([job_id])
+        return jobs[0] if jobs else None
+
+    def set_status(self, job_id, status, result=None, error=None):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, updated_at = ? WHERE id = ?",
+                (status, json.dumps(result) if result is not None else None, error, time.time(), job_id)
+            )
+
+    def requeue_unfinished(self):
+        """Reset jobs a previous process was running and return all queued jobs, oldest first."""
+        with self._lock, self._conn:
+            self._conn.execute("UPDATE jobs SET status = ? WHERE status = ?", (QUEUED, RUNNING))
+            rows = self._conn.execute(
+                "SELECT id, title, max_tweets FROM jobs WHERE status = ? ORDER BY created_at", (QUEUED,)
+            ).fetchall()
+        return rows
+
+
+class JobRunner:
+    """
+    Bounded pool of asyncio workers that run `process(title, max_tweets)` for
+    queued jobs and persist the outcome. Workers start with the first submission
+    on the running event loop and first resume any jobs left unfinished. Store
+    calls run on the cpu executor so sqlite never blocks the event loop.
+    """
+
+    def __init__(self, store, process, workers=TWEET_JOB_WORKERS):
+        self.store = store
+        self.process = process
+        self.workers = workers
+        self._loop = None
+        self._queue = None
+        self._started = None
+        self._tasks = []
+
+    async def _start(self):
+        # Requeue before any worker or submission can touch the table
+        for job_id, title, max_tweets in await cpu_executor.run(self.store.requeue_unfinished):
+            self._queue.put_nowait((job_id, title, max_tweets))
+        self._tasks = [self._loop.create_task(self._work()) for _ in range(self.workers)]
+
+    async def _ensure_workers(self):
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._tasks = []
+            self._started = loop.create_task(self._start())
+        await self._started
+
+        # Replace only workers that died; the others keep their current job
+        for i, task in enumerate(self._tasks):
+            if task.done():
+                if not task.cancelled() and task.exception() is not None:
+                    logging.error(f"Tweet job worker died, restarting it: {task.exception()}")
+                self._tasks[i] = loop.create_task(self._work())
+
+    async def submit(self, titles, max_tweets):
+        """Create (or reuse) one job per title and queue the new ones. Returns job dicts."""
+        await self._ensure_workers()
+        job_ids = []
+        # An unfinished job for the same search is reused; it is already queued
+        created_jobs = await cpu_executor.run(self.store.create_many, titles, max_tweets)
+        for title, (job_id, created) in zip(titles, created_jobs):
+            if created:
+                self._queue.put_nowait((job_id, title, max_tweets))
+            job_ids.append(job_id)
+        return await cpu_executor.run(self.store.get_many, job_ids)
+
+    async def _work(self):
+        while True:
+            job_id, title, max_tweets = await self._queue.get()
+            try:
+                await cpu_executor.run(self.store.set_status, job_id, RUNNING)
+                try:
+                    result = await self.process(title, max_tweets)
+                except Exception as e:
+                    logging.error(f"Tweet job {job_id} for '{title}' failed: {e}")
+                    await cpu_executor.run(self.store.set_status, job_id, FAILED, None, str(e))
+                else:
+                    await cpu_executor.run(self.store.set_status, job_id, DONE, result)
+            finally:
+                self._queue.task_done()
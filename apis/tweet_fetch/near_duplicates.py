@@ -0,0 +1,82 @@
+# near_duplicates.py
+import os
+from collections import defaultdict
+import numpy as np
+from sklearn.cluster import DBSCAN
+
+# Random-hyperplane LSH: more tables raise recall, more bits per table cut the
+# number of candidates compared per tweet.
+DEDUP_LSH_TABLES = int(os.getenv('DEDUP_LSH_TABLES', 24))
+DEDUP_LSH_BITS = int(os.getenv('DEDUP_LSH_BITS', 10))
+DEDUP_LSH_SEED = 13
+
+
+def normalize(embeddings):
+    embeddings = np.asarray(embeddings, dtype=np.float32)
+    norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return embeddings / norms
+
+
+def lsh_signatures(vectors, n_tables=DEDUP_LSH_TABLES, n_bits=DEDUP_LSH_BITS, seed=DEDUP_LSH_SEED):
+    """One integer bucket id per (vector, table), from the signs of random projections."""
+    rng = np.random.default_rng(seed)
+    planes = rng.standard_normal((vectors.shape[1], n_tables * n_bits)).astype(np.float32)
+    bits = (vectors @ planes > 0).reshape(len(vectors), n_tables, n_bits)
+    weights = 1 << np.arange(n_bits, dtype=np.int64)
+    return bits.astype(np.int64) @ weights
+
+
+def leader_indices(embeddings, eps=0.25, texts=None, n_tables=DEDUP_LSH_TABLES, n_bits=DEDUP_LSH_BITS):
+    """
+    Greedy leader clustering. Tweets are visited in order; a tweet joins the first
+    cluster whose leader has cosine distance <= eps to it, otherwise it becomes a
+    new leader. Only leaders sharing an LSH bucket are compared, so a tweet is
+    checked against a few candidates rather than every leader. Identical `texts`
+    are dropped before any vector math. Returns the leader indices in input order.
+
+    Unlike DBSCAN, clusters do not chain through intermediate tweets, so near the
+    eps boundary fewer tweets are dropped: about 85% of DBSCAN's drops with the
+    default LSH settings, 87% when every leader is compared. Clear duplicates give
+    identical output. At feed sizes (100-5k tweets) this is at best 1-3x faster
+    than sklearn's DBSCAN; see benchmarks/bench_dedup.py.
+    """
+    if len(embeddings) == 0:
+        return []
+    vectors = normalize(embeddings)
+    signatures = lsh_signatures(vectors, n_tables, n_bits)
+    min_similarity = 1.0 - eps
+
+    buckets = [defaultdict(list) for _ in range(n_tables)]
+    seen_texts = set()
+    leaders = []
+    for idx, vector in enumerate(vectors):
+        if texts is not None and texts[idx] in seen_texts:
+            continue
+        # A leader may sit in several of this tweet's buckets; repeats are cheaper than a set
+        candidates = []
+        for table, bucket_id in enumerate(signatures[idx].tolist()):
+            candidates.extend(buckets[table].get(bucket_id, ()))
+        if candidates and (vectors[candidates] @ vector).max() >= min_similarity:
+            continue
+
+        leaders.append(idx)
+        if texts is not None:
+            seen_texts.add(texts[idx])
+        for table, bucket_id in enumerate(signatures[idx].tolist()):
+            buckets[table][bucket_id].append(idx)
+    return leaders
+
+
+def dbscan_indices(embeddings, eps=0.25):
+    """The previous O(n^2) baseline: first tweet of every DBSCAN cluster."""
+    if len(embeddings) == 0:
+        return []
+    clustering = DBSCAN(eps=eps, min_samples=1, metric='cosine').fit(embeddings)
+    firsts = []
+    seen_clusters = set()
+    for idx, label in enumerate(clustering.labels_):
+        if label not in seen_clusters:
+            seen_clusters.add(label)
+            firsts.append(idx)
+    return firsts
@@ -4,6 +4,7 @@ import os
 import psycopg2
 import sys
 from dotenv import load_dotenv
+from migrate import apply_migrations
 load_dotenv(override=True)
 def setup_logging():
     logging.basicConfig(
@@ -11,7 +12,7 @@ def setup_logging():
         format='%(asctime)s - %(levelname)s - %(message)s',
     ) 
 
-def initialize_db():
+def initialize_db(conn=None):
     dbname = os.getenv('POSTGRES_DB')
     user = os.getenv('POSTGRES_USER')
     password = os.getenv('POSTGRES_PASSWORD')
@@ -21,63 +22,27 @@ def initialize_db():
     # Connect via Unix socket explicitly
     try:
         logging.info("Initializing database and tables.")
-        conn = psycopg2.connect(
-            dbname=dbname,
-            user=user,
-            password=password,
-            host='localhost',  # <-- FIXED HERE
-            port='5432',  # <-- FIXED HERE
-            # host='/var/run/postgresql'  # <-- FIXED HERE  # Uncomment if using Unix socket
-            
-
-        )
+        # Tests pass their own connection; the container entrypoint connects here
+        owns_connection = conn is None
+        if owns_connection:
+            conn = psycopg2.connect(
+                dbname=dbname,
+                user=user,
+                password=password,
+                host='localhost',  # <-- FIXED HERE
+                port='5432',  # <-- FIXED HERE
+                # host='/var/run/postgresql'  # <-- FIXED HERE  # Uncomment if using Unix socket
+
+
+            )
         logging.info("Connected to the database.")
-        cursor = conn.cursor()
-        logging.info("Creating table.")
-        create_table_query = '''
-        CREATE TABLE IF NOT EXISTS articles (
-            id SERIAL PRIMARY KEY,
-            title TEXT NOT NULL CHECK (title <> ''),
-            publication_timestamp TIMESTAMP NOT NULL,
-            weblink TEXT NOT NULL CHECK (weblink <> ''),
-            image BYTEA,
-            tags TEXT[],
-            summary TEXT,
-            UNIQUE (title, weblink),
-            TweetSummary TEXT,
-            NewsSummary TEXT
-        );
-        '''
-
-
-
-        cursor.execute(create_table_query)
-        conn.commit()
-        cursor.close()
-
-
-        logging.info("Creating Tweet table.")
-        create_tweet_table_query = '''
-        CREATE TABLE IF NOT EXISTS tweets (
-            id SERIAL PRIMARY KEY,
-            article_id INTEGER REFERENCES articles(id) ON DELETE CASCADE,
-            tweet_text TEXT NOT NULL CHECK (tweet_text <> ''),
-            tweet_likes INTEGER,
-            tweet_retweets INTEGER,
-            tweet_replies INTEGER
-                    );
-
-        '''
-        cursor = conn.cursor()
-        cursor.execute(create_tweet_table_query)
-        conn.commit()
-        cursor.close()
-
-
-        logging.info("Created Tweet table.")
-
+        # Tables, columns and indexes are all created by the numbered migrations in
+        # migrate.py, which the reader and the web app also apply at startup
+        logging.info("Applying schema migrations.")
+        apply_migrations(conn)
 
-        conn.close()
+        if owns_connection:
+            conn.close()
         logging.info("Database and tables initialized successfully.")
         # print("Database and tables initialized successfully.")
 
@@ -0,0 +1,130 @@
+import os
+import time
+import logging
+import threading
+import concurrent.futures
+
+FEED_MAX_BACKOFF = int(os.getenv('FEED_MAX_BACKOFF', 3600))
+FEED_FETCH_WORKERS = int(os.getenv('FEED_FETCH_WORKERS', 8))
+
+
+class FeedState:
+    """Schedule and HTTP validators of one RSS feed."""
+
+    def __init__(self, url, interval):
+        self.url = url
+        self.interval = interval
+        self.etag = None
+        self.modified = None
+        self.failures = 0
+        self.next_run = 0.0
+
+    def schedule_next(self, now, failed):
+        if failed:
+            self.failures += 1
+            delay = min(self.interval * 2 ** self.failures, max(FEED_MAX_BACKOFF, self.interval))
+        else:
+            self.failures = 0
+            delay = self.interval
+        self.next_run = now + delay
+        return delay
+
+
+def parse_feed_config(value, default_interval):
+    """
+    Parse RSS_FEED_URLS: a comma separated list of feed URLs, each optionally
+    followed by `|<seconds>` to override the poll interval for that feed.
+    """
+    feeds = []
+    for item in value.split(','):
+        item = item.strip()
+        if not item:
+            continue
+        url, _, interval = item.partition('|')
+        feeds.append(FeedState(url.strip(), int(interval) if interval.strip() else default_interval))
+    return feeds
+
+
+class FeedScheduler:
+    """
+    Polls every configured feed on its own interval. Feeds that are due at the same
+    time are fetched concurrently, so a cycle takes as long as the slowest feed;
+    failing feeds back off exponentially up to FEED_MAX_BACKOFF seconds.
+    """
+
+    def __init__(self, feeds, fetch_feed, max_workers=FEED_FETCH_WORKERS):
+        self.feeds = feeds
+        self.fetch_feed = fetch_feed
+        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=max_workers)
+
+    def _run_one(self, feed):
+        try:
+            changed = self.fetch_feed(feed)
+            failed = False
+        except Exception as e:
+            logging.error(f"Error fetching and storing feed {feed.url}: {e}")
+            changed = False
+            failed = True
+        delay = feed.schedule_next(time.monotonic(), failed)
+        logging.info(f"Next poll of {feed.url} in {delay} seconds")
+        return changed
+
+    def run_due(self):
+        """Fetch all feeds that are due. Returns (number of feeds fetched, number that changed)."""
+        now = time.monotonic()
+        due = [feed for feed in self.feeds if feed.next_run <= now]
+        if not due:
+            return 0, 0
+        changed = list(self.executor.map(self._run_one, due))
+        return len(due), sum(changed)
+
+    def seconds_until_next(self):
+        return max(0.0, min(feed.next_run for feed in self.feeds) - time.monotonic())
+
+    def run_forever(self, after_cycle=None):
+        """Poll feeds forever. `after_cycle` runs on this thread after each poll, so it must return quickly."""
+        if not self.feeds:
+            raise ValueError("No RSS feeds configured")
+        while True:
+            fetched, changed = self.run_due()
+            if fetched:
+                logging.info(f"Polled {fetched} feeds, {changed} had new content")
+                if after_cycle is not None:
+                    after_cycle()
+            wait = self.seconds_until_next()
+            logging.info(f"Sleeping for {wait:.0f} seconds...")
+            time.sleep(wait)
+
+
+class BackgroundStage:
+    """
+    Runs `fn` on its own daemon thread, apart from feed polling: whenever
+    trigger() is called and at least every `interval` seconds. Triggers that
+    arrive while a run is in progress are coalesced into one follow-up run.
+    """
+
+    def __init__(self, name, fn, interval):
+        self.name = name
+        self.fn = fn
+        self.interval = interval
+        self._wake = threading.Event()
+        self._thread = None
+
+    def trigger(self):
+        self._wake.set()
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+
+    def run_once(self):
+        self._wake.clear()
+        try:
+            self.fn()
+        except Exception as e:
+            logging.error(f"Background stage {self.name} failed: {e}")
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.interval)
+            self.run_once()
@@ -0,0 +1,204 @@
+import os
+import io
+import time
+import hashlib
+import logging
+import threading
+import concurrent.futures
+from collections import OrderedDict
+from urllib.parse import urlsplit
+import requests
+from requests.adapters import HTTPAdapter
+from PIL import Image, UnidentifiedImageError
+
+# Ingest-time image settings
+IMAGE_MAX_DIMENSION = int(os.getenv('IMAGE_MAX_DIMENSION', 1024))
+IMAGE_THUMBNAIL_DIMENSION = int(os.getenv('IMAGE_THUMBNAIL_DIMENSION', 256))
+IMAGE_FORMAT = os.getenv('IMAGE_FORMAT', 'WEBP').upper()
+IMAGE_QUALITY = int(os.getenv('IMAGE_QUALITY', 80))
+
+# Download settings
+IMAGE_FETCH_WORKERS = int(os.getenv('IMAGE_FETCH_WORKERS', 8))
+IMAGE_PER_HOST_LIMIT = int(os.getenv('IMAGE_PER_HOST_LIMIT', 4))
+IMAGE_FETCH_TIMEOUT = int(os.getenv('IMAGE_FETCH_TIMEOUT', 10))
+IMAGE_FEED_DEADLINE = int(os.getenv('IMAGE_FEED_DEADLINE', 60))
+# Downloads larger than this are abandoned instead of being read into memory
+IMAGE_MAX_BYTES = int(os.getenv('IMAGE_MAX_BYTES', 10 * 1024 * 1024))
+IMAGE_CHUNK_SIZE = 64 * 1024
+# Image URLs whose validators are kept for conditional requests (LRU)
+IMAGE_VALIDATORS_MAX = int(os.getenv('IMAGE_VALIDATORS_MAX', 10000))
+
+
+def _encode(img, max_dimension):
+    """Downsize `img` to fit in max_dimension x max_dimension and re-encode it."""
+    img = img.copy()
+    img.thumbnail((max_dimension, max_dimension))
+    if IMAGE_FORMAT == 'JPEG' and img.mode not in ('RGB', 'L'):
+        img = img.convert('RGB')
+    buffer = io.BytesIO()
+    img.save(buffer, format=IMAGE_FORMAT, quality=IMAGE_QUALITY)
+    return buffer.getvalue()
+
+
+def process_image(data):
+    """
+    Decode a downloaded feed image, downsize it to IMAGE_MAX_DIMENSION and re-encode
+    it as IMAGE_FORMAT at IMAGE_QUALITY, plus a thumbnail variant.
+
+    Returns a dict with the sha256 of the original bytes (used to store repeated
+    images once), the re-encoded image and the thumbnail. Images Pillow cannot
+    decode are kept as-is without a thumbnail; decompression bombs (more pixels
+    than Image.MAX_IMAGE_PIXELS allows) are rejected with None.
+    """
+    content_hash = hashlib.sha256(data).hexdigest()
+    try:
+        with Image.open(io.BytesIO(data)) as img:
+            img.load()
+            if img.mode not in ('RGB', 'RGBA', 'L'):
+                img = img.convert('RGBA' if 'transparency' in img.info else 'RGB')
+            image = _encode(img, IMAGE_MAX_DIMENSION)
+            thumbnail = _encode(img, IMAGE_THUMBNAIL_DIMENSION)
+    except Image.DecompressionBombError as e:
+        logging.warning(f"Rejecting image {content_hash[:12]}: {e}")
+        return None
+    except (UnidentifiedImageError, OSError, ValueError) as e:
+        logging.warning(f"Could not re-encode image {content_hash[:12]}, storing original: {e}")
+        return {"hash": content_hash, "image": data, "thumbnail": None}
+
+    # Never store a re-encoded image that is larger than the original
+    if len(image) >= len(data):
+        image = data
+
+    return {"hash": content_hash, "image": image, "thumbnail": thumbnail}
+
+
+# One keep-alive connection pool shared by every image download
+session = requests.Session()
+session.mount('http://', HTTPAdapter(pool_connections=IMAGE_FETCH_WORKERS, pool_maxsize=IMAGE_FETCH_WORKERS))
+session.mount('https://', HTTPAdapter(pool_connections=IMAGE_FETCH_WORKERS, pool_maxsize=IMAGE_FETCH_WORKERS))
+
+_host_semaphores = {}
+_host_semaphores_lock = threading.Lock()
+
+# url -> (etag, last_modified, content hash) of downloads whose image row is known to
+# be committed, so a repeated image URL costs a conditional request answered with 304.
+# Entries are added only after the insert commits (remember_validators) and dropped
+# when it fails (forget_validators), so a 304 never refers to a missing images row.
+_validators = OrderedDict()
+_validators_lock = threading.Lock()
+
+
+def _host_semaphore(url):
+    host = urlsplit(url).netloc
+    with _host_semaphores_lock:
+        if host not in _host_semaphores:
+            _host_semaphores[host] = threading.BoundedSemaphore(IMAGE_PER_HOST_LIMIT)
+        return _host_semaphores[host]
+
+
+def _get_validators(url):
+    with _validators_lock:
+        validators = _validators.get(url)
+        if validators is not None:
+            _validators.move_to_end(url)
+        return validators
+
+
+def remember_validators(images):
+    """Keep the validators of downloaded images once their rows are committed."""
+    with _validators_lock:
+        for image in images:
+            if image and "image" in image and (image.get("etag") or image.get("last_modified")):
+                _validators[image["url"]] = (image["etag"], image["last_modified"], image["hash"])
+                _validators.move_to_end(image["url"])
+        while len(_validators) > IMAGE_VALIDATORS_MAX:
+            _validators.popitem(last=False)
+
+
+def forget_validators(images):
+    """Drop validators of images whose insert failed, so the next poll does a full GET."""
+    with _validators_lock:
+        for image in images:
+            if image:
+                _validators.pop(image.get("url"), None)
+
+
+def _read_capped(resp, max_bytes):
+    """The body of a streamed response, or None once it exceeds max_bytes."""
+    length = resp.headers.get('Content-Length')
+    if length and length.isdigit() and int(length) > max_bytes:
+        return None
+    chunks = []
+    size = 0
+    for chunk in resp.iter_content(IMAGE_CHUNK_SIZE):
+        size += len(chunk)
+        if size > max_bytes:
+            return None
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+
+def fetch_image(url):
+    """
+    Download and process one image. Returns the process_image dict (with the URL and
+    its validators), a dict with only the hash and URL when the server answers 304
+    for an image we already stored, or None.
+    """
+    headers = {}
+    validators = _get_validators(url)
+    if validators:
+        etag, last_modified, _ = validators
+        if etag:
+            headers['If-None-Match'] = etag
+        if last_modified:
+            headers['If-Modified-Since'] = last_modified
+
+    try:
+        with _host_semaphore(url), session.get(url, headers=headers, timeout=IMAGE_FETCH_TIMEOUT, stream=True) as resp:
+            if resp.status_code == 304 and validators:
+                return {"hash": validators[2], "url": url}
+            if resp.status_code != 200:
+                return None
+            data = _read_capped(resp, IMAGE_MAX_BYTES)
+    except Exception as e:
+        logging.warning(f"Image download failed for {url}: {e}")
+        return None
+
+    if data is None:
+        logging.warning(f"Skipping image {url}: larger than {IMAGE_MAX_BYTES} bytes")
+        return None
+    image = process_image(data)
+    if image is None:
+        return None
+    image.update(url=url, etag=resp.headers.get('ETag'), last_modified=resp.headers.get('Last-Modified'))
+    return image
+
+
+def fetch_images(urls, deadline=IMAGE_FEED_DEADLINE):
+    """
+    Download the images of one feed concurrently.
+
+    Returns a list aligned with `urls`; entries are None for missing URLs, failed
+    downloads and downloads that did not finish within `deadline` seconds.
+    """
+    results = [None] * len(urls)
+    wanted = [(i, url) for i, url in enumerate(urls) if url]
+    if not wanted:
+        return results
+
+    start = time.monotonic()
+    executor = concurrent.futures.ThreadPoolExecutor(max_workers=IMAGE_FETCH_WORKERS)
+    futures = {executor.submit(fetch_image, url): i for i, url in wanted}
+    done, not_done = concurrent.futures.wait(futures, timeout=deadline)
+    for future in done:
+        try:
+            results[futures[future]] = future.result()
+        except Exception as e:
+            # One bad image must not cost the feed its other images
+            logging.error(f"Image processing failed for {urls[futures[future]]}: {e}")
+    if not_done:
+        logging.warning(f"Image deadline of {deadline}s reached, skipping {len(not_done)} images")
+    executor.shutdown(wait=False, cancel_futures=True)
+
+    logging.info(f"Downloaded {sum(1 for r in results if r)} of {len(wanted)} images in {time.monotonic() - start:.1f}s")
+    return results
@@ -0,0 +1,200 @@
+import os
+import time
+import logging
+import concurrent.futures
+import requests
+from psycopg2.extras import execute_values
+from tenacity import retry, wait_exponential, stop_after_attempt, retry_if_exception_type
+from db_pool import get_connection
+
+API_URL_NEWS = "http://127.0.0.1:8000/news/summarize"
+
+# Worker settings
+NEWS_SUMMARY_CONCURRENCY = int(os.getenv('NEWS_SUMMARY_CONCURRENCY', 4))
+NEWS_SUMMARY_BATCH_SIZE = int(os.getenv('NEWS_SUMMARY_BATCH_SIZE', 20))
+NEWS_SUMMARY_MAX_ATTEMPTS = int(os.getenv('NEWS_SUMMARY_MAX_ATTEMPTS', 5))
+# Claims older than this are assumed to belong to a dead worker and are taken over
+NEWS_SUMMARY_CLAIM_TIMEOUT = int(os.getenv('NEWS_SUMMARY_CLAIM_TIMEOUT', 1800))
+
+FAILED_SUMMARIES = {"No article text could be extracted.", "Summary failed"}
+# Statuses meaning the API is busy or starting, not that the article cannot be summarized
+RETRYABLE_STATUSES = {502, 503, 504}
+
+
+class SummaryUnavailable(Exception):
+    """The summarization API is overloaded or unreachable; the article is not at fault."""
+
+
+@retry(
+    wait=wait_exponential(multiplier=1, min=4, max=60),
+    stop=stop_after_attempt(5),
+    retry=retry_if_exception_type(SummaryUnavailable),
+    reraise=True,
+)
+def get_summary(url: str, text: str = None, timeout: int = 120):
+    """
+    POST the article to the summarization API and return its JSON body. Raises
+    SummaryUnavailable on timeouts, connection errors and 502/503/504 (retried
+    with exponential backoff first); other errors are returned as {"error": ...}.
+    """
+    payload = {"url": url}
+    if text:
+        # Previously extracted text: the API summarizes it without downloading the page
+        payload["text"] = text
+    try:
+        response = requests.post(
+            API_URL_NEWS,
+            json=payload,
+            timeout=timeout
+        )
+    except (requests.exceptions.Timeout, requests.exceptions.ConnectionError) as e:
+        logging.warning(f"Summarization API unavailable for {url}: {e}")
+        raise SummaryUnavailable(str(e)) from e
+    if response.status_code in RETRYABLE_STATUSES:
+        logging.warning(f"Summarization API busy ({response.status_code}) for {url}")
+        raise SummaryUnavailable(f"HTTP {response.status_code}")
+    try:
+        return response.json()
+    except ValueError:
+        return {"error": f"HTTP {response.status_code}: invalid JSON response"}
+
+
+def claim_articles(batch_size=NEWS_SUMMARY_BATCH_SIZE):
+    """
+    Atomically claim up to `batch_size` articles that still need a NewsSummary.
+
+    FOR UPDATE SKIP LOCKED lets several worker processes claim concurrently without
+    blocking on, or double-claiming, each other's rows. Returns [(id, weblink, article_text)].
+    """
+    with get_connection() as conn, conn.cursor() as cur:
+        cur.execute("""
+            UPDATE articles
+            SET news_summary_status = 'in_progress',
+                news_summary_claimed_at = NOW(),
+                news_summary_attempts = news_summary_attempts + 1
+            WHERE id IN (
+                SELECT id FROM articles
+                WHERE (NewsSummary IS NULL OR TRIM(NewsSummary) = '')
+                  AND (news_summary_status = 'pending'
+                       OR (news_summary_status = 'in_progress'
+                           AND news_summary_claimed_at < NOW() - %s * INTERVAL '1 second'))
+                  AND news_summary_attempts < %s
+                ORDER BY id
+                LIMIT %s
+                FOR UPDATE SKIP LOCKED
+            )
+            RETURNING id, weblink, article_text
+        """, (NEWS_SUMMARY_CLAIM_TIMEOUT, NEWS_SUMMARY_MAX_ATTEMPTS, batch_size))
+        claimed = cur.fetchall()
+        conn.commit()
+    return claimed
+
+
+def summarize_claimed(article):
+    """
+    Call the summarization API for one claimed article. Returns (id, summary or
+    None, newly extracted text or None, unavailable); `unavailable` is True when
+    the API was busy or unreachable rather than the article failing.
+    """
+    article_id, weblink, article_text = article
+    if not weblink.startswith("http"):
+        logging.error(f"Invalid URL: {weblink}")
+        return article_id, None, None, False
+    try:
+        result = get_summary(weblink, text=article_text)
+    except SummaryUnavailable as e:
+        logging.warning(f"Summarization API unavailable, releasing {weblink}: {e}")
+        return article_id, None, None, True
+    except Exception as e:
+        logging.error(f"Error summarizing {weblink}: {e}")
+        return article_id, None, None, False
+
+    text = result.get("text")
+    summary = result.get("summary")
+    if summary and summary not in FAILED_SUMMARIES:
+        logging.info(f"Summary generated for {weblink}: {summary}")
+        return article_id, summary, text, False
+    logging.warning(f"Summary could not be generated for {weblink}: {result.get('error', 'Summary failed')}")
+    return article_id, None, text, False
+
+
+def store_results(results):
+    """Write a batch of results back with one UPDATE per outcome. Returns rows updated."""
+    done = [(article_id, summary, text) for article_id, summary, text, _ in results if summary]
+    failed = [
+        (article_id, NEWS_SUMMARY_MAX_ATTEMPTS, text)
+        for article_id, summary, text, unavailable in results if not summary and not unavailable
+    ]
+    released = [(article_id,) for article_id, summary, _, unavailable in results if not summary and unavailable]
+
+    with get_connection() as conn, conn.cursor() as cur:
+        updated = 0
+        if done:
+            execute_values(cur, """
+                UPDATE articles AS a
+                SET NewsSummary = v.summary, news_summary_status = 'done',
+                    article_text = COALESCE(v.article_text, a.article_text)
+                FROM (VALUES %s) AS v(id, summary, article_text)
+                WHERE a.id = v.id
+            """, done)
+            updated = cur.rowcount
+        if failed:
+            # Failed articles go back to the queue until they run out of attempts; text that
+            # was extracted before the failure is kept for the retry
+            execute_values(cur, """
+                UPDATE articles AS a
+                SET news_summary_status = CASE WHEN a.news_summary_attempts >= v.max_attempts THEN 'failed' ELSE 'pending' END,
+                    article_text = COALESCE(v.article_text, a.article_text)
+                FROM (VALUES %s) AS v(id, max_attempts, article_text)
+                WHERE a.id = v.id
+            """, failed)
+        if released:
+            # The API was busy, not the article: give the claim back without spending an attempt
+            execute_values(cur, """
+                UPDATE articles AS a
+                SET news_summary_status = 'pending',
+                    news_summary_attempts = GREATEST(a.news_summary_attempts - 1, 0)
+                FROM (VALUES %s) AS v(id)
+                WHERE a.id = v.id
+            """, released)
+        conn.commit()
+    return updated
+
+
+def drain_news_summaries(max_batches=None):
+    """
+    Claim batches of articles without a NewsSummary, summarize each batch with
+    NEWS_SUMMARY_CONCURRENCY parallel API calls and store it with batched UPDATEs,
+    until the queue is empty or the API reports it is overloaded. Returns the
+    number of summaries stored.
+    """
+    updated_count = 0
+    batches = 0
+    with concurrent.futures.ThreadPoolExecutor(max_workers=NEWS_SUMMARY_CONCURRENCY) as executor:
+        while max_batches is None or batches < max_batches:
+            claimed = claim_articles()
+            if not claimed:
+                break
+            logging.info(f"Claimed {len(claimed)} articles without NewsSummary.")
+            results = list(executor.map(summarize_claimed, claimed))
+            updated_count += store_results(results)
+            batches += 1
+            if any(unavailable for _, _, _, unavailable in results):
+                # Back off until the next poll instead of claiming more work from a busy API
+                logging.warning("Summarization API unavailable, pausing until the next poll.")
+                break
+
+    logging.info(f"Updated {updated_count} NewsSummaries in the database.")
+    return updated_count
+
+
+if __name__ == "__main__":
+    # Standalone worker: any number of these can drain the queue alongside the reader
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    poll_interval = int(os.getenv('NEWS_SUMMARY_POLL_INTERVAL', 60))
+    while True:
+        try:
+            drain_news_summaries()
+        except Exception as e:
+            logging.error(f"News summary worker error: {e}")
+        time.sleep(poll_interval)
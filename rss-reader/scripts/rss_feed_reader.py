@@ -13,16 +13,18 @@ import asyncio
 from tenacity import retry, wait_exponential, stop_after_attempt
 from tenacity import retry_if_exception_type
 import concurrent.futures
+from image_pipeline import fetch_images, remember_validators, forget_validators
+from feed_scheduler import FeedScheduler, FeedState, BackgroundStage, parse_feed_config
+from db_pool import get_connection
+from news_summary_worker import drain_news_summaries
+from tweet_store import store_article_tweets
+from migrate import apply_migrations
 
 RSS_FEED_URL = os.getenv('RSS_FEED_URL')
 # print(RSS_FEED_URL)
 POLL_INTERVAL = int(os.getenv('POLL_INTERVAL', 600))
 
-# Database credentials from environment variables
-DB_HOST = os.getenv('DB_HOST')
-DB_NAME = os.getenv('POSTGRES_DB')
-DB_USER = os.getenv('POSTGRES_USER')
-DB_PASSWORD = os.getenv('POSTGRES_PASSWORD')
+# Database credentials are read from the environment by db_pool
 
 # Feed dictionary paths (for flexibility)
 FEED_TITLE_PATH = os.getenv('FEED_TITLE_PATH', 'title')
@@ -35,8 +37,10 @@ FEED_IMAGE_FIELD= os.getenv('FEED_IMAGE_FIELD', 'media_content')
 import requests
 import logging
 
-API_URL_TWEETS = "http://127.0.0.1:8000/twitter/tweets"
-API_URL_NEWS = "http://127.0.0.1:8000/news/summarize"
+API_URL_TWEET_JOBS = "http://127.0.0.1:8000/twitter/jobs"
+TWEET_JOB_POLL_INTERVAL = int(os.getenv('TWEET_JOB_POLL_INTERVAL', 5))
+# How long one cycle waits for its tweet jobs before leaving them to the next cycle
+TWEET_JOB_TIMEOUT = int(os.getenv('TWEET_JOB_TIMEOUT', 1800))
 
 
 print("Starting RSS Feed Reader...", flush=True)
@@ -50,157 +54,92 @@ def setup_logging():
         ]
     )
 
-@retry(
-    wait=wait_exponential(multiplier=1, min=4, max=60),
-    stop=stop_after_attempt(5),
-)
-def get_summary(url: str, timeout: int = 120):
-    try:
-        response = requests.post(
-            API_URL_NEWS,
-            json={"url": url},
-            timeout=timeout
-        )
-        return response.json()
-    except requests.exceptions.Timeout:
-        logging.warning(f"Timeout summarizing {url}")
-        return {"error": "Timeout occurred"}
-    except Exception as e:
-        logging.error(f"Error for {url}: {str(e)}")
-        return {"error": str(e)}
-
-import psycopg2
-import logging
+def update_news_summaries():
+    """Drain the queue of articles without a NewsSummary (see news_summary_worker)."""
+    return drain_news_summaries()
 
-def get_weblinks_without_news_summary():
-    """Fetch all weblinks from articles where NewsSummary is NULL, empty, or only whitespace."""
+def get_existing_articles(pairs):
+    """Return the subset of (title, weblink) pairs that are already in the articles table."""
+    if not pairs:
+        return set()
     try:
-        conn = psycopg2.connect(
-            dbname=DB_NAME,
-            user=DB_USER,
-            password=DB_PASSWORD,
-            host=DB_HOST,
-            port="5432"
-        )
-        cur = conn.cursor()
-        cur.execute("""
-            SELECT weblink FROM articles
-            WHERE NewsSummary IS NULL OR TRIM(NewsSummary) = ''
-        """)
-        weblinks = [row[0] for row in cur.fetchall()]
+        with get_connection() as conn, conn.cursor() as cur:
+            existing = execute_values(cur, """
+                SELECT a.title, a.weblink FROM articles a
+                JOIN (VALUES %s) AS v(title, weblink) ON a.title = v.title AND a.weblink = v.weblink
+            """, pairs, fetch=True)
+            existing = set(existing)
     except Exception as e:
         logging.error(f"Database error: {e}")
-        weblinks = []
-    finally:
-        if 'cur' in locals(): cur.close()
-        if 'conn' in locals(): conn.close()
-    return weblinks
-
-def update_news_summaries():
-    """For each article without a NewsSummary, generate and store the summary."""
-    weblinks = get_weblinks_without_news_summary()
-    if not weblinks:
-        logging.info("No articles require NewsSummary updates.")
-        return
-    updated_count = 0
-    logging.info(f"Found {len(weblinks)} articles without NewsSummary.")
-    for weblink in weblinks:
-        if not weblink.startswith("http"):
-            logging.error(f"Invalid URL: {weblink}")
-            continue
-
-        try:
-            result = get_summary(weblink)
-            if "summary" in result:
-                summary=result["summary"]
-            else:
-                summary= (result.get("error", "Summary failed"))
-            if summary and summary != "No article text could be extracted." and summary != "Summary failed":
-                logging.info(f"Summary generated for {weblink}: {summary}")
-                # Update the NewsSummary in the database
-                try:
-                    conn = psycopg2.connect(
-                        dbname=DB_NAME,
-                        user=DB_USER,
-                        password=DB_PASSWORD,
-                        host=DB_HOST,
-                        port="5432"
-                    )
-                    cur = conn.cursor()
-                    cur.execute("""
-                        UPDATE articles SET NewsSummary = %s
-                        WHERE weblink = %s
-                    """, (summary, weblink))
-                    updated_count += cur.rowcount
-                    logging.info(f"Updated NewsSummary for {weblink}")
-                    conn.commit()
-                except Exception as e:
-                    logging.error(f"Failed to update NewsSummary for {weblink}: {e}")
-                finally:
-                    if 'cur' in locals(): cur.close()
-                    if 'conn' in locals(): conn.close()
-            else:
-                logging.warning(f"Summary could not be generated for {weblink}")
-        except Exception as e:
-            logging.error(f"Error summarizing {weblink}: {e}")
-
-    logging.info(f"Updated {updated_count} NewsSummaries in the database.")
+        existing = set()
+    return existing
 
 def insert_articles(titles, timestamps, weblinks, images, tags_list, summaries , TweetSummaries=None, NewsSummaries=None):
+    """
+    Insert one feed's images and articles in a single transaction. Errors are
+    logged and re-raised, so the caller does not record the feed as read.
+    """
     try:
-        # print(f"Connecting to database at {DB_HOST}...", flush=True)
-        logging.info(f"Connecting to database at {DB_HOST}...")
-        conn = psycopg2.connect(
-            dbname=DB_NAME,
-            user=DB_USER,
-            password=DB_PASSWORD,
-            host=DB_HOST,
-            port="5432"
-            
+        with get_connection() as conn, conn.cursor() as cur:
+            # Images are content-addressed: the same picture used by several articles or
+            # feeds is stored once in the images table and referenced by hash.
+            image_records = {
+                image["hash"]: (image["hash"], psycopg2.Binary(image["image"]), psycopg2.Binary(image["thumbnail"]) if image["thumbnail"] else None)
+                for image in images if image and "image" in image
+            }
+            if image_records:
+                execute_values(cur, """
+                INSERT INTO images (hash, image, thumbnail)
+                VALUES %s
+                ON CONFLICT (hash) DO NOTHING;
+                """, list(image_records.values()))
+
+            # Define the SQL query template
+            insert_query = """
+            INSERT INTO articles (title, publication_timestamp, weblink, image_hash, tags, summary, TweetSummary, NewsSummary) 
+            VALUES %s
+            ON CONFLICT (title, weblink) DO NOTHING;          
+            """
 
-        )
-        # print("Database connection successful!", flush=True)
-        logging.info("Database connection successful!")
-        cur = conn.cursor()
-
-        # Define the SQL query template
-        insert_query = """
-        INSERT INTO articles (title, publication_timestamp, weblink, image, tags, summary, TweetSummary, NewsSummary) 
-        VALUES %s
-        ON CONFLICT (title, weblink) DO NOTHING;          
-        """
-
-
-        # Prepare data for batch insertion
-        records = [
-            (titles[i], timestamps[i], weblinks[i], psycopg2.Binary(images[i]) if images[i] else None, tags_list[i], summaries[i], TweetSummaries[i] if TweetSummaries else None, NewsSummaries[i] if NewsSummaries else None)
-            for i in range(len(titles))
-        ]
 
-        # Execute batch insert
-        execute_values(cur, insert_query, records)
+            # Prepare data for batch insertion
+            records = [
+                (titles[i], timestamps[i], weblinks[i], images[i]["hash"] if images[i] else None, tags_list[i], summaries[i], TweetSummaries[i] if TweetSummaries else None, NewsSummaries[i] if NewsSummaries else None)
+                for i in range(len(titles))
+            ]
 
-        # Commit changes
-        conn.commit()
+            # Execute batch insert
+            execute_values(cur, insert_query, records)
 
-        inserted_count = cur.rowcount
+            # Commit changes
+            conn.commit()
 
-        cur.close()
-        conn.close()
+            inserted_count = cur.rowcount
 
         # print(f"{inserted_count} articles inserted successfully!")
         logging.info(f"{inserted_count} new articles inserted successfully!")
     except Exception as e:
-        logging.error("Error:", e)
+        logging.error(f"Error inserting articles: {e}")
         print("Error:", e)
-
-def fetch_and_store_feed():
-    feed = feedparser.parse(RSS_FEED_URL)
+        raise
+
+def fetch_and_store_feed(feed_state=None):
+    """
+    Fetch one feed with a conditional GET and store its entries.
+    Returns False when the feed answered 304 Not Modified, True otherwise.
+    """
+    if feed_state is None:
+        feed_state = FeedState(RSS_FEED_URL, POLL_INTERVAL)
+    logging.info(f"Fetching RSS feed from {feed_state.url}...")
+    feed = feedparser.parse(feed_state.url, etag=feed_state.etag, modified=feed_state.modified)
+    if feed.get('status') == 304:
+        logging.info(f"Feed {feed_state.url} not modified since last poll.")
+        return False
     if feed.bozo:
         logging.error(f"Failed to parse RSS feed: {feed.bozo_exception}")
         # print("Failed to parse RSS feed:", feed.bozo_exception)
-        return
-    
+        raise ValueError(f"Failed to parse RSS feed {feed_state.url}: {feed.bozo_exception}")
+
     titles = []
     publication_date = []
     weblinks = []
@@ -233,70 +172,85 @@ def fetch_and_store_feed():
                         tag_to_append.append(t)    
         tags.append(tag_to_append)
 
-   
-        if image_url:
-            # print(f"Downloading image: {image_url}")
-            try:
-                img_resp = requests.get(image_url, timeout=10)
-                if img_resp.status_code == 200:
-                    image_data = img_resp.content
-                    # print(image_data)
-                else:
-                    image_data = None
-            except Exception as e:
-                print(f"Image download failed: {e}")
-                image_data = None
-        else:
-            image_data = None
-
-        images.append(image_data)
+    # Articles already stored are skipped by the insert, so don't download their images
+    existing = get_existing_articles(list(zip(titles, weblinks)))
+    images_url = [
+        None if (title, weblink) in existing else image_url
+        for title, weblink, image_url in zip(titles, weblinks, images_url)
+    ]
+    images = fetch_images(images_url)
 
     logging.info(f"Fetched {len(titles)} articles from the feed.")
     logging.info("Getting summaries for the articles...")
 
     logging.info(f"Inserting {len(titles)} articles into the database...")
-    insert_articles(titles= titles, timestamps=publication_date, weblinks = weblinks, images = images, tags_list=tags, summaries=summaries , TweetSummaries=None, NewsSummaries=None)
+    try:
+        insert_articles(titles= titles, timestamps=publication_date, weblinks = weblinks, images = images, tags_list=tags, summaries=summaries , TweetSummaries=None, NewsSummaries=None)
+    except Exception:
+        forget_validators(images)
+        raise
+    remember_validators(images)
     logging.info("Articles inserted successfully!")
+    # Only once the entries are committed; after a failed insert the next poll
+    # must download the feed again instead of getting a 304.
+    feed_state.etag = feed.get('etag')
+    feed_state.modified = feed.get('modified')
+    return True
 
         
-def fetch_processed_tweets(title):
+def submit_tweet_jobs(titles):
+    """Queue one tweet job per title on the API server. Returns {job_id: title}."""
     try:
-        logging.info(f"Fetching tweets for '{title}'...")
         response = requests.post(
-            API_URL_TWEETS,
-            json={"title": title, "max_tweets": 20},
-            timeout=120
+            API_URL_TWEET_JOBS,
+            json={"titles": titles, "max_tweets": 20},
+            timeout=30
         )
-        if response.status_code == 404:
-            logging.warning(f"No tweets found for '{title}' (404)")
-            return None
-        elif response.status_code != 200:
-            logging.error(f"Error fetching tweets for '{title}': {response.status_code} {response.text}")
-            return None
-        return response.json()
-    except requests.exceptions.Timeout:
-        logging.warning(f"Timeout fetching tweets for '{title}'")
-        return None
+        response.raise_for_status()
+        return {job["id"]: job["title"] for job in response.json()["jobs"]}
     except requests.exceptions.RequestException as e:
-        logging.error(f"Request error for '{title}': {e}")
-        return None
+        logging.error(f"Error submitting tweet jobs: {e}")
+        return {}
+
+def collect_tweet_jobs(jobs, timeout=TWEET_JOB_TIMEOUT, poll_interval=TWEET_JOB_POLL_INTERVAL):
+    """
+    Poll the submitted jobs and yield lists of (title, result or None) as they finish.
+    Jobs still running at the timeout are left alone: the next cycle resubmits their
+    titles and the server hands back the same unfinished job.
+    """
+    pending = dict(jobs)
+    deadline = time.monotonic() + timeout
+    while pending and time.monotonic() < deadline:
+        try:
+            response = requests.get(API_URL_TWEET_JOBS, params={"ids": ",".join(pending)}, timeout=30)
+            response.raise_for_status()
+            statuses = response.json()["jobs"]
+        except requests.exceptions.RequestException as e:
+            logging.error(f"Error polling tweet jobs: {e}")
+            statuses = []
+
+        finished = []
+        for job in statuses:
+            if job["status"] == "done":
+                finished.append((pending.pop(job["id"]), job["result"]))
+            elif job["status"] == "failed":
+                logging.error(f"Tweet job for '{job['title']}' failed: {job['error']}")
+                finished.append((pending.pop(job["id"]), None))
+        if finished:
+            yield finished
+        if pending:
+            time.sleep(poll_interval)
+
+    if pending:
+        logging.warning(f"{len(pending)} tweet jobs still running; they will be collected next cycle.")
 
 def get_titles_without_tweet_summary():
-    conn = psycopg2.connect(
-        dbname=DB_NAME,
-        user=DB_USER,
-        password=DB_PASSWORD,
-        host=DB_HOST,
-        port="5432"
-    )
-    cur = conn.cursor()
-    cur.execute("""
-        SELECT title FROM articles
-        WHERE TweetSummary IS NULL OR TRIM(TweetSummary) = ''
-    """)
-    titles = [row[0] for row in cur.fetchall()]
-    cur.close()
-    conn.close()
+    with get_connection() as conn, conn.cursor() as cur:
+        cur.execute("""
+            SELECT title FROM articles
+            WHERE TweetSummary IS NULL OR TRIM(TweetSummary) = ''
+        """)
+        titles = [row[0] for row in cur.fetchall()]
     return titles
         
 def get_tweets_and_summaries():
@@ -309,99 +263,55 @@ def get_tweets_and_summaries():
     logging.info(f"Found {len(titles)} titles without tweet summaries.")
 
     # titles  = titles[:5]  # Limit to first 5 titles for testing
+    # The whole cycle's titles are queued at once; results are stored as jobs finish
+    jobs = submit_tweet_jobs(titles)
+    logging.info(f"Submitted {len(jobs)} tweet jobs.")
+    for finished in collect_tweet_jobs(jobs):
+        store_tweet_results(finished)
+
+def store_tweet_results(finished):
+    """Store the tweets and TweetSummary of finished jobs, given as [(title, result or None)]."""
+    titles = []
     tweets = []
-    tweets_likes = []
-    tweets_replies = []
-    tweets_retweets = []
     tweets_summary = []
-    logging.info("Getting tweets for the articles...")    
-    
-
-    # Usage in your loop
-    for title in titles:
-        result = fetch_processed_tweets(title)
+    for title, result in finished:
+        titles.append(title)
         if result:
-            tweets.append(result["cleaned_tweets"])
+            # Older API servers only return the cleaned texts, without ids or stats
+            tweets.append(result.get("tweets") or [{"text": text} for text in result["cleaned_tweets"]])
             tweets_summary.append(result["summary"])
-            tweets_likes.append(result["raw_stats"]["likes"])
-            tweets_replies.append(result["raw_stats"]["replies"])
-            tweets_retweets.append(result["raw_stats"]["retweets"])
         else:
             logging.error(f"Failed to fetch tweets for '{title}'")
             tweets.append([])
-            tweets_likes.append(0)
-            tweets_replies.append(0)
-            tweets_retweets.append(0)
             tweets_summary.append("No summary available")
-        # Process raw stats as needed
 
     logging.info(f"Fetched tweets for {len(tweets)} articles.")
     logging.info("Inserting tweets into the database...")
 
     try:
-        conn = psycopg2.connect(
-            dbname=DB_NAME,
-            user=DB_USER,
-            password=DB_PASSWORD,
-            host=DB_HOST,
-            port="5432"
-        )
-        cur = conn.cursor()
-
-        # Get article ids from the database
-        cur.execute("SELECT id, title FROM articles")
-        article_ids = cur.fetchall()
-
-        # Create a dictionary mapping article titles to IDs
-        article_ids_dict = {title: id for id, title in article_ids}
-
-        # Prepare data for batch insertion
-        batch_insert_data = []
-
-        # Loop over each title and prepare tweet data for batch insertion
-        for i, title in enumerate(titles):
-            # Ensure the title exists in article_ids_dict
-            article_id = article_ids_dict.get(title)
-            
-            if article_id:
-                logging.info(f"Preparing tweet data for article '{title}' (ID: {article_id})...")
-
-                # Loop through each tweet for this article and prepare data for insertion
-                for j in range(len(tweets[i])):  # Loop over all tweets for the article
-                    tweet = tweets[i][j]
-                    tweet_likes = tweets_likes[i][j]
-                    tweet_replies = tweets_replies[i][j]
-                    tweet_retweets = tweets_retweets[i][j]
-
-                    # Add this tweet data as a tuple to the batch insert data list
-                    batch_insert_data.append((article_id, tweet, tweet_likes, tweet_replies, tweet_retweets))
-
-                logging.info(f"Prepared {len(tweets[i])} tweets for insertion for article '{title}' (ID: {article_id})")
-
-            else:
-                logging.error(f"Article ID for title '{title}' not found.")
+        with get_connection() as conn, conn.cursor() as cur:
+            # Get article ids from the database
+            cur.execute("SELECT id, title FROM articles WHERE title = ANY(%s)", (titles,))
+            article_ids_dict = {title: id for id, title in cur.fetchall()}
+
+            article_tweets = {}
+            for i, title in enumerate(titles):
+                article_id = article_ids_dict.get(title)
+                if article_id:
+                    article_tweets.setdefault(article_id, []).extend(tweets[i])
+                else:
+                    logging.error(f"Article ID for title '{title}' not found.")
 
-        # Now insert the prepared data using execute_batch (batch insertion)
-        if batch_insert_data:
-            logging.info("Inserting tweet data in batch...")
-            insert_query = """
-                INSERT INTO tweets (article_id, tweet_text, tweet_likes, tweet_replies, tweet_retweets)
-                VALUES (%s, %s, %s, %s, %s)
-            """
+            # Tweets seen before (for this or any other article) are reused, not inserted again.
+            # New links are scored by the relevance scoring worker (web-app score_tweets --watch).
             try:
-                execute_batch(cur, insert_query, batch_insert_data, page_size=100)  # page_size can be adjusted for optimal batch size
-                logging.info(f"Batch insert completed: {len(batch_insert_data)} rows inserted.")
-                
-                # Commit the transaction
+                linked_article_ids = store_article_tweets(cur, article_tweets)
                 conn.commit()
-
+                logging.info(f"Linked tweets to {len(linked_article_ids)} articles.")
             except Exception as e:
                 logging.error(f"Error inserting tweet data in batch: {e}")
-                conn.rollback()  # Rollback in case of error
+                conn.rollback()
 
-        # Close the cursor and connection
-        cur.close()
-        conn.close()
         logging.info("All tweet data has been inserted successfully.")
 
     except Exception as e:
@@ -409,73 +319,58 @@ def get_tweets_and_summaries():
         print(f"Error connecting to the database: {e}")
     # adding the tweets summaries to the database
     try:
-        conn = psycopg2.connect(
-            dbname=DB_NAME,
-            user=DB_USER,
-            password=DB_PASSWORD,
-            host=DB_HOST,
-            port="5432"
-        )
-        cur = conn.cursor()
-        update_query = """
-        UPDATE articles SET TweetSummary = %s WHERE title = %s;
-        """
+        with get_connection() as conn, conn.cursor() as cur:
+            update_query = """
+            UPDATE articles SET TweetSummary = %s WHERE title = %s;
+            """
         
-        records = [
-            (tweets_summary[i], titles[i])
-            for i in range(len(tweets_summary))
-        ]
+            records = [
+                (tweets_summary[i], titles[i])
+                for i in range(len(tweets_summary))
+            ]
     
-        # Execute batch insert
-        cur.executemany(update_query, records)
+            # Execute batch insert
+            cur.executemany(update_query, records)
 
-        # Commit changes
-        conn.commit()
+            # Commit changes
+            conn.commit()
 
-        inserted_count = cur.rowcount
-
-        cur.close()
-        conn.close()
+            inserted_count = cur.rowcount
 
         logging.info(f"{inserted_count} tweets summaries inserted successfully!")
     except Exception as e:
-        logging.error("Error:", e)
+        logging.error(f"Error updating tweet summaries: {e}")
         print("Error:", e)
             
 
+def update_summaries():
+    """Fill in missing news and tweet summaries for everything stored so far."""
+    with concurrent.futures.ThreadPoolExecutor() as executor:
+        # Submit both functions to the thread pool
+        future1 = executor.submit(update_news_summaries)
+        future2 = executor.submit(get_tweets_and_summaries)
+
+        # Wait for both to finish (optional, for logging/completion)
+        concurrent.futures.wait([future1, future2])
+        logging.info("Both update_news_summaries and get_tweets_and_summaries are done.")
+
 if __name__ == "__main__":
-    import time
     setup_logging()
     logging.getLogger("twikit").setLevel(logging.WARNING)
 
-    POLL_INTERVAL=int(os.getenv("POLL_INTERVAL", 30))
-    POLL_INTERVAL = 300
-    # RSS_FEED_URL=os.getenv("RSS_FEED_URL")
-    rss_feed_urls = os.getenv("RSS_FEED_URLS", "").split(',')
-    # print(rss_feed_urls)
-    
-    while True:
-        for RSS_FEED_URL in rss_feed_urls:
-            print(f"Fetching RSS feed from {RSS_FEED_URL}...")
-            try:
-                logging.info(f"Fetching RSS feed from {RSS_FEED_URL}...")
-                # print(f"Fetching RSS feed from {RSS_FEED_URL}...")
-
-                fetch_and_store_feed()
-                with concurrent.futures.ThreadPoolExecutor() as executor:
-                # Submit both functions to the thread pool
-                    future1 = executor.submit(update_news_summaries)
-                    future2 = executor.submit(get_tweets_and_summaries)
-                    
-                    # Wait for both to finish (optional, for logging/completion)
-                    concurrent.futures.wait([future1, future2])
-                    logging.info("Both update_news_summaries and get_tweets_and_summaries are done.")
-            except Exception as e:
-                logging.error(f'Error fetching and storing feed: {e}')
-            break
-        logging.info(f"Sleeping for {POLL_INTERVAL} seconds...")
-        time.sleep(POLL_INTERVAL)
-
+    # Bring an existing database up to date; the advisory lock serializes this
+    # with the web app starting at the same time
+    with get_connection() as conn:
+        apply_migrations(conn)
 
+    # Each entry of RSS_FEED_URLS may carry its own interval as `url|seconds`
+    feeds = parse_feed_config(os.getenv("RSS_FEED_URLS", RSS_FEED_URL or ""), POLL_INTERVAL)
+    logging.info(f"Polling {len(feeds)} RSS feeds")
 
+    # Summaries can wait a long time on tweet jobs, so they run on their own thread;
+    # a poll cycle only wakes them up and feeds keep being polled on schedule.
+    summaries = BackgroundStage("summaries", update_summaries, POLL_INTERVAL)
+    summaries.start()
 
+    scheduler = FeedScheduler(feeds, fetch_and_store_feed)
+    scheduler.run_forever(after_cycle=summaries.trigger)
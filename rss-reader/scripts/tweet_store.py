@@ -0,0 +1,82 @@
+import hashlib
+import logging
+from psycopg2.extras import execute_values
+
+
+def tweet_fingerprint(text):
+    """md5 of the tweet text with case and whitespace normalized."""
+    normalized = " ".join(text.lower().split())
+    return hashlib.md5(normalized.encode("utf-8")).hexdigest()
+
+
+def store_article_tweets(cur, article_tweets):
+    """
+    Store tweets once and link them to their articles.
+
+    `article_tweets` maps article id -> list of tweet dicts with "text" and optionally
+    "id", "likes", "replies" and "retweets". A tweet is matched on its source id, or on
+    its fingerprint when it has no id; one already stored only gets its text and
+    engagement stats refreshed and a new link, whichever article or poll it came from.
+    Returns the set of article ids that gained new links.
+    """
+    by_source_id = {}
+    by_fingerprint = {}
+    links = set()
+    for article_id, tweets in article_tweets.items():
+        for tweet in tweets:
+            if not tweet.get("text"):
+                continue
+            fingerprint = tweet_fingerprint(tweet["text"])
+            source_id = str(tweet["id"]) if tweet.get("id") else None
+            row = (
+                fingerprint,
+                source_id,
+                tweet["text"],
+                tweet.get("likes"),
+                tweet.get("replies"),
+                tweet.get("retweets"),
+            )
+            if source_id:
+                by_source_id.setdefault(source_id, row)
+                links.add((article_id, ("id", source_id)))
+            else:
+                by_fingerprint.setdefault(fingerprint, row)
+                links.add((article_id, ("fingerprint", fingerprint)))
+    if not links:
+        return set()
+
+    tweet_ids = {}
+    if by_source_id:
+        stored = execute_values(cur, """
+            INSERT INTO tweets (text_hash, source_tweet_id, tweet_text, tweet_likes, tweet_replies, tweet_retweets)
+            VALUES %s
+            ON CONFLICT (source_tweet_id) WHERE source_tweet_id IS NOT NULL DO UPDATE SET
+                text_hash = EXCLUDED.text_hash,
+                tweet_text = EXCLUDED.tweet_text,
+                tweet_likes = EXCLUDED.tweet_likes,
+                tweet_replies = EXCLUDED.tweet_replies,
+                tweet_retweets = EXCLUDED.tweet_retweets
+            RETURNING source_tweet_id, id
+        """, list(by_source_id.values()), page_size=500, fetch=True)
+        tweet_ids.update((("id", source_id), tweet_id) for source_id, tweet_id in stored)
+    if by_fingerprint:
+        stored = execute_values(cur, """
+            INSERT INTO tweets (text_hash, source_tweet_id, tweet_text, tweet_likes, tweet_replies, tweet_retweets)
+            VALUES %s
+            ON CONFLICT (text_hash) WHERE source_tweet_id IS NULL DO UPDATE SET
+                tweet_likes = EXCLUDED.tweet_likes,
+                tweet_replies = EXCLUDED.tweet_replies,
+                tweet_retweets = EXCLUDED.tweet_retweets
+            RETURNING text_hash, id
+        """, list(by_fingerprint.values()), page_size=500, fetch=True)
+        tweet_ids.update((("fingerprint", fingerprint), tweet_id) for fingerprint, tweet_id in stored)
+
+    linked = execute_values(cur, """
+        INSERT INTO article_tweets (article_id, tweet_id)
+        VALUES %s
+        ON CONFLICT DO NOTHING
+        RETURNING article_id
+    """, [(article_id, tweet_ids[key]) for article_id, key in links], page_size=500, fetch=True)
+
+    logging.info(f"Stored {len(by_source_id) + len(by_fingerprint)} distinct tweets, {len(linked)} new article links.")
+    return {row[0] for row in linked}
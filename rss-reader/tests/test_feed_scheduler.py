@@ -0,0 +1,76 @@
+import os
+import sys
+import threading
+from unittest.mock import patch
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "scripts"))
+
+from feed_scheduler import FeedState, FeedScheduler, BackgroundStage, parse_feed_config
+
+# --- Failures double the delay up to FEED_MAX_BACKOFF; a success resets it ---
+@patch("feed_scheduler.FEED_MAX_BACKOFF", 500)
+def test_backoff_doubles_and_resets():
+    feed = FeedState("https://example.com/rss", 60)
+    assert [feed.schedule_next(0, failed=True) for _ in range(4)] == [120, 240, 480, 500]
+    assert feed.schedule_next(1000, failed=False) == 60
+    assert feed.failures == 0
+    assert feed.next_run == 1060
+
+# --- A feed polled less often than the cap never backs off below its interval ---
+@patch("feed_scheduler.FEED_MAX_BACKOFF", 500)
+def test_backoff_cap_is_at_least_the_interval():
+    feed = FeedState("https://example.com/rss", 900)
+    assert feed.schedule_next(0, failed=True) == 900
+
+# --- RSS_FEED_URLS with optional per-feed intervals ---
+def test_parse_feed_config():
+    feeds = parse_feed_config(" https://a.example/rss|30, https://b.example/rss ,, https://c.example/rss| ", 300)
+    assert [(feed.url, feed.interval) for feed in feeds] == [
+        ("https://a.example/rss", 30),
+        ("https://b.example/rss", 300),
+        ("https://c.example/rss", 300),
+    ]
+
+def test_parse_feed_config_rejects_bad_interval():
+    with pytest.raises(ValueError):
+        parse_feed_config("https://a.example/rss|soon", 300)
+
+# --- Only feeds that are due are fetched, and each is rescheduled by its outcome ---
+@patch("feed_scheduler.time.monotonic", return_value=100.0)
+def test_run_due_fetches_due_feeds(mock_monotonic):
+    changed, unchanged, failing, later = (FeedState(f"https://{name}.example/rss", 60) for name in ("a", "b", "c", "d"))
+    later.next_run = 200.0
+
+    def fetch_feed(feed):
+        if feed is failing:
+            raise IOError("timeout")
+        return feed is changed
+
+    scheduler = FeedScheduler([changed, unchanged, failing, later], fetch_feed, max_workers=2)
+    assert scheduler.run_due() == (3, 1)
+    assert (changed.next_run, unchanged.next_run, failing.next_run, later.next_run) == (160.0, 160.0, 220.0, 200.0)
+    assert scheduler.seconds_until_next() == 60.0
+
+    mock_monotonic.return_value = 150.0
+    assert scheduler.run_due() == (0, 0)
+
+# --- A triggered stage runs on its own thread and survives failures ---
+def test_background_stage_runs_on_trigger():
+    calls = []
+    ran = threading.Event()
+
+    def fn():
+        calls.append(threading.current_thread().name)
+        ran.set()
+        if len(calls) == 1:
+            raise RuntimeError("boom")
+
+    stage = BackgroundStage("summaries", fn, interval=60)
+    stage.start()
+    stage.trigger()
+    assert ran.wait(5)
+    ran.clear()
+    stage.trigger()
+    assert ran.wait(5)
+    assert calls == ["summaries", "summaries"]
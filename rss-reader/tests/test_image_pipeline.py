@@ -0,0 +1,97 @@
+import io
+import os
+import sys
+from unittest.mock import patch, MagicMock
+import pytest
+from PIL import Image
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "scripts"))
+
+import image_pipeline
+from image_pipeline import process_image, fetch_image, fetch_images
+
+
+def encoded_image(size, fmt="PNG"):
+    buffer = io.BytesIO()
+    Image.new("RGB", size, (200, 30, 30)).save(buffer, format=fmt)
+    return buffer.getvalue()
+
+
+def fake_response(status_code=200, body=b"", headers=None, chunk_size=4):
+    resp = MagicMock()
+    resp.__enter__.return_value = resp
+    resp.status_code = status_code
+    resp.headers = headers or {}
+    resp.iter_content.side_effect = lambda _: (body[i:i + chunk_size] for i in range(0, len(body), chunk_size))
+    return resp
+
+# --- A decodable image is downsized and gets a thumbnail ---
+@patch("image_pipeline.IMAGE_MAX_DIMENSION", 64)
+@patch("image_pipeline.IMAGE_THUMBNAIL_DIMENSION", 16)
+def test_process_valid_image():
+    data = encoded_image((300, 150), fmt="BMP")
+    result = process_image(data)
+    assert len(result["hash"]) == 64
+    with Image.open(io.BytesIO(result["image"])) as img:
+        assert img.size == (64, 32)
+    with Image.open(io.BytesIO(result["thumbnail"])) as img:
+        assert img.size == (16, 8)
+
+# --- Bytes Pillow cannot decode are kept as they are, without a thumbnail ---
+@pytest.mark.parametrize("data", [b"not an image at all", encoded_image((40, 40))[:30]])
+def test_process_corrupt_image(data):
+    result = process_image(data)
+    assert result["image"] == data
+    assert result["thumbnail"] is None
+
+# --- Decompression bombs are rejected instead of aborting the feed ---
+def test_process_decompression_bomb():
+    data = encoded_image((200, 200))
+    with patch.object(Image, "MAX_IMAGE_PIXELS", 1000):
+        assert process_image(data) is None
+
+# --- Downloads stop once they exceed IMAGE_MAX_BYTES ---
+@patch("image_pipeline.IMAGE_MAX_BYTES", 16)
+@pytest.mark.parametrize("headers", [{}, {"Content-Length": "17"}])
+def test_oversized_download_is_skipped(headers):
+    resp = fake_response(body=b"x" * 17, headers=headers)
+    with patch.object(image_pipeline.session, "get", return_value=resp), \
+         patch("image_pipeline.process_image") as mock_process:
+        assert fetch_image("https://img.example/big.jpg") is None
+    mock_process.assert_not_called()
+
+# --- One failing image leaves the others of the feed intact ---
+def test_fetch_images_survives_a_failing_image():
+    def fetch(url):
+        if url.endswith("bad"):
+            raise RuntimeError("boom")
+        return {"url": url}
+
+    with patch("image_pipeline.fetch_image", side_effect=fetch):
+        assert fetch_images(["https://a/ok", None, "https://a/bad"]) == [{"url": "https://a/ok"}, None, None]
+
+
+@pytest.fixture
+def no_validators():
+    image_pipeline._validators.clear()
+    yield
+    image_pipeline._validators.clear()
+
+# --- Committed images are revalidated with a conditional GET; a 304 reuses the stored hash ---
+def test_conditional_get_after_commit(no_validators):
+    url = "https://img.example/a.png"
+    first = fake_response(body=encoded_image((20, 20)), headers={"ETag": '"v1"', "Last-Modified": "Thu, 01 May 2025 10:00:00 GMT"})
+    with patch.object(image_pipeline.session, "get", side_effect=[first, fake_response(304)]) as mock_get:
+        image = fetch_image(url)
+        image_pipeline.remember_validators([image])
+        assert fetch_image(url) == {"hash": image["hash"], "url": url}
+
+    assert mock_get.call_args_list[0].kwargs["headers"] == {}
+    assert mock_get.call_args_list[1].kwargs["headers"] == {
+        "If-None-Match": '"v1"', "If-Modified-Since": "Thu, 01 May 2025 10:00:00 GMT",
+    }
+
+# --- Without a remembered validator a 304 is not trusted ---
+def test_unexpected_304_is_ignored(no_validators):
+    with patch.object(image_pipeline.session, "get", return_value=fake_response(304)):
+        assert fetch_image("https://img.example/a.png") is None
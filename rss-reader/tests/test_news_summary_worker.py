@@ -0,0 +1,95 @@
+import os
+import sys
+from contextlib import contextmanager
+from unittest.mock import patch, MagicMock
+import pytest
+import requests
+from tenacity import wait_none
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "scripts"))
+
+import news_summary_worker
+from news_summary_worker import SummaryUnavailable, get_summary, summarize_claimed, store_results, drain_news_summaries
+
+
+def api_response(status_code, body=None):
+    response = MagicMock()
+    response.status_code = status_code
+    response.json.return_value = body or {}
+    return response
+
+
+@pytest.fixture(autouse=True)
+def no_retry_wait():
+    with patch.object(get_summary.retry, "wait", wait_none()):
+        yield
+
+
+@pytest.fixture
+def fake_db():
+    """get_connection() stand-in; yields the list of (query, rows) passed to execute_values."""
+    statements = []
+    conn = MagicMock()
+
+    @contextmanager
+    def get_connection():
+        yield conn
+
+    def execute_values(cur, query, rows):
+        statements.append((" ".join(query.split()), rows))
+
+    with patch("news_summary_worker.get_connection", get_connection), \
+         patch("news_summary_worker.execute_values", side_effect=execute_values):
+        yield statements
+
+# --- Backpressure and timeouts are retried, then reported as SummaryUnavailable ---
+@pytest.mark.parametrize("outcome", [api_response(503), requests.exceptions.Timeout("slow")])
+def test_unavailable_api_is_retried_then_raised(outcome):
+    with patch("news_summary_worker.requests.post", side_effect=[outcome] * 5) as mock_post:
+        with pytest.raises(SummaryUnavailable):
+            get_summary("https://news.example/1")
+    assert mock_post.call_count == 5
+
+def test_recovers_after_a_busy_response():
+    responses = [api_response(503), api_response(200, {"summary": "short"})]
+    with patch("news_summary_worker.requests.post", side_effect=responses):
+        assert get_summary("https://news.example/1", text="body") == {"summary": "short"}
+
+# --- Other errors are answers about the article and are not retried ---
+def test_server_error_is_not_retried():
+    with patch("news_summary_worker.requests.post", return_value=api_response(500, {"detail": "boom"})) as mock_post:
+        assert get_summary("https://news.example/1") == {"detail": "boom"}
+    mock_post.assert_called_once()
+
+def test_summarize_claimed_marks_unavailable():
+    with patch("news_summary_worker.get_summary", side_effect=SummaryUnavailable("HTTP 503")):
+        assert summarize_claimed((1, "https://news.example/1", None)) == (1, None, None, True)
+    with patch("news_summary_worker.get_summary", return_value={"error": "Failed to extract article text"}):
+        assert summarize_claimed((2, "https://news.example/2", None)) == (2, None, None, False)
+
+# --- A busy API releases the claim without spending an attempt ---
+def test_store_results_releases_unavailable_claims(fake_db):
+    store_results([
+        (1, "summary", "text", False),
+        (2, None, "partial text", False),
+        (3, None, None, True),
+    ])
+    queries = {query.split("SET ")[1].split(",")[0]: rows for query, rows in fake_db}
+    assert queries["NewsSummary = v.summary"] == [(1, "summary", "text")]
+    assert queries["news_summary_status = CASE WHEN a.news_summary_attempts >= v.max_attempts THEN 'failed' ELSE 'pending' END"] == [
+        (2, news_summary_worker.NEWS_SUMMARY_MAX_ATTEMPTS, "partial text"),
+    ]
+    released = [query for query, rows in fake_db if rows == [(3,)]]
+    assert len(released) == 1
+    assert "news_summary_status = 'pending'" in released[0]
+    assert "news_summary_attempts = GREATEST(a.news_summary_attempts - 1, 0)" in released[0]
+
+# --- Draining stops at the first batch the API could not take ---
+def test_drain_stops_when_api_is_busy():
+    batches = [[(1, "https://news.example/1", None)], [(2, "https://news.example/2", None)]]
+    with patch("news_summary_worker.claim_articles", side_effect=batches) as mock_claim, \
+         patch("news_summary_worker.summarize_claimed", side_effect=lambda article: (article[0], None, None, True)), \
+         patch("news_summary_worker.store_results", return_value=0) as mock_store:
+        assert drain_news_summaries() == 0
+    mock_claim.assert_called_once()
+    mock_store.assert_called_once_with([(1, None, None, True)])
@@ -0,0 +1,52 @@
+import os
+import sys
+from unittest.mock import patch
+import feedparser
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "scripts"))
+
+import image_pipeline
+import rss_feed_reader
+from feed_scheduler import FeedState
+from test_image_pipeline import encoded_image, fake_response
+
+IMAGE_URL = "https://img.example/a.png"
+
+
+def parsed_feed():
+    entry = {
+        "title": "Headline", "published": "Thu, 01 May 2025 10:00:00 GMT", "link": "https://news.example/1",
+        "summary": "summary", "media_content": [{"url": IMAGE_URL}], "tags": [],
+    }
+    return feedparser.FeedParserDict(entries=[entry], bozo=False, status=200, etag='"feed-v1"')
+
+
+@pytest.fixture(autouse=True)
+def no_validators():
+    image_pipeline._validators.clear()
+    yield
+    image_pipeline._validators.clear()
+
+# --- A failed insert forgets the image validators, so the next poll does a full GET ---
+@patch("rss_feed_reader.get_existing_articles", return_value=set())
+@patch("rss_feed_reader.feedparser.parse", side_effect=lambda *args, **kwargs: parsed_feed())
+def test_failed_insert_forces_unconditional_image_get(mock_parse, mock_existing):
+    feed_state = FeedState("https://news.example/rss", 600)
+    image = encoded_image((20, 20))
+    responses = [fake_response(body=image, headers={"ETag": '"img-v1"'}) for _ in range(3)]
+
+    with patch.object(image_pipeline.session, "get", side_effect=responses) as mock_get, \
+         patch("rss_feed_reader.insert_articles", side_effect=[RuntimeError("db down"), None, None]):
+        with pytest.raises(RuntimeError):
+            rss_feed_reader.fetch_and_store_feed(feed_state)
+        # Neither the feed nor the image validators were kept
+        assert feed_state.etag is None
+        assert IMAGE_URL not in image_pipeline._validators
+
+        assert rss_feed_reader.fetch_and_store_feed(feed_state)
+        assert feed_state.etag == '"feed-v1"'
+        rss_feed_reader.fetch_and_store_feed(feed_state)
+
+    headers = [call.kwargs["headers"] for call in mock_get.call_args_list]
+    assert headers == [{}, {}, {"If-None-Match": '"img-v1"'}]
@@ -0,0 +1,85 @@
+import os
+import sys
+from unittest.mock import patch
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "scripts"))
+
+from tweet_store import tweet_fingerprint, store_article_tweets
+
+
+class FakeTweetTable:
+    """execute_values() stand-in applying the tweets and article_tweets upserts to in-memory rows."""
+
+    def __init__(self):
+        self.tweets = {}
+        self.links = set()
+
+    def find(self, query, row):
+        text_hash, source_id = row[0], row[1]
+        for tweet_id, stored in self.tweets.items():
+            if "ON CONFLICT (source_tweet_id)" in query and stored["source_tweet_id"] == source_id:
+                return tweet_id
+            if "ON CONFLICT (text_hash)" in query and stored["source_tweet_id"] is None and stored["text_hash"] == text_hash:
+                return tweet_id
+        return None
+
+    def __call__(self, cur, query, rows, page_size=100, fetch=False):
+        if "INSERT INTO tweets" in query:
+            returned = []
+            for row in rows:
+                tweet_id = self.find(query, row)
+                if tweet_id is None:
+                    tweet_id = len(self.tweets) + 1
+                    self.tweets[tweet_id] = {"text_hash": row[0], "source_tweet_id": row[1]}
+                self.tweets[tweet_id].update(tweet_text=row[2], tweet_likes=row[3])
+                if row[1] is not None:
+                    self.tweets[tweet_id]["text_hash"] = row[0]
+                returned.append((row[1] if "ON CONFLICT (source_tweet_id)" in query else row[0], tweet_id))
+            return returned
+        new = [link for link in set(rows) if link not in self.links]
+        self.links.update(new)
+        return [(article_id,) for article_id, _ in new]
+
+
+@pytest.fixture
+def table():
+    table = FakeTweetTable()
+    with patch("tweet_store.execute_values", side_effect=table):
+        yield table
+
+
+def test_fingerprint_ignores_case_and_whitespace():
+    assert tweet_fingerprint("Python  3.14\nis out") == tweet_fingerprint("python 3.14 is OUT")
+
+# --- Tweets with a source id are matched on it, even when the text changed ---
+def test_tweets_are_matched_on_source_id(table):
+    assert store_article_tweets(None, {1: [{"id": 10, "text": "Python 3.14 is out", "likes": 1}]}) == {1}
+    assert store_article_tweets(None, {2: [{"id": 10, "text": "Python 3.14 is out (edited)", "likes": 5}]}) == {2}
+
+    assert len(table.tweets) == 1
+    assert table.tweets[1]["tweet_text"] == "Python 3.14 is out (edited)"
+    assert table.tweets[1]["tweet_likes"] == 5
+    assert table.links == {(1, 1), (2, 1)}
+
+# --- Two tweets with the same text but different ids stay two tweets ---
+def test_same_text_different_ids_are_kept_apart(table):
+    store_article_tweets(None, {1: [{"id": "10", "text": "Big news"}, {"id": "11", "text": "big  NEWS"}]})
+    assert len(table.tweets) == 2
+    assert {tweet["source_tweet_id"] for tweet in table.tweets.values()} == {"10", "11"}
+
+# --- Without an id the fingerprint is the key, among tweets stored without one ---
+def test_tweets_without_id_fall_back_to_fingerprint(table):
+    store_article_tweets(None, {1: [{"text": "No id here", "likes": 1}]})
+    store_article_tweets(None, {2: [{"text": "no ID   here", "likes": 3}, {"id": "12", "text": "No id here"}]})
+
+    without_id = [tweet for tweet in table.tweets.values() if tweet["source_tweet_id"] is None]
+    assert len(without_id) == 1
+    assert without_id[0]["tweet_likes"] == 3
+    assert len(table.tweets) == 2
+    # Relinking an already linked tweet reports no new links
+    assert store_article_tweets(None, {1: [{"text": "No id here"}]}) == set()
+
+def test_tweets_without_text_are_skipped(table):
+    assert store_article_tweets(None, {1: [{"id": "13", "text": ""}]}) == set()
+    assert table.tweets == {}
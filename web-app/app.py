@@ -1,13 +1,14 @@
 # app.py
 import os
-import psycopg2
 import logging
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, render_template, request, jsonify, url_for, abort, make_response
 from datetime import datetime
-import base64
 from dotenv import load_dotenv
-import csv
-from tweet_relevance.infer import predict_relevance  # Import the predict_relevance function
+from image_cache import ImageCache
+from db_pool import get_connection
+from feedback_store import feedback_buffer
+from page_cache import PageCache, InvalidationListener
+from migrate import apply_migrations
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -15,99 +16,181 @@ logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(
 load_dotenv(override=True)
 app = Flask(__name__)
 
-def get_db_connection():
-    try:
-        conn = psycopg2.connect(
-            host=os.getenv('DB_HOST'),
-            dbname=os.getenv('POSTGRES_DB'),
-            user=os.getenv('POSTGRES_USER'),
-            password=os.getenv('POSTGRES_PASSWORD'),
-            port="5432"
-        )
-        return conn
-    except Exception as e:
-        logging.error(f"Database connection failed: {e}")
-        raise
+IMAGE_CACHE_MAX_BYTES = int(os.getenv('IMAGE_CACHE_MAX_BYTES', 64 * 1024 * 1024))
+IMAGE_MAX_AGE = int(os.getenv('IMAGE_MAX_AGE', 86400))
+image_cache = ImageCache(IMAGE_CACHE_MAX_BYTES)
+
+ARTICLES_PAGE_SIZE = int(os.getenv('ARTICLES_PAGE_SIZE', 20))
+
+# Rendered index pages, invalidated per date by database notifications. Closed days
+# rarely change, so they keep a long TTL; today's pages expire sooner in case a
+# notification is missed.
+PAGE_CACHE_MAX_BYTES = int(os.getenv('PAGE_CACHE_MAX_BYTES', 32 * 1024 * 1024))
+PAGE_CACHE_TODAY_TTL = int(os.getenv('PAGE_CACHE_TODAY_TTL', 300))
+PAGE_CACHE_PAST_TTL = int(os.getenv('PAGE_CACHE_PAST_TTL', 86400))
+# Set to 0 to cache without the LISTEN thread (pages then only expire by TTL)
+PAGE_CACHE_LISTEN = os.getenv('PAGE_CACHE_LISTEN', '1') == '1'
+page_cache = PageCache(PAGE_CACHE_MAX_BYTES)
+page_cache_listener = InvalidationListener(page_cache, dict(
+    dbname=os.getenv('POSTGRES_DB'),
+    user=os.getenv('POSTGRES_USER'),
+    password=os.getenv('POSTGRES_PASSWORD'),
+    host=os.getenv('DB_HOST'),
+    port=os.getenv('DB_PORT', "5432")
+))
+
+def page_ttl(filter_date):
+    return PAGE_CACHE_PAST_TTL if filter_date < datetime.now().strftime('%Y-%m-%d') else PAGE_CACHE_TODAY_TTL
+
+def encode_cursor(publication_timestamp, article_id):
+    """Keyset cursor pointing after the given article in (publication_timestamp DESC, id DESC) order."""
+    return f"{publication_timestamp.isoformat()}_{article_id}"
+
+def decode_cursor(cursor):
+    timestamp, article_id = cursor.rsplit('_', 1)
+    return datetime.fromisoformat(timestamp), int(article_id)
 
 @app.route('/')
 def index():
     filter_date = request.args.get('date', datetime.now().strftime('%Y-%m-%d'))
-    logging.info(f"Fetching articles for date: {filter_date}")
+    try:
+        # Normalized so equivalent spellings share a cache entry and match notifications
+        filter_date = datetime.strptime(filter_date, '%Y-%m-%d').strftime('%Y-%m-%d')
+    except ValueError:
+        abort(400)
+    cursor = request.args.get('cursor')
+    logging.info(f"Fetching articles for date: {filter_date}, cursor: {cursor}")
+
+    keyset = ""
+    params = [filter_date, filter_date]
+    if cursor:
+        try:
+            params.extend(decode_cursor(cursor))
+        except ValueError:
+            abort(400)
+        keyset = "AND (a.publication_timestamp, a.id) < (%s, %s)"
+
+    if PAGE_CACHE_LISTEN:
+        page_cache_listener.ensure_started()
+    cache_key = (filter_date, cursor)
+    html = page_cache.get(cache_key)
+    if html is not None:
+        return html
+    cache_version = page_cache.version(filter_date)
 
     try:
-        conn = get_db_connection()
-        cur = conn.cursor()
-
-        cur.execute("""
-            SELECT 
-                a.id, a.title, a.image, a.summary, a.weblink, a.publication_timestamp,
-                a.TweetSummary, a.NewsSummary,
-                t.id as tweet_id, t.tweet_text, t.tweet_likes, t.tweet_retweets, t.tweet_replies
-            FROM articles a
-            LEFT JOIN tweets t ON a.id = t.article_id
-            WHERE DATE(a.publication_timestamp) = %s
-            ORDER BY a.publication_timestamp DESC;
-        """, (filter_date,))
-        
-        rows = cur.fetchall()
-        cur.close()
-        conn.close()
+        with get_connection() as conn:
+            # One page of article ids in keyset order; one more than the page size
+            # tells whether there is a next page.
+            with conn.cursor() as cur:
+                cur.execute(f"""
+                    SELECT a.id
+                    FROM articles a
+                    WHERE a.publication_timestamp >= %s::date
+                      AND a.publication_timestamp < %s::date + INTERVAL '1 day' {keyset}
+                    ORDER BY a.publication_timestamp DESC, a.id DESC
+                    LIMIT %s;
+                """, (*params, ARTICLES_PAGE_SIZE + 1))
+                page_ids = [row[0] for row in cur.fetchall()]
+            has_next = len(page_ids) > ARTICLES_PAGE_SIZE
+            page_ids = page_ids[:ARTICLES_PAGE_SIZE]
+
+            # Relevance scores are written by the scoring worker (tweet_relevance.score_tweets
+            # --watch); tweets it has not reached yet are shown unscored.
+            # One row per article with its top 10 tweets aggregated into a JSON array
+            with conn.cursor() as cur:
+                cur.execute("""
+                    SELECT
+                        a.id, a.title, (a.image_hash IS NOT NULL OR a.image IS NOT NULL) AS has_image, a.summary, a.weblink, a.publication_timestamp,
+                        a.TweetSummary, a.NewsSummary,
+                        COALESCE(t.tweets, '[]'::json) AS tweets
+                    FROM articles a
+                    LEFT JOIN LATERAL (
+                        SELECT json_agg(json_build_object(
+                            'tweet_id', top.id,
+                            'tweet_text', top.tweet_text,
+                            'tweet_likes', top.tweet_likes,
+                            'tweet_retweets', top.tweet_retweets,
+                            'tweet_replies', top.tweet_replies,
+                            'relevant', COALESCE(top.relevant, FALSE),
+                            'confidence', COALESCE(top.confidence, 0.0)
+                        ) ORDER BY top.confidence DESC NULLS LAST, top.id) AS tweets
+                        FROM (
+                            SELECT tw.id, tw.tweet_text, tw.tweet_likes, tw.tweet_retweets, tw.tweet_replies, at.relevant, at.confidence
+                            FROM article_tweets at
+                            JOIN tweets tw ON tw.id = at.tweet_id
+                            WHERE at.article_id = a.id
+                            ORDER BY at.confidence DESC NULLS LAST, tw.id
+                            LIMIT 10
+                        ) top
+                    ) t ON TRUE
+                    WHERE a.id = ANY(%s)
+                    ORDER BY a.publication_timestamp DESC, a.id DESC;
+                """, (page_ids,))
+                rows = cur.fetchall()
     except Exception as e:
         logging.error(f"Failed to fetch data from database: {e}")
-        return render_template('index.html', articles=[], filter_date=filter_date)
-
-    articles_dict = {}
-    for row in rows:
+        return render_template('index.html', articles=[], filter_date=filter_date, next_cursor=None)
+
+    articles = []
+    for article_id, title, has_image, summary, weblink, pub_time, tweet_summary, news_summary, tweets in rows:
+        articles.append({
+            "id": article_id,
+            "title": title,
+            "image_src": url_for('article_image', article_id=article_id) if has_image else None,
+            "summary": summary,
+            "weblink": weblink,
+            "publication_timestamp": pub_time,
+            "tweet_summary": tweet_summary,
+            "news_summary": news_summary,
+            # Already ranked by confidence and limited to the top 10 in SQL
+            "tweets": tweets
+        })
+
+    next_cursor = None
+    if has_next and articles:
+        last = articles[-1]
+        next_cursor = encode_cursor(last["publication_timestamp"], last["id"])
+
+    html = render_template('index.html', articles=articles, filter_date=filter_date, next_cursor=next_cursor)
+    page_cache.put(cache_key, html, page_ttl(filter_date), cache_version)
+    return html
+
+@app.route('/image/<int:article_id>')
+def article_image(article_id):
+    # ?variant=thumb serves the small thumbnail stored at ingest time, when there is one
+    variant = 'thumb' if request.args.get('variant') == 'thumb' else 'full'
+    image_column = "COALESCE(i.thumbnail, i.image, a.image)" if variant == 'thumb' else "COALESCE(i.image, a.image)"
+
+    entry = image_cache.get((article_id, variant))
+    if entry is None:
         try:
-            article_id, title, image, summary, weblink, pub_time, tweet_summary, news_summary, tweet_id, tweet_text, tweet_likes, tweet_retweets, tweet_replies = row
-            
-            if article_id not in articles_dict:
-                if image:
-                    base64_image = base64.b64encode(image).decode('utf-8')
-                    image_src = f"data:image/jpeg;base64,{base64_image}"
-                else:
-                    image_src = None
-                
-                articles_dict[article_id] = {
-                    "id": article_id,
-                    "title": title,
-                    "image_src": image_src,
-                    "summary": summary,
-                    "weblink": weblink,
-                    "publication_timestamp": pub_time,
-                    "tweet_summary": tweet_summary,
-                    "news_summary": news_summary,
-                    "tweets": []
-                }
-            
-            if tweet_id:
-                relevance_result = predict_relevance(title, tweet_text)
-                articles_dict[article_id]["tweets"].append({
-                    "tweet_id": tweet_id,
-                    "tweet_text": tweet_text,
-                    "tweet_likes": tweet_likes,
-                    "tweet_retweets": tweet_retweets,
-                    "tweet_replies": tweet_replies,
-                    "relevant": relevance_result["relevant"],
-                    "confidence": relevance_result["confidence"]
-                })
+            with get_connection() as conn, conn.cursor() as cur:
+                cur.execute(f"""
+                    SELECT {image_column}, i.hash, a.publication_timestamp
+                    FROM articles a
+                    LEFT JOIN images i ON i.hash = a.image_hash
+                    WHERE a.id = %s
+                """, (article_id,))
+                row = cur.fetchone()
         except Exception as e:
-            logging.warning(f"Error processing article or tweet row: {e}")
-            continue
-
-    # Sort tweets by confidence and limit to top 10 for each article
-    for article in articles_dict.values():
-        article["tweets"] = sorted(
-            article["tweets"], 
-            key=lambda x: x["confidence"], 
-            reverse=True
-        )[:10]
-
-    articles = list(articles_dict.values())
-
-    return render_template('index.html', articles=articles, filter_date=filter_date)
-
-FEEDBACK_FILE = "./tweet_relevance/feedback_log.csv"
+            logging.error(f"Failed to fetch image for article {article_id}: {e}")
+            abort(500)
+
+        if row is None or row[0] is None:
+            abort(404)
+        image, image_hash, pub_time = row
+        etag = f"{image_hash}-{variant}" if image_hash else None
+        entry = image_cache.put((article_id, variant), bytes(image), last_modified=pub_time, etag=etag)
+
+    response = make_response(entry["data"])
+    response.mimetype = entry["mimetype"]
+    response.set_etag(entry["etag"])
+    if entry["last_modified"] is not None:
+        response.last_modified = entry["last_modified"]
+    response.cache_control.public = True
+    response.cache_control.max_age = IMAGE_MAX_AGE
+    return response.make_conditional(request)
 
 @app.route('/feedback', methods=['POST'])
 def log_feedback():
@@ -122,18 +205,14 @@ def log_feedback():
             return jsonify({'message': 'Invalid feedback data'}), 400
 
         new_entry = {
-            "timestamp": datetime.utcnow().isoformat(),
+            "timestamp": datetime.utcnow(),
             "headline": headline,
             "tweet": tweet,
             "user_label": int(user_label)
         }
 
-        file_exists = os.path.exists(FEEDBACK_FILE)
-        with open(FEEDBACK_FILE, mode="a", newline='', encoding="utf-8") as f:
-            writer = csv.DictWriter(f, fieldnames=new_entry.keys())
-            if not file_exists:
-                writer.writeheader()
-            writer.writerow(new_entry)
+        # Buffered and written to the feedback table in batches
+        feedback_buffer.add(**new_entry)
 
         logging.info(f"Feedback recorded: {new_entry}")
         return jsonify({'message': 'Feedback recorded successfully'})
@@ -143,5 +222,9 @@ def log_feedback():
         return jsonify({'message': 'Internal server error'}), 500
 
 if __name__ == '__main__':
+    # Bring an existing database up to date before serving; the advisory lock
+    # serializes this with the RSS reader starting at the same time
+    with get_connection() as conn:
+        apply_migrations(conn)
     logging.info("Starting Flask server...")
     app.run(host='0.0.0.0', port=5000)
@@ -0,0 +1,90 @@
+# feedback_store.py
+import os
+import atexit
+import logging
+import threading
+from psycopg2.extras import execute_values
+from db_pool import get_connection
+
+# Feedback is buffered in process and written to Postgres in batches
+FEEDBACK_BATCH_SIZE = int(os.getenv('FEEDBACK_BATCH_SIZE', 100))
+FEEDBACK_FLUSH_INTERVAL = float(os.getenv('FEEDBACK_FLUSH_INTERVAL', 2))
+# Rows kept while the database is unreachable; the oldest are dropped beyond this
+FEEDBACK_MAX_BUFFER = int(os.getenv('FEEDBACK_MAX_BUFFER', 10000))
+
+
+class FeedbackBuffer:
+    """
+    In-process buffer of feedback rows flushed to the `feedback` table.
+
+    Requests only append under a lock. A background thread, started on the first
+    add so it is created in each worker after a fork, writes everything buffered
+    with one INSERT every `flush_interval` seconds or as soon as `batch_size` rows
+    are waiting. Rows from a failed flush are put back and retried. The buffer is
+    flushed once more when the process exits.
+    """
+
+    def __init__(self, batch_size=FEEDBACK_BATCH_SIZE, flush_interval=FEEDBACK_FLUSH_INTERVAL,
+                 max_buffer=FEEDBACK_MAX_BUFFER):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_buffer = max_buffer
+        self._rows = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._pid = None
+
+    def add(self, timestamp, headline, tweet, user_label):
+        with self._lock:
+            self._rows.append((timestamp, headline, tweet, int(user_label)))
+            if len(self._rows) > self.max_buffer:
+                dropped = len(self._rows) - self.max_buffer
+                del self._rows[:dropped]
+                logging.error(f"Feedback buffer full, dropped {dropped} oldest rows")
+            pending = len(self._rows)
+            self._ensure_thread()
+        if pending >= self.batch_size:
+            self._wakeup.set()
+
+    def _ensure_thread(self):
+        if self._thread is None or self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name="feedback-flush", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+
+    def flush(self):
+        """Write all buffered rows in one statement. Returns the number of rows written."""
+        with self._flush_lock:
+            with self._lock:
+                rows, self._rows = self._rows, []
+            if not rows:
+                return 0
+            try:
+                with get_connection() as conn:
+                    with conn.cursor() as cur:
+                        execute_values(
+                            cur,
+                            "INSERT INTO feedback (created_at, headline, tweet, user_label) VALUES %s",
+                            rows,
+                            page_size=len(rows)
+                        )
+                    conn.commit()
+            except Exception as e:
+                logging.error(f"Failed to write {len(rows)} feedback rows, will retry: {e}")
+                with self._lock:
+                    self._rows[:0] = rows
+                return 0
+            logging.info(f"Wrote {len(rows)} feedback rows")
+            return len(rows)
+
+
+feedback_buffer = FeedbackBuffer()
+atexit.register(feedback_buffer.flush)
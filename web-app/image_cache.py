@@ -0,0 +1,59 @@
+# image_cache.py
+import hashlib
+import threading
+from collections import OrderedDict
+
+
+def guess_mimetype(data):
+    """Guess the image type from its magic bytes; feeds mostly serve JPEG."""
+    if data.startswith(b'\x89PNG'):
+        return 'image/png'
+    if data.startswith(b'GIF8'):
+        return 'image/gif'
+    if data[:4] == b'RIFF' and data[8:12] == b'WEBP':
+        return 'image/webp'
+    return 'image/jpeg'
+
+
+class ImageCache:
+    """
+    Bounded in-process LRU of article images.
+
+    Entries are keyed by article id and hold the raw bytes together with the
+    content-derived ETag, Last-Modified time and mimetype. The cache is bounded by
+    the total number of bytes held; the least recently used images are evicted first.
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key, data, last_modified=None, etag=None):
+        entry = {
+            "data": data,
+            "etag": etag or hashlib.md5(data).hexdigest(),
+            "last_modified": last_modified,
+            "mimetype": guess_mimetype(data),
+        }
+        if len(data) > self.max_bytes:
+            return entry
+
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._size -= len(old["data"])
+            self._entries[key] = entry
+            self._size += len(data)
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted["data"])
+        return entry
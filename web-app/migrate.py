@@ -0,0 +1,338 @@
+#!/usr/bin/env python3
+import logging
+import os
+import sys
+import psycopg2
+from dotenv import load_dotenv
+
+# The database image runs this on first init, and the RSS reader and the web app
+# run it at startup so existing volumes catch up. Each ships its own copy
+# (separate Docker contexts); web-app/tests/test_migrate.py keeps them identical.
+
+# Serializes concurrent runners (several containers starting at once)
+MIGRATION_LOCK_ID = 4815162342
+
+# Ordered up-migrations: (version, name, statements). Applied versions are recorded
+# in schema_migrations; never edit a released entry, append a new one instead.
+# Every statement is idempotent, so databases created by older init scripts,
+# which ran some of this DDL ad hoc, converge on the same schema.
+MIGRATIONS = [
+    (1, "baseline_tables", [
+        """
+        CREATE TABLE IF NOT EXISTS articles (
+            id SERIAL PRIMARY KEY,
+            title TEXT NOT NULL CHECK (title <> ''),
+            publication_timestamp TIMESTAMP NOT NULL,
+            weblink TEXT NOT NULL CHECK (weblink <> ''),
+            image BYTEA,
+            tags TEXT[],
+            summary TEXT,
+            UNIQUE (title, weblink),
+            TweetSummary TEXT,
+            NewsSummary TEXT
+        );
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS tweets (
+            id SERIAL PRIMARY KEY,
+            article_id INTEGER REFERENCES articles(id) ON DELETE CASCADE,
+            tweet_text TEXT NOT NULL CHECK (tweet_text <> ''),
+            tweet_likes INTEGER,
+            tweet_retweets INTEGER,
+            tweet_replies INTEGER
+        );
+        """,
+    ]),
+    (2, "image_store", [
+        # Re-encoded feed images keyed by the sha256 of the original download, so an
+        # image repeated across articles and feeds is stored once
+        """
+        CREATE TABLE IF NOT EXISTS images (
+            hash TEXT PRIMARY KEY,
+            image BYTEA NOT NULL,
+            thumbnail BYTEA
+        );
+        """,
+        "ALTER TABLE articles ADD COLUMN IF NOT EXISTS image_hash TEXT REFERENCES images(hash);",
+    ]),
+    (3, "news_summary_queue", [
+        # Work-queue state for the news summary workers (rss-reader news_summary_worker.py)
+        """
+        ALTER TABLE articles
+            ADD COLUMN IF NOT EXISTS news_summary_status TEXT NOT NULL DEFAULT 'pending',
+            ADD COLUMN IF NOT EXISTS news_summary_claimed_at TIMESTAMP,
+            ADD COLUMN IF NOT EXISTS news_summary_attempts INTEGER NOT NULL DEFAULT 0;
+        """,
+        # Extracted page text, so re-summarization never downloads the article again
+        "ALTER TABLE articles ADD COLUMN IF NOT EXISTS article_text TEXT;",
+    ]),
+    (4, "article_tweet_links", [
+        # Each tweet is stored once, keyed by the md5 of its normalized text, and linked
+        # to every article it was found for through article_tweets. Relevance depends on
+        # the headline, so scores live on the link. Legacy rows keep a NULL text_hash.
+        """
+        ALTER TABLE tweets
+            ADD COLUMN IF NOT EXISTS text_hash TEXT,
+            ADD COLUMN IF NOT EXISTS source_tweet_id TEXT;
+        """,
+        "CREATE UNIQUE INDEX IF NOT EXISTS tweets_text_hash_key ON tweets (text_hash);",
+        "CREATE INDEX IF NOT EXISTS tweets_source_tweet_id_idx ON tweets (source_tweet_id);",
+        """
+        CREATE TABLE IF NOT EXISTS article_tweets (
+            article_id INTEGER NOT NULL REFERENCES articles(id) ON DELETE CASCADE,
+            tweet_id INTEGER NOT NULL REFERENCES tweets(id) ON DELETE CASCADE,
+            relevant BOOLEAN,
+            confidence REAL,
+            model_version TEXT,
+            PRIMARY KEY (article_id, tweet_id)
+        );
+        """,
+        "CREATE INDEX IF NOT EXISTS article_tweets_tweet_id_idx ON article_tweets (tweet_id);",
+        # Link tweets stored per article before the link table existed; the scoring
+        # worker fills in relevance for the new links
+        """
+        INSERT INTO article_tweets (article_id, tweet_id)
+        SELECT article_id, id
+        FROM tweets
+        WHERE article_id IS NOT NULL
+        ON CONFLICT DO NOTHING;
+        """,
+    ]),
+    (5, "feedback_table", [
+        """
+        CREATE TABLE IF NOT EXISTS feedback (
+            id BIGSERIAL PRIMARY KEY,
+            created_at TIMESTAMP NOT NULL DEFAULT NOW(),
+            headline TEXT NOT NULL,
+            tweet TEXT NOT NULL,
+            user_label SMALLINT NOT NULL
+        );
+        """,
+    ]),
+    (6, "hot_path_indexes", [
+        # Reads go through article_tweets, and new tweets leave tweets.article_id NULL,
+        # but the legacy column still carries ON DELETE CASCADE from articles: without
+        # this index every article delete scans the whole tweets table
+        "CREATE INDEX IF NOT EXISTS tweets_article_id_idx ON tweets (article_id);",
+        # Date range filter plus keyset pagination on the index page
+        "CREATE INDEX IF NOT EXISTS articles_publication_timestamp_id_idx ON articles (publication_timestamp DESC, id DESC);",
+        # Top tweets per article by confidence
+        "CREATE INDEX IF NOT EXISTS article_tweets_article_confidence_idx ON article_tweets (article_id, confidence DESC NULLS LAST, tweet_id);",
+    ]),
+    (7, "pending_summary_indexes", [
+        # Articles still waiting for a news summary (news_summary_worker.claim_articles)
+        """
+        CREATE INDEX IF NOT EXISTS articles_news_summary_pending_idx ON articles (id)
+        WHERE (NewsSummary IS NULL OR TRIM(NewsSummary) = '');
+        """,
+        # Articles still waiting for a tweet summary (rss_feed_reader.get_titles_without_tweet_summary)
+        """
+        CREATE INDEX IF NOT EXISTS articles_tweet_summary_pending_idx ON articles (id) INCLUDE (title)
+        WHERE (TweetSummary IS NULL OR TRIM(TweetSummary) = '');
+        """,
+    ]),
+    (8, "article_change_notifications", [
+        # The web app caches rendered pages per publication date and LISTENs on
+        # article_changes; each payload is a date whose pages are out of date.
+        # Notifications are sent on commit, and duplicates within a transaction collapse.
+        """
+        CREATE OR REPLACE FUNCTION notify_article_change() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP <> 'INSERT' THEN
+                PERFORM pg_notify('article_changes', DATE(OLD.publication_timestamp)::text);
+            END IF;
+            IF TG_OP <> 'DELETE' THEN
+                PERFORM pg_notify('article_changes', DATE(NEW.publication_timestamp)::text);
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+        """,
+        """
+        CREATE OR REPLACE FUNCTION notify_article_tweet_change() RETURNS trigger AS $$
+        DECLARE
+            changed_article_id INTEGER;
+        BEGIN
+            IF TG_OP = 'DELETE' THEN
+                changed_article_id := OLD.article_id;
+            ELSE
+                changed_article_id := NEW.article_id;
+            END IF;
+            PERFORM pg_notify('article_changes', DATE(a.publication_timestamp)::text)
+            FROM articles a WHERE a.id = changed_article_id;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+        """,
+        """
+        CREATE OR REPLACE FUNCTION notify_tweet_change() RETURNS trigger AS $$
+        BEGIN
+            PERFORM pg_notify('article_changes', DATE(a.publication_timestamp)::text)
+            FROM article_tweets at JOIN articles a ON a.id = at.article_id
+            WHERE at.tweet_id = NEW.id;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+        """,
+        "DROP TRIGGER IF EXISTS articles_notify_insert_delete ON articles;",
+        """
+        CREATE TRIGGER articles_notify_insert_delete
+        AFTER INSERT OR DELETE ON articles
+        FOR EACH ROW EXECUTE FUNCTION notify_article_change();
+        """,
+        # Only columns the index page shows; work-queue bookkeeping does not invalidate
+        "DROP TRIGGER IF EXISTS articles_notify_update ON articles;",
+        """
+        CREATE TRIGGER articles_notify_update
+        AFTER UPDATE ON articles
+        FOR EACH ROW
+        WHEN (OLD.title IS DISTINCT FROM NEW.title
+              OR OLD.publication_timestamp IS DISTINCT FROM NEW.publication_timestamp
+              OR OLD.weblink IS DISTINCT FROM NEW.weblink
+              OR OLD.summary IS DISTINCT FROM NEW.summary
+              OR OLD.TweetSummary IS DISTINCT FROM NEW.TweetSummary
+              OR OLD.NewsSummary IS DISTINCT FROM NEW.NewsSummary
+              OR OLD.image_hash IS DISTINCT FROM NEW.image_hash
+              OR (OLD.image IS NULL) <> (NEW.image IS NULL))
+        EXECUTE FUNCTION notify_article_change();
+        """,
+        "DROP TRIGGER IF EXISTS article_tweets_notify ON article_tweets;",
+        """
+        CREATE TRIGGER article_tweets_notify
+        AFTER INSERT OR UPDATE OR DELETE ON article_tweets
+        FOR EACH ROW EXECUTE FUNCTION notify_article_tweet_change();
+        """,
+        # Engagement counts refreshed when a stored tweet is fetched again
+        "DROP TRIGGER IF EXISTS tweets_notify_update ON tweets;",
+        """
+        CREATE TRIGGER tweets_notify_update
+        AFTER UPDATE ON tweets
+        FOR EACH ROW
+        WHEN (OLD.tweet_text IS DISTINCT FROM NEW.tweet_text
+              OR OLD.tweet_likes IS DISTINCT FROM NEW.tweet_likes
+              OR OLD.tweet_retweets IS DISTINCT FROM NEW.tweet_retweets
+              OR OLD.tweet_replies IS DISTINCT FROM NEW.tweet_replies)
+        EXECUTE FUNCTION notify_tweet_change();
+        """,
+    ]),
+    (9, "drop_tweet_relevance_columns", [
+        # Relevance depends on the headline and lives on article_tweets; the per-tweet
+        # copies were never read again
+        """
+        ALTER TABLE tweets
+            DROP COLUMN IF EXISTS relevant,
+            DROP COLUMN IF EXISTS confidence,
+            DROP COLUMN IF EXISTS model_version;
+        """,
+    ]),
+    (10, "tweet_source_id_key", [
+        # Tweets are matched on their source id first and on the text fingerprint only
+        # when there is no id, so two tweets with the same text stay two tweets.
+        # Rows sharing a source id (text edited between polls) are merged into the
+        # oldest one first, keeping their article links and scores.
+        """
+        WITH keep AS (
+            SELECT source_tweet_id, MIN(id) AS id
+            FROM tweets
+            WHERE source_tweet_id IS NOT NULL
+            GROUP BY source_tweet_id
+            HAVING COUNT(*) > 1
+        )
+        INSERT INTO article_tweets (article_id, tweet_id, relevant, confidence, model_version)
+        SELECT at.article_id, keep.id, at.relevant, at.confidence, at.model_version
+        FROM article_tweets at
+        JOIN tweets t ON t.id = at.tweet_id
+        JOIN keep ON keep.source_tweet_id = t.source_tweet_id
+        WHERE t.id <> keep.id
+        ON CONFLICT DO NOTHING;
+        """,
+        """
+        DELETE FROM tweets t
+        USING tweets keep
+        WHERE t.source_tweet_id = keep.source_tweet_id
+          AND t.id > keep.id;
+        """,
+        """
+        CREATE UNIQUE INDEX IF NOT EXISTS tweets_source_tweet_id_key ON tweets (source_tweet_id)
+        WHERE source_tweet_id IS NOT NULL;
+        """,
+        "DROP INDEX IF EXISTS tweets_source_tweet_id_idx;",
+        # The fingerprint is the key of tweets without an id only
+        "DROP INDEX IF EXISTS tweets_text_hash_key;",
+        """
+        CREATE UNIQUE INDEX IF NOT EXISTS tweets_text_hash_no_id_key ON tweets (text_hash)
+        WHERE source_tweet_id IS NULL;
+        """,
+    ]),
+]
+
+
+def applied_versions(cursor):
+    cursor.execute("SELECT version FROM schema_migrations;")
+    return {row[0] for row in cursor.fetchall()}
+
+
+def apply_migrations(conn, migrations=MIGRATIONS):
+    """
+    Apply every migration not yet recorded in schema_migrations, in version order,
+    each in its own transaction together with its bookkeeping row. Returns the
+    versions applied.
+    """
+    with conn.cursor() as cursor:
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            applied_at TIMESTAMP NOT NULL DEFAULT NOW()
+        );
+        ''')
+        conn.commit()
+
+        cursor.execute("SELECT pg_advisory_lock(%s);", (MIGRATION_LOCK_ID,))
+        try:
+            done = applied_versions(cursor)
+            conn.commit()
+            applied = []
+            for version, name, statements in sorted(migrations):
+                if version in done:
+                    continue
+                logging.info(f"Applying migration {version}: {name}")
+                try:
+                    for statement in statements:
+                        cursor.execute(statement)
+                    cursor.execute(
+                        "INSERT INTO schema_migrations (version, name) VALUES (%s, %s);",
+                        (version, name)
+                    )
+                    conn.commit()
+                except Exception:
+                    conn.rollback()
+                    raise
+                applied.append(version)
+        finally:
+            cursor.execute("SELECT pg_advisory_unlock(%s);", (MIGRATION_LOCK_ID,))
+            conn.commit()
+
+    if applied:
+        logging.info(f"Applied migrations: {applied}")
+    else:
+        logging.info("Schema is up to date.")
+    return applied
+
+
+if __name__ == "__main__":
+    load_dotenv(override=True)
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    try:
+        conn = psycopg2.connect(
+            dbname=os.getenv('POSTGRES_DB'),
+            user=os.getenv('POSTGRES_USER'),
+            password=os.getenv('POSTGRES_PASSWORD'),
+            host=os.getenv('DB_HOST', 'localhost'),
+            port=os.getenv('DB_PORT', '5432'),
+        )
+        apply_migrations(conn)
+        conn.close()
+    except Exception as e:
+        logging.error(f"Migration error: {e}")
+        sys.exit(1)
@@ -0,0 +1,137 @@
+# page_cache.py
+import os
+import time
+import select
+import logging
+import threading
+from collections import OrderedDict
+import psycopg2
+
+# Channel the database triggers notify with the publication date of changed articles
+PAGE_CACHE_CHANNEL = 'article_changes'
+PAGE_CACHE_RECONNECT_DELAY = float(os.getenv('PAGE_CACHE_RECONNECT_DELAY', 5))
+
+
+class PageCache:
+    """
+    Bounded in-process LRU of rendered index pages.
+
+    Entries are keyed by (date, cursor) and hold the rendered HTML with an expiry
+    time. The cache is bounded by the total bytes of HTML held; the least recently
+    used pages are evicted first. All pages of a date are dropped together when the
+    database reports a change for that date (see InvalidationListener), so the TTL
+    is only a safety net for missed notifications.
+
+    A page is stored with the version() of its date taken before the data was
+    queried; if the date was invalidated in between, the stale page is not cached.
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self._epoch = 0
+        self._date_versions = {}
+
+    def version(self, date):
+        with self._lock:
+            return self._epoch, self._date_versions.get(date, 0)
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry["expires"] <= time.monotonic():
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return entry["html"]
+
+    def put(self, key, html, ttl, version):
+        size = len(html.encode("utf-8"))
+        if size > self.max_bytes or ttl <= 0:
+            return
+        with self._lock:
+            if version != (self._epoch, self._date_versions.get(key[0], 0)):
+                return
+            self._remove(key)
+            self._entries[key] = {"html": html, "size": size, "expires": time.monotonic() + ttl}
+            self._size += size
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= evicted["size"]
+
+    def invalidate_date(self, date):
+        """Drop every cached page for `date` (a 'YYYY-MM-DD' string)."""
+        with self._lock:
+            self._date_versions[date] = self._date_versions.get(date, 0) + 1
+            for key in [key for key in self._entries if key[0] == date]:
+                self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self._epoch += 1
+            self._date_versions.clear()
+            self._entries.clear()
+            self._size = 0
+
+    def _remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._size -= entry["size"]
+
+
+class InvalidationListener:
+    """
+    Background thread that LISTENs on PAGE_CACHE_CHANNEL over its own connection
+    (outside the pool) and invalidates the dates it is notified about. After a
+    lost connection the whole cache is cleared, since notifications may have
+    been missed. Started on first use so each worker process gets its own thread.
+    """
+
+    def __init__(self, cache, connect_kwargs):
+        self.cache = cache
+        self.connect_kwargs = connect_kwargs
+        self._thread = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def ensure_started(self):
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is None or self._pid != os.getpid():
+                self._pid = os.getpid()
+                self._thread = threading.Thread(target=self._run, name="page-cache-listener", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            conn = None
+            try:
+                conn = psycopg2.connect(**self.connect_kwargs)
+                conn.autocommit = True
+                with conn.cursor() as cur:
+                    cur.execute(f"LISTEN {PAGE_CACHE_CHANNEL};")
+                logging.info(f"Page cache listening on {PAGE_CACHE_CHANNEL}")
+                # Anything cached before LISTEN took effect may already be stale
+                self.cache.clear()
+                while True:
+                    if select.select([conn], [], [], 60) == ([], [], []):
+                        continue
+                    conn.poll()
+                    dates = {notify.payload for notify in conn.notifies}
+                    conn.notifies.clear()
+                    for date in dates:
+                        self.cache.invalidate_date(date)
+                    if dates:
+                        logging.info(f"Page cache invalidated for {sorted(dates)}")
+            except Exception as e:
+                logging.error(f"Page cache listener failed, clearing cache and reconnecting: {e}")
+                self.cache.clear()
+                time.sleep(PAGE_CACHE_RECONNECT_DELAY)
+            finally:
+                if conn is not None:
+                    conn.close()
@@ -0,0 +1,76 @@
+import os
+import sys
+from contextlib import contextmanager
+from datetime import datetime, timezone, timedelta
+from unittest.mock import patch, MagicMock
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import app as web_app
+from app import app, encode_cursor, decode_cursor
+
+client = app.test_client()
+
+
+@pytest.fixture(autouse=True)
+def empty_page_cache():
+    web_app.page_cache.clear()
+    with patch("app.PAGE_CACHE_LISTEN", False):
+        yield
+
+
+def fake_connection(page_ids, rows):
+    """get_connection() stand-in returning `page_ids` for the id query and `rows` for the article query."""
+    cur = MagicMock()
+    cur.__enter__.return_value = cur
+    cur.fetchall.side_effect = [[(article_id,) for article_id in page_ids], rows]
+    conn = MagicMock()
+    conn.cursor.return_value = cur
+
+    @contextmanager
+    def get_connection():
+        yield conn
+    return get_connection
+
+
+def article_row(article_id, timestamp):
+    return (article_id, f"Title {article_id}", False, "summary", "https://example.com", timestamp, None, None, [])
+
+# --- Cursors round-trip, with and without a UTC offset ---
+@pytest.mark.parametrize("timestamp", [
+    datetime(2025, 5, 1, 10, 30, 15, 123456),
+    datetime(2025, 5, 1, 10, 30, tzinfo=timezone.utc),
+    datetime(2025, 5, 1, 10, 30, tzinfo=timezone(timedelta(hours=-5))),
+])
+def test_cursor_round_trip(timestamp):
+    assert decode_cursor(encode_cursor(timestamp, 42)) == (timestamp, 42)
+
+# --- Malformed input is rejected before touching the database or the cache ---
+@pytest.mark.parametrize("query", [
+    "?cursor=garbage",
+    "?cursor=2025-05-01T10:00:00_x",
+    "?cursor=notadate_12",
+    "?date=yesterday",
+    "?date=2025-13-01",
+])
+@patch("app.get_connection")
+def test_bad_query_returns_400(mock_get_connection, query):
+    assert client.get(f"/{query}").status_code == 400
+    mock_get_connection.assert_not_called()
+
+# --- A next link only when there are more articles than the page size ---
+@patch("app.ARTICLES_PAGE_SIZE", 2)
+def test_next_cursor_only_past_page_size():
+    rows = [article_row(3, datetime(2025, 5, 1, 12)), article_row(2, datetime(2025, 5, 1, 11))]
+
+    with patch("app.get_connection", fake_connection([3, 2], rows)):
+        response = client.get("/?date=2025-05-01")
+    assert response.status_code == 200
+    assert b"cursor=" not in response.data
+
+    web_app.page_cache.clear()
+    with patch("app.get_connection", fake_connection([3, 2, 1], rows)):
+        response = client.get("/?date=2025-05-01")
+    assert response.status_code == 200
+    assert b"cursor=2025-05-01T11:00:00_2" in response.data
@@ -0,0 +1,99 @@
+"""
+Tests for db_pool.py. The web app and the RSS reader are built from separate
+Docker contexts, so each ships its own copy of the module; both copies are
+tested and must stay identical.
+"""
+import os
+import time
+import importlib.util
+from unittest.mock import patch, MagicMock
+import pytest
+import psycopg2
+from psycopg2 import pool
+from psycopg2.extensions import TRANSACTION_STATUS_IDLE, TRANSACTION_STATUS_INTRANS
+
+ROOT = os.path.join(os.path.dirname(__file__), "..", "..")
+COPIES = {
+    "web-app": os.path.join(ROOT, "web-app", "db_pool.py"),
+    "rss-reader": os.path.join(ROOT, "rss-reader", "scripts", "db_pool.py"),
+}
+
+
+class FakePool:
+    def __init__(self, connections):
+        self.connections = list(connections)
+        self.returned = []
+
+    def getconn(self):
+        return self.connections.pop(0)
+
+    def putconn(self, conn, close=False):
+        self.returned.append((conn, close))
+
+
+def fake_conn(status=TRANSACTION_STATUS_IDLE):
+    conn = MagicMock()
+    conn.closed = 0
+    conn.get_transaction_status.return_value = status
+    return conn
+
+
+@pytest.fixture(params=sorted(COPIES))
+def db_pool(request):
+    """A fresh copy of the module with a two-connection limit and a short timeout."""
+    with patch.dict(os.environ, {"DB_POOL_MAX": "2", "DB_POOL_TIMEOUT": "0.05", "DB_POOL_CHECK_AFTER": "60"}):
+        spec = importlib.util.spec_from_file_location(f"db_pool_{request.param}", COPIES[request.param])
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+    return module
+
+
+def test_copies_are_identical():
+    contents = {name: open(path).read() for name, path in COPIES.items()}
+    assert contents["web-app"] == contents["rss-reader"]
+
+# --- At most DB_POOL_MAX connections are checked out; the next caller times out ---
+def test_checkouts_are_bounded(db_pool):
+    db_pool._pool = FakePool([fake_conn() for _ in range(4)])
+    with db_pool.get_connection(), db_pool.get_connection():
+        with pytest.raises(pool.PoolError):
+            with db_pool.get_connection():
+                pass
+    # Both slots are free again
+    with db_pool.get_connection(), db_pool.get_connection():
+        pass
+
+# --- A connection idle past DB_POOL_CHECK_AFTER that fails SELECT 1 is replaced ---
+def test_dead_connection_is_replaced(db_pool):
+    dead, fresh = fake_conn(), fake_conn()
+    dead.cursor.return_value.__enter__.return_value.execute.side_effect = psycopg2.OperationalError("gone")
+    db_pool._last_used[id(dead)] = time.monotonic() - 120
+    db_pool._pool = FakePool([dead, fresh])
+
+    with db_pool.get_connection() as conn:
+        assert conn is fresh
+    assert db_pool._pool.returned == [(dead, True), (fresh, False)]
+
+# --- A transaction left open by the caller is rolled back before reuse ---
+def test_open_transaction_is_rolled_back(db_pool):
+    conn = fake_conn(TRANSACTION_STATUS_INTRANS)
+    db_pool._pool = FakePool([conn])
+    with db_pool.get_connection():
+        pass
+    conn.rollback.assert_called_once()
+    assert db_pool._pool.returned == [(conn, False)]
+
+# --- A connection whose rollback fails, or that closed while in use, is discarded ---
+def test_broken_connection_is_discarded(db_pool):
+    failing = fake_conn(TRANSACTION_STATUS_INTRANS)
+    failing.rollback.side_effect = psycopg2.InterfaceError("connection already closed")
+    closed = fake_conn()
+    db_pool._pool = FakePool([failing, closed])
+
+    with pytest.raises(RuntimeError):
+        with db_pool.get_connection():
+            raise RuntimeError("query failed")
+    with db_pool.get_connection() as conn:
+        conn.closed = 2
+
+    assert db_pool._pool.returned == [(failing, True), (closed, True)]
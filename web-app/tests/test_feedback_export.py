@@ -0,0 +1,103 @@
+import os
+import sys
+import json
+from datetime import datetime
+from contextlib import contextmanager
+from unittest.mock import patch, MagicMock
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from feedback_store import FeedbackBuffer
+from tweet_relevance.export_feedback import export_feedback, load_export_state
+
+
+class FakeFeedbackTable:
+    """Connection whose named cursor streams the feedback rows with an id above the query parameter."""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.queried_after = []
+
+    def cursor(self, name=None):
+        cur = MagicMock()
+        cur.__enter__.return_value = cur
+
+        def execute(query, params):
+            self.queried_after.append(params[0])
+            cur.__iter__.return_value = iter([row for row in self.rows if row[0] > params[0]])
+        cur.execute.side_effect = execute
+        return cur
+
+    def rollback(self):
+        pass
+
+
+def feedback_row(feedback_id, tweet, label=1):
+    return (feedback_id, datetime(2025, 5, 1, 10, 0, feedback_id), "Headline", tweet, label)
+
+# --- Rows above the high-water mark are appended and the mark advances ---
+def test_export_appends_new_rows_only(tmp_path):
+    csv_path, state_path = tmp_path / "feedback_log.csv", tmp_path / ".feedback_export.json"
+    table = FakeFeedbackTable([feedback_row(1, "first"), feedback_row(2, "second")])
+
+    assert export_feedback(table, csv_path=str(csv_path), state_path=str(state_path)) == 2
+    before = csv_path.read_bytes()
+    assert json.loads(state_path.read_text()) == {"last_id": 2, "rows": 2}
+
+    table.rows.append(feedback_row(3, "third", 0))
+    assert export_feedback(table, csv_path=str(csv_path), state_path=str(state_path)) == 1
+    assert table.queried_after == [0, 2]
+    # Append-only: earlier bytes are untouched, so training offsets stay valid
+    assert csv_path.read_bytes().startswith(before)
+    assert pd.read_csv(csv_path)["tweet"].tolist() == ["first", "second", "third"]
+    assert json.loads(state_path.read_text()) == {"last_id": 3, "rows": 3}
+
+    # Nothing new: the CSV and the mark stay as they are
+    after = csv_path.read_bytes()
+    assert export_feedback(table, csv_path=str(csv_path), state_path=str(state_path)) == 0
+    assert csv_path.read_bytes() == after
+    assert json.loads(state_path.read_text()) == {"last_id": 3, "rows": 3}
+
+# --- Without a state file, rows already in the CSV are counted once ---
+def test_state_falls_back_to_existing_csv(tmp_path):
+    csv_path, state_path = tmp_path / "feedback_log.csv", tmp_path / ".feedback_export.json"
+    csv_path.write_text("timestamp,headline,tweet,user_label\n2025-01-01,H,old one,1\n2025-01-01,H,old two,0\n")
+    assert load_export_state(str(state_path), str(csv_path)) == {"last_id": 0, "rows": 2}
+    assert load_export_state(str(tmp_path / "missing.json"), str(tmp_path / "missing.csv")) == {"last_id": 0, "rows": 0}
+
+    # An empty export still writes the state, so check_window sees the legacy rows
+    assert export_feedback(FakeFeedbackTable([]), csv_path=str(csv_path), state_path=str(state_path)) == 0
+    assert json.loads(state_path.read_text()) == {"last_id": 0, "rows": 2}
+
+    table = FakeFeedbackTable([feedback_row(7, "new")])
+    export_feedback(table, csv_path=str(csv_path), state_path=str(state_path))
+    assert json.loads(state_path.read_text()) == {"last_id": 7, "rows": 3}
+    # The header is written once, by whoever created the file
+    assert csv_path.read_text().count("timestamp,headline") == 1
+
+
+@contextmanager
+def failing_connection():
+    raise ConnectionError("database down")
+    yield
+
+# --- Rows from a failed flush are put back in front and written by the next flush ---
+def test_flush_requeues_rows_on_error():
+    buffer = FeedbackBuffer(batch_size=100, flush_interval=60)
+    with patch.object(buffer, "_ensure_thread"):
+        buffer.add("t1", "H", "first", 1)
+        buffer.add("t2", "H", "second", 0)
+
+        with patch("feedback_store.get_connection", failing_connection):
+            assert buffer.flush() == 0
+        buffer.add("t3", "H", "third", 1)
+
+        written = []
+        with patch("feedback_store.get_connection", return_value=MagicMock()), \
+             patch("feedback_store.execute_values", side_effect=lambda cur, query, rows, page_size: written.extend(rows)):
+            assert buffer.flush() == 3
+            assert buffer.flush() == 0
+
+    assert [row[2] for row in written] == ["first", "second", "third"]
@@ -0,0 +1,112 @@
+import os
+import csv
+import sys
+from unittest.mock import patch
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from tweet_relevance import feedback_trainer
+from tweet_relevance.feedback_trainer import read_rows_after, retrain_incremental, load_metadata
+
+
+def append_rows(path, rows, header=False):
+    with open(path, "a", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        if header:
+            writer.writerow(["timestamp", "headline", "tweet", "user_label"])
+        for i, (tweet, label) in enumerate(rows):
+            writer.writerow([f"2025-05-01T10:00:{i:02d}", "Python 3.14 released", tweet, label])
+
+
+@pytest.fixture
+def trainer(tmp_path, monkeypatch):
+    """Run in tmp_path with the model bundle kept in memory; yields the feedback log path."""
+    monkeypatch.chdir(tmp_path)
+    saved = {}
+
+    def load_bundle():
+        if "bundle" not in saved:
+            raise FileNotFoundError("no bundle")
+        return saved["bundle"], "test"
+
+    with patch.object(feedback_trainer, "save_bundle", side_effect=lambda bundle: saved.update(bundle=bundle)), \
+         patch.object(feedback_trainer, "load_bundle", side_effect=load_bundle), \
+         patch.object(feedback_trainer, "partial_fit_rows", wraps=feedback_trainer.partial_fit_rows) as fit:
+        yield tmp_path / "feedback_log.csv", fit
+
+
+def fitted_tweets(fit):
+    """Tweets passed to the last partial_fit_rows call."""
+    texts = fit.call_args.args[3]
+    return [text.split(" [SEP] ")[1] for text in texts]
+
+# --- Only rows after the byte offset are parsed, with the header reused ---
+def test_read_rows_after(tmp_path):
+    path = tmp_path / "feedback_log.csv"
+    append_rows(path, [("a tweet\nover two lines", 1), ("second", 0)], header=True)
+    rows, end = read_rows_after(path, 0)
+    assert rows["tweet"].tolist() == ["a tweet\nover two lines", "second"]
+    assert end == os.path.getsize(path)
+
+    append_rows(path, [('quoted, "comma"', 1)])
+    rows, new_end = read_rows_after(path, end)
+    assert list(rows.columns) == ["timestamp", "headline", "tweet", "user_label"]
+    assert rows["tweet"].tolist() == ['quoted, "comma"']
+    assert new_end == os.path.getsize(path)
+
+    rows, _ = read_rows_after(path, new_end)
+    assert rows.empty
+
+# --- First run refits on everything; later runs fit only the appended rows ---
+def test_incremental_updates_from_checkpoint(trainer):
+    path, fit = trainer
+    append_rows(path, [("great release", 1), ("unrelated", 0)], header=True)
+    retrain_incremental(path)
+    assert fitted_tweets(fit) == ["great release", "unrelated"]
+    metadata = load_metadata()
+    assert (metadata["trained_rows"], metadata["trained_offset"], metadata["updates_since_full_refit"]) == (
+        2, os.path.getsize(path), 0)
+
+    append_rows(path, [("new features", 1)])
+    retrain_incremental(path)
+    assert fitted_tweets(fit) == ["new features"]
+    metadata = load_metadata()
+    assert (metadata["trained_rows"], metadata["trained_offset"], metadata["updates_since_full_refit"]) == (
+        3, os.path.getsize(path), 1)
+
+    # Nothing appended: no fit and the checkpoint stays where it is
+    retrain_incremental(path)
+    assert fit.call_count == 2
+    assert load_metadata()["updates_since_full_refit"] == 1
+
+# --- A log that shrank or was rewritten in place is refit from the start ---
+@pytest.mark.parametrize("rewrite", ["shorter", "same_length"])
+def test_rewritten_log_triggers_full_refit(trainer, rewrite):
+    path, fit = trainer
+    append_rows(path, [("first tweet", 1), ("second tweet", 0)], header=True)
+    retrain_incremental(path)
+
+    os.remove(path)
+    if rewrite == "shorter":
+        append_rows(path, [("other", 1)], header=True)
+    else:
+        append_rows(path, [("FIRST TWEET", 1), ("SECOND TWEET", 0)], header=True)
+    retrain_incremental(path)
+
+    assert fitted_tweets(fit) == (["other"] if rewrite == "shorter" else ["FIRST TWEET", "SECOND TWEET"])
+    assert load_metadata()["updates_since_full_refit"] == 0
+
+# --- Every FULL_REFIT_EVERY updates the model is rebuilt on the whole log ---
+@patch.object(feedback_trainer, "FULL_REFIT_EVERY", 2)
+def test_periodic_full_refit(trainer):
+    path, fit = trainer
+    append_rows(path, [("row 0", 1)], header=True)
+    retrain_incremental(path)
+    for i in range(1, 4):
+        append_rows(path, [(f"row {i}", i % 2)])
+        retrain_incremental(path)
+
+    # Run 1 is the initial refit, runs 2-3 are updates, run 4 refits all four rows
+    assert [len(call.args[3]) for call in fit.call_args_list] == [1, 1, 1, 4]
+    assert load_metadata()["updates_since_full_refit"] == 0
@@ -0,0 +1,99 @@
+import os
+import sys
+from contextlib import contextmanager
+from datetime import datetime
+from unittest.mock import patch, MagicMock
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from image_cache import ImageCache, guess_mimetype
+from app import app
+
+client = app.test_client()
+
+PNG = b"\x89PNG\r\n\x1a\n" + b"x" * 32
+
+
+def fake_connection(row):
+    """get_connection() stand-in whose query returns `row` (None for an unknown article)."""
+    cur = MagicMock()
+    cur.__enter__.return_value = cur
+    cur.fetchone.return_value = row
+    conn = MagicMock()
+    conn.cursor.return_value = cur
+
+    @contextmanager
+    def get_connection():
+        yield conn
+    get_connection.cursor = cur
+    return get_connection
+
+
+@pytest.fixture(autouse=True)
+def empty_image_cache():
+    with patch("app.image_cache", ImageCache(1024)):
+        yield
+
+# --- The cache holds at most max_bytes, evicting the least recently used ---
+def test_evicts_least_recently_used_by_size():
+    cache = ImageCache(max_bytes=100)
+    cache.put(1, b"a" * 40)
+    cache.put(2, b"b" * 40)
+    cache.get(1)
+    cache.put(3, b"c" * 40)
+    assert cache.get(2) is None
+    assert cache.get(1)["data"] == b"a" * 40
+    assert cache.get(3)["data"] == b"c" * 40
+
+    # Replacing an entry frees its old size
+    cache.put(3, b"c" * 10)
+    cache.put(4, b"d" * 50)
+    assert cache.get(1) is not None and cache.get(4) is not None
+
+    # Larger than the cache: returned for this response but not kept
+    entry = cache.put(5, b"e" * 101)
+    assert entry["data"] == b"e" * 101
+    assert cache.get(5) is None
+
+def test_entry_metadata():
+    entry = ImageCache(1024).put(1, PNG)
+    assert entry["mimetype"] == "image/png"
+    assert len(entry["etag"]) == 32
+    assert guess_mimetype(b"GIF89a") == "image/gif"
+    assert guess_mimetype(b"\xff\xd8\xff") == "image/jpeg"
+
+# --- Endpoint: unknown ids and articles without an image are 404 ---
+@pytest.mark.parametrize("row", [None, (None, None, None)])
+def test_missing_image_is_404(row):
+    with patch("app.get_connection", fake_connection(row)):
+        assert client.get("/image/7").status_code == 404
+
+# --- Endpoint: ETag and Last-Modified validators answer 304 from the cache ---
+def test_conditional_requests():
+    published = datetime(2025, 5, 1, 10, 0, 0)
+    get_connection = fake_connection((PNG, "abc123", published))
+    with patch("app.get_connection", get_connection):
+        response = client.get("/image/7")
+        assert response.status_code == 200
+        assert response.data == PNG
+        assert response.mimetype == "image/png"
+        assert response.headers["ETag"] == '"abc123-full"'
+        assert "max-age" in response.headers["Cache-Control"]
+
+        response = client.get("/image/7", headers={"If-None-Match": '"abc123-full"'})
+        assert response.status_code == 304
+        assert response.data == b""
+
+        response = client.get("/image/7", headers={"If-Modified-Since": "Thu, 01 May 2025 10:00:00 GMT"})
+        assert response.status_code == 304
+
+        response = client.get("/image/7", headers={"If-None-Match": '"other"'})
+        assert response.status_code == 200
+
+        # The thumbnail is a separate entry with its own ETag
+        response = client.get("/image/7?variant=thumb")
+        assert response.headers["ETag"] == '"abc123-thumb"'
+
+    # Later requests for the same variant were served from the cache
+    assert get_connection.cursor.execute.call_count == 2
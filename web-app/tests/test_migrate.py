@@ -0,0 +1,98 @@
+"""
+Tests for migrate.py. The database image, the RSS reader and the web app each
+ship their own copy of the module (separate Docker contexts); all copies must
+stay identical.
+"""
+import os
+import sys
+from unittest.mock import MagicMock
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from migrate import MIGRATIONS, MIGRATION_LOCK_ID, apply_migrations
+
+ROOT = os.path.join(os.path.dirname(__file__), "..", "..")
+COPIES = {
+    "database": os.path.join(ROOT, "database", "scripts", "migrate.py"),
+    "web-app": os.path.join(ROOT, "web-app", "migrate.py"),
+    "rss-reader": os.path.join(ROOT, "rss-reader", "scripts", "migrate.py"),
+}
+
+
+class FakeDatabase:
+    """Connection recording executed statements; schema_migrations starts with `applied`."""
+
+    def __init__(self, applied=(), fail_on=None):
+        self.recorded = list(applied)
+        self.fail_on = fail_on
+        self.statements = []
+        self.committed = []
+        self.pending = []
+        self.rollbacks = 0
+
+    def cursor(self):
+        cur = MagicMock()
+        cur.__enter__.return_value = cur
+
+        def execute(query, params=None):
+            if self.fail_on and self.fail_on in query:
+                raise RuntimeError("statement failed")
+            self.statements.append((query, params))
+            if query.startswith("INSERT INTO schema_migrations"):
+                self.pending.append(params[0])
+        cur.execute.side_effect = execute
+        cur.fetchall.side_effect = lambda: [(version,) for version in self.recorded]
+        return cur
+
+    def commit(self):
+        self.recorded.extend(self.pending)
+        self.committed.extend(self.pending)
+        self.pending = []
+
+    def rollback(self):
+        self.pending = []
+        self.rollbacks += 1
+
+
+def test_copies_are_identical():
+    contents = {name: open(path).read() for name, path in COPIES.items()}
+    assert contents["web-app"] == contents["database"]
+    assert contents["rss-reader"] == contents["database"]
+
+
+def test_versions_are_unique_and_ordered():
+    versions = [version for version, _, _ in MIGRATIONS]
+    assert versions == sorted(set(versions))
+    assert versions[0] == 1
+
+# --- Only versions missing from schema_migrations run, in order, under the lock ---
+def test_applies_missing_versions_in_order():
+    migrations = [
+        (3, "third", ["SELECT 3"]),
+        (1, "first", ["SELECT 1"]),
+        (2, "second", ["SELECT 2a", "SELECT 2b"]),
+    ]
+    db = FakeDatabase(applied=[1])
+    assert apply_migrations(db, migrations) == [2, 3]
+    assert db.committed == [2, 3]
+
+    statements = {statement for _, _, body in migrations for statement in body}
+    ran = [query for query, _ in db.statements if query in statements]
+    assert ran == ["SELECT 2a", "SELECT 2b", "SELECT 3"]
+    assert db.statements[1] == ("SELECT pg_advisory_lock(%s);", (MIGRATION_LOCK_ID,))
+    assert db.statements[-1] == ("SELECT pg_advisory_unlock(%s);", (MIGRATION_LOCK_ID,))
+
+    # A second runner finds nothing left to do
+    assert apply_migrations(db, migrations) == []
+
+# --- A failing migration is rolled back, later ones do not run, and the lock is released ---
+def test_failed_migration_stops_the_run():
+    migrations = [(1, "first", ["SELECT 1"]), (2, "broken", ["SELECT broken"]), (3, "third", ["SELECT 3"])]
+    db = FakeDatabase(fail_on="broken")
+    with pytest.raises(RuntimeError):
+        apply_migrations(db, migrations)
+    assert db.committed == [1]
+    assert db.rollbacks == 1
+    assert "SELECT 3" not in [query for query, _ in db.statements]
+    assert db.statements[-1] == ("SELECT pg_advisory_unlock(%s);", (MIGRATION_LOCK_ID,))
@@ -0,0 +1,75 @@
+import os
+import sys
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from page_cache import PageCache
+
+# --- A page rendered from data read before an invalidation is not cached ---
+def test_put_with_stale_version_is_dropped():
+    cache = PageCache(max_bytes=1024)
+    version = cache.version("2025-05-01")
+    cache.invalidate_date("2025-05-01")
+    cache.put(("2025-05-01", None), "<p>old</p>", 60, version)
+    assert cache.get(("2025-05-01", None)) is None
+
+    cache.put(("2025-05-01", None), "<p>new</p>", 60, cache.version("2025-05-01"))
+    assert cache.get(("2025-05-01", None)) == "<p>new</p>"
+
+# --- clear() also rejects pages queried before it ---
+def test_put_after_clear_is_dropped():
+    cache = PageCache(max_bytes=1024)
+    version = cache.version("2025-05-01")
+    cache.clear()
+    cache.put(("2025-05-01", None), "<p>old</p>", 60, version)
+    assert cache.get(("2025-05-01", None)) is None
+
+# --- Invalidating a date drops all of its pages and no others ---
+def test_invalidate_date_only_drops_that_date():
+    cache = PageCache(max_bytes=1024)
+    for key in [("2025-05-01", None), ("2025-05-01", "cursor"), ("2025-05-02", None)]:
+        cache.put(key, f"<p>{key}</p>", 60, cache.version(key[0]))
+
+    cache.invalidate_date("2025-05-01")
+    assert cache.get(("2025-05-01", None)) is None
+    assert cache.get(("2025-05-01", "cursor")) is None
+    assert cache.get(("2025-05-02", None)) == "<p>('2025-05-02', None)</p>"
+
+# --- The least recently used pages are evicted to stay within max_bytes ---
+def test_evicts_least_recently_used_by_size():
+    cache = PageCache(max_bytes=20)
+    for name in "abc":
+        cache.put((name, None), name * 8, 60, cache.version(name))
+    # 24 bytes > 20: "a", the oldest, is gone
+    assert cache.get(("a", None)) is None
+
+    cache.get(("b", None))
+    cache.put(("d", None), "d" * 8, 60, cache.version("d"))
+    assert cache.get(("c", None)) is None
+    assert cache.get(("b", None)) == "b" * 8
+    assert cache.get(("d", None)) == "d" * 8
+
+    # Larger than the whole cache: never stored
+    cache.put(("e", None), "e" * 21, 60, cache.version("e"))
+    assert cache.get(("e", None)) is None
+
+# --- Entries expire after their TTL ---
+@patch("page_cache.time.monotonic")
+def test_entries_expire(mock_monotonic):
+    mock_monotonic.return_value = 100.0
+    cache = PageCache(max_bytes=1024)
+    cache.put(("2025-05-01", None), "<p>page</p>", 10, cache.version("2025-05-01"))
+    assert cache.get(("2025-05-01", None)) == "<p>page</p>"
+    mock_monotonic.return_value = 110.0
+    assert cache.get(("2025-05-01", None)) is None
+
+# --- Closed days get the long TTL, today the short one ---
+def test_page_ttl_by_date():
+    import app
+
+    today = datetime.now().strftime('%Y-%m-%d')
+    yesterday = (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d')
+    assert app.page_ttl(yesterday) == app.PAGE_CACHE_PAST_TTL
+    assert app.page_ttl(today) == app.PAGE_CACHE_TODAY_TTL
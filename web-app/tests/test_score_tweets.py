@@ -0,0 +1,82 @@
+import os
+import sys
+from unittest.mock import patch, MagicMock
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from tweet_relevance import score_tweets
+
+
+class FakeLinks:
+    """article_tweets rows as {(article_id, tweet_id): model_version}, behind a fake connection."""
+
+    def __init__(self, links):
+        self.links = dict(links)
+        self.updated = []
+        self.commits = 0
+
+    def cursor(self):
+        cur = MagicMock()
+        cur.__enter__.return_value = cur
+
+        def execute(query, params):
+            current_version, limit = params[0], params[-1]
+            stale = sorted(key for key, version in self.links.items() if version != current_version)
+            cur.fetchall.return_value = [(a, t, f"headline {a}", f"tweet {t}") for a, t in stale[:limit]]
+        cur.execute.side_effect = execute
+        return cur
+
+    def commit(self):
+        self.commits += 1
+
+    def execute_values(self, cur, query, records, page_size):
+        for article_id, tweet_id, relevant, confidence, model_version in records:
+            self.links[(article_id, tweet_id)] = model_version
+            self.updated.append((article_id, tweet_id))
+
+
+@pytest.fixture
+def fake_scorer():
+    scorer = MagicMock()
+    scorer.model_version.return_value = "v2"
+    scorer.score_versioned.side_effect = lambda pairs: ("v2", [{"relevant": True, "confidence": 0.9}] * len(pairs))
+    with patch.object(score_tweets, "scorer", scorer):
+        yield scorer
+
+
+# --- Only links without a score or scored by another model version are rewritten ---
+def test_only_stale_links_are_rescored(fake_scorer):
+    conn = FakeLinks({(1, 1): "v2", (1, 2): None, (2, 3): "v1", (2, 4): "v2", (3, 5): "v1"})
+    with patch.object(score_tweets, "execute_values", conn.execute_values):
+        scored = score_tweets.score_stale_tweets(conn, batch_size=2)
+
+    assert scored == 3
+    assert conn.updated == [(1, 2), (2, 3), (3, 5)]
+    assert set(conn.links.values()) == {"v2"}
+    # A full batch and a partial one, each committed on its own
+    assert conn.commits == 2
+
+# --- A full last batch needs one more query to see that nothing is left ---
+def test_batches_stop_when_caught_up(fake_scorer):
+    conn = FakeLinks({(1, 1): None, (1, 2): None})
+    with patch.object(score_tweets, "execute_values", conn.execute_values):
+        assert score_tweets.score_stale_tweets(conn, batch_size=2) == 2
+        assert score_tweets.score_stale_tweets(conn, batch_size=2) == 0
+    assert conn.commits == 1
+
+# --- The worker keeps scoring while there is work, then sleeps ---
+class Slept(Exception):
+    pass
+
+def test_watch_loop_sleeps_once_caught_up():
+    with patch.object(score_tweets, "connect") as mock_connect, \
+         patch.object(score_tweets, "score_stale_tweets", side_effect=[500, 20, 0]) as mock_score, \
+         patch.object(score_tweets.time, "sleep", side_effect=Slept) as mock_sleep:
+        mock_connect.return_value.closed = False
+        with pytest.raises(Slept):
+            score_tweets.run_scoring_worker(interval=7)
+
+    assert mock_score.call_count == 3
+    mock_connect.assert_called_once()
+    mock_sleep.assert_called_once_with(7)
@@ -0,0 +1,65 @@
+# tweet_relevance/bench_retrain.py
+"""
+Compare full refits against incremental updates as feedback accumulates. The
+labelled initial dataset is replayed as a feedback stream in batches; after each
+batch both strategies retrain and are scored on the same held-out rows.
+
+    python bench_retrain.py --batch 250
+"""
+import time
+import argparse
+import pandas as pd
+from sklearn.model_selection import train_test_split
+from sklearn.metrics import accuracy_score
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.linear_model import LogisticRegression
+from feedback_trainer import (
+    combine_texts, build_hashing_vectorizer, new_incremental_state, new_sgd_classifier, partial_fit_rows
+)
+
+DATASET = "data/initial_dataset/initial_relevance_dataset.csv"
+
+
+def full_refit(rows):
+    vectorizer = TfidfVectorizer(max_features=5000)
+    X = vectorizer.fit_transform(combine_texts(rows))
+    clf = LogisticRegression(max_iter=500)
+    clf.fit(X, rows["label"])
+    return clf, vectorizer
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch", type=int, default=250)
+    args = parser.parse_args()
+
+    df = pd.read_csv(DATASET)
+    stream, test = train_test_split(df, test_size=0.2, stratify=df["label"], random_state=42)
+    test_texts = combine_texts(test)
+
+    clf, vectorizer, state = new_sgd_classifier(), build_hashing_vectorizer(), new_incremental_state()
+    full_total = incremental_total = 0.0
+    print(f"{'rows':>6} {'full acc':>9} {'full s':>8} {'incr acc':>9} {'incr s':>8}")
+    for end in range(args.batch, len(stream) + args.batch, args.batch):
+        seen = stream.iloc[:end]
+        batch = stream.iloc[end - args.batch:end]
+
+        start = time.perf_counter()
+        full_clf, full_vectorizer = full_refit(seen)
+        full_time = time.perf_counter() - start
+        full_acc = accuracy_score(test["label"], full_clf.predict(full_vectorizer.transform(test_texts)))
+
+        start = time.perf_counter()
+        partial_fit_rows(clf, vectorizer, state, combine_texts(batch), batch["label"].tolist())
+        incremental_time = time.perf_counter() - start
+        incremental_acc = accuracy_score(test["label"], clf.predict(vectorizer.transform(test_texts)))
+
+        full_total += full_time
+        incremental_total += incremental_time
+        print(f"{len(seen):>6} {full_acc:>9.3f} {full_time:>8.3f} {incremental_acc:>9.3f} {incremental_time:>8.3f}")
+
+    print(f"Total retrain time: full {full_total:.2f}s, incremental {incremental_total:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,7 @@ import pandas as pd
 import os
 import json
 import logging
+from export_feedback import load_export_state
 from sklearn.metrics import accuracy_score, classification_report
 import joblib
 
@@ -13,14 +14,19 @@ TRIGGER_FILE = '.trigger_file.txt'
 # Setup logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
+def count_feedback_rows():
+    """
+    Rows in feedback_log.csv, read from the counter export_feedback.py maintains
+    (it counts the CSV itself only before the first export).
+    """
+    return load_export_state()['rows']
+
 def should_retrain():
     try:
-        logging.info("Reading feedback data...")
-        current_data = pd.read_csv('feedback_log.csv')
-        current_rows = len(current_data)
+        current_rows = count_feedback_rows()
         logging.info(f"Total feedback rows: {current_rows}")
     except Exception as e:
-        logging.error(f"Failed to read feedback_log.csv: {e}")
+        logging.error(f"Failed to count feedback rows: {e}")
         return False, 0
 
     try:
@@ -1,17 +1,16 @@
 import os
 import pandas as pd
-import joblib
 import json
 from sklearn.metrics import accuracy_score, classification_report
 from dvclive import Live
+from infer import load_model_and_vectorizer
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 MODEL_DIR = os.path.join(BASE_DIR, "model")
 
 def evaluate_performance():
     # Load model and vectorizer
-    model = joblib.load(os.path.join(MODEL_DIR, "relevance_model.joblib"))
-    vectorizer = joblib.load(os.path.join(MODEL_DIR, "vectorizer.joblib"))
+    model, vectorizer = load_model_and_vectorizer()
     
     # Load test data (use last 20% of the data as test set)
     data = pd.read_csv('feedback_log.csv')
@@ -41,13 +40,18 @@ def evaluate_performance():
         for name, value in metrics.items():
             live.log_metric(name, value)
     
-    # Update training metadata
+    # Update training metadata, keeping the trainer's incremental checkpoint
+    metadata = {}
+    if os.path.exists('.training_metadata.json'):
+        with open('.training_metadata.json', 'r') as f:
+            metadata = json.load(f)
+    metadata.update({
+        'last_trained_rows': len(data),
+        'last_training_time': pd.Timestamp.now().isoformat(),
+        'metrics': metrics
+    })
     with open('.training_metadata.json', 'w') as f:
-        json.dump({
-            'last_trained_rows': len(data),
-            'last_training_time': pd.Timestamp.now().isoformat(),
-            'metrics': metrics
-        }, f)
+        json.dump(metadata, f)
     
     print(f"Model evaluation: Accuracy = {accuracy:.4f}")
     
@@ -0,0 +1,85 @@
+# tweet_relevance/export_feedback.py
+
+import os
+import csv
+import json
+import logging
+import psycopg2
+import pandas as pd
+from dotenv import load_dotenv
+
+# Setup logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+FEEDBACK_CSV = 'feedback_log.csv'
+# High-water mark of the export: last exported feedback id and total rows in the CSV
+EXPORT_STATE_FILE = '.feedback_export.json'
+EXPORT_FETCH_SIZE = int(os.getenv('FEEDBACK_EXPORT_FETCH_SIZE', 5000))
+FIELDNAMES = ["timestamp", "headline", "tweet", "user_label"]
+
+def load_export_state(state_path=EXPORT_STATE_FILE, csv_path=FEEDBACK_CSV):
+    """
+    The export high-water mark. Before the first export the CSV may already hold
+    rows logged by the old file-based endpoint, so they are counted once here.
+    """
+    try:
+        with open(state_path, 'r') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        rows = len(pd.read_csv(csv_path)) if os.path.exists(csv_path) else 0
+        return {"last_id": 0, "rows": rows}
+
+def save_export_state(state, state_path=EXPORT_STATE_FILE):
+    with open(state_path + ".tmp", 'w') as f:
+        json.dump(state, f)
+    os.replace(state_path + ".tmp", state_path)
+
+def export_feedback(conn, csv_path=FEEDBACK_CSV, state_path=EXPORT_STATE_FILE, fetch_size=EXPORT_FETCH_SIZE):
+    """
+    Append feedback rows with an id above the high-water mark to the CSV that DVC
+    tracks, then advance the mark. Only new rows are read, and the CSV stays
+    append-only so row offsets used as training checkpoints remain valid.
+    Returns the number of rows exported.
+    """
+    state = load_export_state(state_path, csv_path)
+    file_exists = os.path.exists(csv_path)
+    exported = 0
+    last_id = state["last_id"]
+
+    # Named cursor so a large backlog is streamed instead of loaded at once
+    with conn.cursor(name="feedback_export") as cur:
+        cur.itersize = fetch_size
+        cur.execute(
+            "SELECT id, created_at, headline, tweet, user_label FROM feedback WHERE id > %s ORDER BY id",
+            (last_id,)
+        )
+        with open(csv_path, mode="a", newline='', encoding="utf-8") as f:
+            writer = csv.writer(f)
+            if not file_exists:
+                writer.writerow(FIELDNAMES)
+            for feedback_id, created_at, headline, tweet, user_label in cur:
+                writer.writerow([created_at.isoformat(), headline, tweet, user_label])
+                last_id = feedback_id
+                exported += 1
+    conn.rollback()
+
+    if exported:
+        save_export_state({"last_id": last_id, "rows": state["rows"] + exported}, state_path)
+    elif not os.path.exists(state_path):
+        save_export_state(state, state_path)
+    logging.info(f"Exported {exported} feedback rows (up to id {last_id})")
+    return exported
+
+if __name__ == "__main__":
+    load_dotenv(override=True)
+    conn = psycopg2.connect(
+        host=os.getenv('DB_HOST'),
+        dbname=os.getenv('POSTGRES_DB'),
+        user=os.getenv('POSTGRES_USER'),
+        password=os.getenv('POSTGRES_PASSWORD'),
+        port="5432"
+    )
+    try:
+        export_feedback(conn)
+    finally:
+        conn.close()
@@ -1,17 +1,40 @@
 # tweet_relevance/model/feedback_trainer.py
 
+import io
 import os
-import joblib
+import hashlib
+import sys
+import json
+import numpy as np
 import pandas as pd
 import logging
-from sklearn.linear_model import LogisticRegression
-from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.linear_model import LogisticRegression, SGDClassifier
+from sklearn.feature_extraction.text import TfidfVectorizer, HashingVectorizer, TfidfTransformer
+from sklearn.pipeline import Pipeline
+
+try:
+    from .infer import BUNDLE_PATH, load_bundle, save_bundle
+except ImportError:  # run as a script from the tweet_relevance directory (dvc stage)
+    from infer import BUNDLE_PATH, load_bundle, save_bundle
 
 # Setup logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 MODEL_DIR = os.path.join(BASE_DIR, "model")
+METADATA_FILE = '.training_metadata.json'
+
+# "full" refits TF-IDF + logistic regression on the whole log. "incremental" updates
+# a hashing + SGD model with the rows added since the last checkpoint instead; it is
+# a different model family, so it is opt-in.
+RETRAIN_MODE = os.getenv('RETRAIN_MODE', 'full')
+# Bytes at the start of the log hashed to notice that it was rewritten in place
+CHECKPOINT_PREFIX_BYTES = 64 * 1024
+# Incremental mode refits from scratch after this many updates to undo drift
+FULL_REFIT_EVERY = int(os.getenv('FULL_REFIT_EVERY', 20))
+HASH_FEATURES = int(os.getenv('HASH_FEATURES', 2 ** 18))
+INCREMENTAL_EPOCHS = int(os.getenv('INCREMENTAL_EPOCHS', 5))
+CLASSES = np.array([0, 1])
 
 def check_if_training_needed():
     try:
@@ -22,6 +45,52 @@ def check_if_training_needed():
         logging.error(f"Error reading trigger file: {e}")
         return False
 
+def load_metadata():
+    try:
+        with open(METADATA_FILE, 'r') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+    except Exception as e:
+        logging.error(f"Failed to read metadata file: {e}")
+        return {}
+
+def update_metadata(**fields):
+    """Merge fields into the training metadata, keeping what other stages wrote."""
+    metadata = load_metadata()
+    metadata.update(fields)
+    with open(METADATA_FILE + ".tmp", 'w') as f:
+        json.dump(metadata, f)
+    os.replace(METADATA_FILE + ".tmp", METADATA_FILE)
+
+def combine_texts(df):
+    return (df["headline"] + " [SEP] " + df["tweet"]).tolist()
+
+def save_model_atomically(clf, vectorizer, state=None):
+    """
+    Write the model, the vectorizer and the incremental state (document frequencies
+    carried between updates) as one bundle, moved into place with a single
+    os.replace, so a running RelevanceScorer never pairs parts of different runs.
+    """
+    save_bundle({"model": clf, "vectorizer": vectorizer, "incremental_state": state})
+
+def ensure_bundle(feedback_data_path):
+    """
+    Make sure the stage output exists even when no retrain is due: convert the
+    separate model/vectorizer files of older checkouts, or fit on the whole log
+    when there is no model at all.
+    """
+    if os.path.exists(BUNDLE_PATH):
+        return
+    try:
+        bundle, _ = load_bundle()
+    except FileNotFoundError:
+        logging.info("No model found, training one on the full feedback log")
+        retrain_model(feedback_data_path)
+        return
+    save_bundle(bundle)
+    logging.info(f"Converted the legacy model files to {BUNDLE_PATH}")
+
 def retrain_model(feedback_data_path):
     """
     Retrain the relevance model using new feedback data.
@@ -35,7 +104,7 @@ def retrain_model(feedback_data_path):
 
     try:
         logging.info("Combining headline and tweet...")
-        combined_texts = (df["headline"] + " [SEP] " + df["tweet"]).tolist()
+        combined_texts = combine_texts(df)
         labels = df["user_label"].tolist()
 
         logging.info("Vectorizing text...")
@@ -46,17 +115,140 @@ def retrain_model(feedback_data_path):
         clf = LogisticRegression(max_iter=500)
         clf.fit(X, labels)
 
-        os.makedirs(MODEL_DIR, exist_ok=True)
-        joblib.dump(clf, os.path.join(MODEL_DIR, "relevance_model.joblib"))
-        joblib.dump(vectorizer, os.path.join(MODEL_DIR, "vectorizer.joblib"))
+        save_model_atomically(clf, vectorizer)
+        update_metadata(training_mode="full", trained_rows=len(df), updates_since_full_refit=0)
 
         logging.info(f"Model retrained and saved to {MODEL_DIR}")
     except Exception as e:
         logging.error(f"Error during retraining: {e}")
 
+def build_hashing_vectorizer(n_features=HASH_FEATURES):
+    """
+    Stateless hashing features followed by an IDF weighting whose document
+    frequencies are carried forward between updates (see update_idf).
+    """
+    return Pipeline([
+        ("hash", HashingVectorizer(n_features=n_features, alternate_sign=False, norm=None)),
+        ("idf", TfidfTransformer()),
+    ])
+
+def new_incremental_state(n_features=HASH_FEATURES):
+    return {"df": np.zeros(n_features, dtype=np.int64), "n_docs": 0}
+
+def update_idf(vectorizer, state, texts):
+    """Count the document frequencies of `texts` into `state` and refresh the IDF weights."""
+    counts = vectorizer.named_steps["hash"].transform(texts)
+    counts.sum_duplicates()
+    state["df"] += np.bincount(counts.indices, minlength=len(state["df"]))
+    state["n_docs"] += len(texts)
+    # Same smoothed IDF as TfidfTransformer.fit: ln((1 + n) / (1 + df)) + 1
+    vectorizer.named_steps["idf"].idf_ = np.log((1 + state["n_docs"]) / (1 + state["df"])) + 1
+
+def partial_fit_rows(clf, vectorizer, state, texts, labels, epochs=INCREMENTAL_EPOCHS, seed=0):
+    """Fold new rows into the IDF and run a few shuffled partial_fit passes over them."""
+    update_idf(vectorizer, state, texts)
+    X = vectorizer.transform(texts)
+    y = np.asarray(labels)
+    rng = np.random.default_rng(seed)
+    for _ in range(epochs):
+        order = rng.permutation(len(y))
+        clf.partial_fit(X[order], y[order], classes=CLASSES)
+
+def new_sgd_classifier():
+    return SGDClassifier(loss="log_loss", alpha=1e-4, random_state=42)
+
+def load_incremental_model():
+    """(clf, vectorizer, state) from the last incremental run, or None if the saved model is not incremental."""
+    try:
+        bundle, _ = load_bundle()
+    except Exception as e:
+        logging.info(f"No incremental checkpoint to resume from: {e}")
+        return None
+    clf, vectorizer, state = bundle["model"], bundle["vectorizer"], bundle["incremental_state"]
+    if state is None or not isinstance(clf, SGDClassifier) or not isinstance(vectorizer, Pipeline):
+        return None
+    return clf, vectorizer, state
+
+def read_rows_after(feedback_data_path, offset):
+    """
+    Parse only the CSV rows after byte `offset` (the end of the last consumed row),
+    reusing the header line. Returns (rows, offset of the end of the file read).
+    The log is append-only, so the cost is proportional to the new rows.
+    """
+    with open(feedback_data_path, 'rb') as f:
+        header = f.readline()
+        f.seek(max(offset, f.tell()))
+        tail = f.read()
+        end = f.tell()
+    return pd.read_csv(io.BytesIO(header + tail)), end
+
+def prefix_digest(feedback_data_path, length):
+    """sha1 of the first `length` bytes of the log (capped at CHECKPOINT_PREFIX_BYTES)."""
+    with open(feedback_data_path, 'rb') as f:
+        return hashlib.sha1(f.read(min(length, CHECKPOINT_PREFIX_BYTES))).hexdigest()
+
+def retrain_incremental(feedback_data_path, force_full=False):
+    """
+    Update the hashing + SGD model with only the feedback rows added since the
+    checkpoint (a byte offset into the log) in the training metadata. Refits from
+    scratch on the whole log when there is no usable checkpoint, when the log is
+    shorter than the checkpoint or its start changed (rewritten rather than
+    appended to), every FULL_REFIT_EVERY updates, or when `force_full` is set.
+    """
+    try:
+        metadata = load_metadata()
+        trained_rows = metadata.get("trained_rows", 0)
+        offset = metadata.get("trained_offset")
+        updates = metadata.get("updates_since_full_refit", 0)
+        checkpoint = None if force_full else load_incremental_model()
+        full_refit = (
+            checkpoint is None or offset is None or updates >= FULL_REFIT_EVERY
+            or offset > os.path.getsize(feedback_data_path)
+            or metadata.get("trained_prefix") != prefix_digest(feedback_data_path, offset)
+        )
+
+        logging.info("Loading feedback data...")
+        new_rows, end = read_rows_after(feedback_data_path, 0 if full_refit else offset)
+    except Exception as e:
+        logging.error(f"Failed to load feedback data: {e}")
+        return
+
+    try:
+        if full_refit:
+            logging.info(f"Full refit of the incremental model on {len(new_rows)} rows...")
+            clf, vectorizer, state = new_sgd_classifier(), build_hashing_vectorizer(), new_incremental_state()
+            trained_rows = 0
+            updates = 0
+        else:
+            clf, vectorizer, state = checkpoint
+            updates += 1
+            if new_rows.empty:
+                logging.info("No new feedback since the last checkpoint")
+                return
+            logging.info(f"Incremental update with {len(new_rows)} new rows (checkpoint at row {trained_rows})...")
+
+        partial_fit_rows(clf, vectorizer, state, combine_texts(new_rows), new_rows["user_label"].tolist())
+
+        save_model_atomically(clf, vectorizer, state=state)
+        update_metadata(
+            training_mode="incremental",
+            trained_rows=trained_rows + len(new_rows),
+            trained_offset=end,
+            trained_prefix=prefix_digest(feedback_data_path, end),
+            updates_since_full_refit=updates
+        )
+
+        logging.info(f"Model updated and saved to {MODEL_DIR}")
+    except Exception as e:
+        logging.error(f"Error during incremental retraining: {e}")
+
 if __name__ == "__main__":
     if not check_if_training_needed():
         logging.info("Training skipped - not enough new data")
+        ensure_bundle("feedback_log.csv")
         exit(0)
 
-    retrain_model("feedback_log.csv")
+    if RETRAIN_MODE == "full":
+        retrain_model("feedback_log.csv")
+    else:
+        retrain_incremental("feedback_log.csv", force_full="--full" in sys.argv[1:])
@@ -1,29 +1,139 @@
 # tweet_relevance/model/infer.py
 
+import io
 import os
+import hashlib
+import threading
+import logging
 import joblib
 
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 MODEL_DIR = os.path.join(BASE_DIR, "model")
+# Single artifact holding {"model", "vectorizer", "incremental_state"}; replacing this
+# one file is what makes a retrain atomic for readers.
+BUNDLE_PATH = os.path.join(MODEL_DIR, "relevance_bundle.joblib")
+# Separate files written before the bundle existed, used only when there is no bundle
+MODEL_PATH = os.path.join(MODEL_DIR, "relevance_model.joblib")
+VECTORIZER_PATH = os.path.join(MODEL_DIR, "vectorizer.joblib")
+
+def _artifact_paths():
+    return (BUNDLE_PATH,) if os.path.exists(BUNDLE_PATH) else (MODEL_PATH, VECTORIZER_PATH)
+
+def save_bundle(bundle, path=BUNDLE_PATH):
+    """Write the bundle to a temporary file and move it into place with one os.replace."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    joblib.dump(bundle, path + ".tmp")
+    os.replace(path + ".tmp", path)
+
+def load_bundle():
+    """
+    Read the model artifact once and return (bundle, model_version). The version is
+    the content hash of exactly the bytes that were unpickled, so it always names
+    the loaded model even if the file is replaced meanwhile.
+    """
+    digest = hashlib.sha1()
+    blobs = []
+    for path in _artifact_paths():
+        with open(path, "rb") as f:
+            data = f.read()
+        digest.update(data)
+        blobs.append(data)
+    loaded = [joblib.load(io.BytesIO(data)) for data in blobs]
+    if len(loaded) == 1:
+        bundle = loaded[0]
+    else:
+        bundle = {"model": loaded[0], "vectorizer": loaded[1], "incremental_state": None}
+    return bundle, digest.hexdigest()[:12]
 
 def load_model_and_vectorizer():
-    clf = joblib.load(os.path.join(MODEL_DIR, "relevance_model.joblib"))
-    vectorizer = joblib.load(os.path.join(MODEL_DIR, "vectorizer.joblib"))
-    return clf, vectorizer
+    bundle, _ = load_bundle()
+    return bundle["model"], bundle["vectorizer"]
 
-def predict_relevance(headline, tweet):
+def _model_signature():
+    """Modification time and size of the model artifact, used to detect a retrain."""
+    return tuple(
+        (path, os.stat(path).st_mtime_ns, os.stat(path).st_size)
+        for path in _artifact_paths()
+    )
+
+class RelevanceScorer:
     """
-    Predict relevance of a tweet to a headline.
+    Process-wide relevance scorer.
+
+    The model and vectorizer are loaded once and kept in memory. On every call the
+    model artifact is stat'ed; when a retrain replaces it the new bundle is loaded
+    and swapped in as a single tuple. Model and vectorizer come from the same file,
+    written with one os.replace, so a request never sees a model from one training
+    run with the vectorizer from another.
     """
-    clf, vectorizer = load_model_and_vectorizer()
-    combined_text = headline + " [SEP] " + tweet
-    X = vectorizer.transform([combined_text])
 
-    pred = clf.predict(X)[0]
-    proba = clf.predict_proba(X)[0][pred]
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._state = None  # (signature, clf, vectorizer, model_version)
+
+    def _current(self):
+        state = self._state
+        try:
+            signature = _model_signature()
+        except OSError as e:
+            if state is None:
+                raise
+            logging.warning(f"Model files unavailable, keeping loaded model: {e}")
+            return state
+
+        if state is not None and state[0] == signature:
+            return state
+
+        with self._lock:
+            state = self._state
+            if state is not None and state[0] == signature:
+                return state
+            bundle, model_version = load_bundle()
+            # The file may have been replaced after the stat; the signature then no
+            # longer matches and the next call loads the newer bundle.
+            self._state = (signature, bundle["model"], bundle["vectorizer"], model_version)
+            logging.info(f"Relevance model {model_version} loaded")
+            return self._state
 
-    return {
-        "relevant": bool(pred),
-        "confidence": round(proba, 3)
-    }
+    def model_version(self):
+        return self._current()[3]
+
+    def score_batch(self, pairs):
+        """
+        Score a list of (headline, tweet) pairs with a single transform/predict_proba call.
+        Returns a list of {"relevant", "confidence"} dicts in the same order.
+        """
+        return self.score_versioned(pairs)[1]
+
+    def score_versioned(self, pairs):
+        """
+        Same as score_batch, but also returns the version of the model that produced
+        the scores: (model_version, results).
+        """
+        _, clf, vectorizer, model_version = self._current()
+        if not pairs:
+            return model_version, []
+
+        combined_texts = [headline + " [SEP] " + tweet for headline, tweet in pairs]
+        X = vectorizer.transform(combined_texts)
+
+        probas = clf.predict_proba(X)
+        preds = probas.argmax(axis=1)
+        classes = clf.classes_
+
+        return model_version, [
+            {
+                "relevant": bool(classes[pred]),
+                "confidence": round(float(proba[pred]), 3)
+            }
+            for pred, proba in zip(preds, probas)
+        ]
+
+scorer = RelevanceScorer()
+
+def predict_relevance(headline, tweet):
+    """
+    Predict relevance of a tweet to a headline.
+    """
+    return scorer.score_batch([(headline, tweet)])[0]
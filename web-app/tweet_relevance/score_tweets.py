@@ -0,0 +1,128 @@
+# tweet_relevance/score_tweets.py
+
+import os
+import sys
+import time
+import logging
+import psycopg2
+from psycopg2.extras import execute_values
+from dotenv import load_dotenv
+
+try:
+    from .infer import scorer
+except ImportError:  # run as a script from the tweet_relevance directory (dvc stage)
+    from infer import scorer
+
+# Setup logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+BATCH_SIZE = int(os.getenv('RELEVANCE_BATCH_SIZE', 500))
+# Pause of the scoring worker when nothing is left to score
+SCORE_INTERVAL = float(os.getenv('RELEVANCE_SCORE_INTERVAL', 30))
+
+def score_stale_tweets(conn, batch_size=BATCH_SIZE, max_batches=None, article_ids=None, publication_date=None):
+    """
+    Score article/tweet links that have no relevance score yet, or were scored by an
+    older model version, and write relevant/confidence/model_version back to
+    article_tweets. Scores are per link because relevance depends on the headline.
+
+    Rows are processed in batches of `batch_size`, each committed on its own, so a
+    backfill after a retrain makes steady progress without holding long transactions.
+    `article_ids` or `publication_date` restrict scoring to a subset of articles.
+    Returns the number of rows scored.
+    """
+    conditions = ["at.model_version IS DISTINCT FROM %s"]
+    params = []
+    if article_ids is not None:
+        conditions.append("at.article_id = ANY(%s)")
+        params.append(list(article_ids))
+    if publication_date is not None:
+        # Half-open range so the publication_timestamp index applies
+        conditions.append("a.publication_timestamp >= %s::date AND a.publication_timestamp < %s::date + INTERVAL '1 day'")
+        params.extend([publication_date, publication_date])
+
+    select_query = f"""
+        SELECT at.article_id, at.tweet_id, a.title, t.tweet_text
+        FROM article_tweets at
+        JOIN tweets t ON t.id = at.tweet_id
+        JOIN articles a ON a.id = at.article_id
+        WHERE {" AND ".join(conditions)}
+        ORDER BY at.article_id, at.tweet_id
+        LIMIT %s
+    """
+    update_query = """
+        UPDATE article_tweets AS at
+        SET relevant = v.relevant, confidence = v.confidence, model_version = v.model_version
+        FROM (VALUES %s) AS v(article_id, tweet_id, relevant, confidence, model_version)
+        WHERE at.article_id = v.article_id AND at.tweet_id = v.tweet_id
+    """
+
+    scored = 0
+    batches = 0
+    while max_batches is None or batches < max_batches:
+        model_version = scorer.model_version()
+        with conn.cursor() as cur:
+            cur.execute(select_query, [model_version, *params, batch_size])
+            rows = cur.fetchall()
+        if not rows:
+            break
+
+        model_version, results = scorer.score_versioned([(title, tweet_text) for _, _, title, tweet_text in rows])
+        records = [
+            (article_id, tweet_id, result["relevant"], result["confidence"], model_version)
+            for (article_id, tweet_id, _, _), result in zip(rows, results)
+        ]
+        with conn.cursor() as cur:
+            execute_values(cur, update_query, records, page_size=batch_size)
+        conn.commit()
+
+        scored += len(rows)
+        batches += 1
+        logging.info(f"Scored {len(rows)} tweets with relevance model {model_version}")
+        if len(rows) < batch_size:
+            break
+
+    return scored
+
+def connect():
+    return psycopg2.connect(
+        host=os.getenv('DB_HOST'),
+        dbname=os.getenv('POSTGRES_DB'),
+        user=os.getenv('POSTGRES_USER'),
+        password=os.getenv('POSTGRES_PASSWORD'),
+        port="5432"
+    )
+
+def run_scoring_worker(interval=SCORE_INTERVAL):
+    """
+    Score new and stale article/tweet links as they appear, so neither the reader
+    nor page views have to. Sleeps `interval` seconds whenever it catches up, and
+    reconnects after database errors.
+    """
+    conn = None
+    while True:
+        try:
+            if conn is None or conn.closed:
+                conn = connect()
+            scored = score_stale_tweets(conn)
+            if scored:
+                logging.info(f"Scored {scored} tweets")
+                continue
+        except Exception as e:
+            logging.error(f"Relevance scoring failed: {e}")
+            if conn is not None:
+                conn.close()
+            conn = None
+        time.sleep(interval)
+
+if __name__ == "__main__":
+    load_dotenv(override=True)
+    # --watch keeps scoring as tweets arrive; without it, one backfill pass
+    if "--watch" in sys.argv[1:]:
+        run_scoring_worker()
+    conn = connect()
+    try:
+        total = score_stale_tweets(conn)
+        logging.info(f"Backfill complete: {total} tweets rescored")
+    finally:
+        conn.close()
@@ -1,19 +1,16 @@
 # tweet_relevance/model/train.py
 
 import os
-import joblib
 import logging
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.linear_model import LogisticRegression
 from sklearn.metrics import classification_report
 from preprocessing import prepare_data
+from infer import BUNDLE_PATH, save_bundle
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
-MODEL_DIR = "model/"
-os.makedirs(MODEL_DIR, exist_ok=True)
-
 def combine_text(row):
     """
     Combine headline and tweet into one string.
@@ -47,9 +44,9 @@ def train_model():
         logging.info("Classification Report:\n" + classification_report(y_test, y_pred))
 
         logging.info("Saving model and vectorizer...")
-        joblib.dump(clf, os.path.join(MODEL_DIR, "relevance_model.joblib"))
-        joblib.dump(vectorizer, os.path.join(MODEL_DIR, "vectorizer.joblib"))
-        logging.info(f"Saved model and vectorizer to {MODEL_DIR}")
+        # One artifact, so the scorer always loads a matching model and vectorizer
+        save_bundle({"model": clf, "vectorizer": vectorizer, "incremental_state": None})
+        logging.info(f"Saved model and vectorizer to {BUNDLE_PATH}")
     except Exception as e:
         logging.error(f"Training or saving failed: {e}")
 